@@ -19,10 +19,14 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
+        ('connection.py', '.'),
         ('database.py', '.'),
         ('dialogs.py', '.'),
         ('exporter.py', '.'),
         ('main_window.py', '.'),
+        ('overview_store.py', '.'),
+        ('question_model.py', '.'),
+        ('workers.py', '.'),
     ],
     hiddenimports=[
         'PyQt6.QtCore',
@@ -0,0 +1,10 @@
+"""Benchmarks für das Moodle MCQ Tool.
+
+Aufruf aus dem Projektverzeichnis:
+
+    python -m bench                      # Benchmark-Suite (bench.suite)
+    python -m bench.synthetic ...        # synthetische Fragenbank erzeugen
+    python -m bench.schema_indexes       # Abfragen vor/nach den Migrationen
+    python -m bench.word_export          # Word-Export bisher/Blöcke/parallel
+    python -m bench.startup              # Startzeit bis zum Hauptfenster
+"""
@@ -0,0 +1,94 @@
+"""Vergleicht den Speicherbedarf der Fragenübersicht im GUI-Prozess.
+
+Misst mit tracemalloc, was nach dem Laden aller Zeilen belegt bleibt (und
+die Spitze währenddessen):
+
+- bisher: Liste von Tupeln aus get_questions_overview plus dict mit dem
+  vollen Fragetext jeder Frage (früher MainWindow.all_rows/all_question_texts)
+- Tupel-Seiten: Liste der Tupel aus get_questions_page (Vorschau statt Text)
+- OverviewStore: array-Spalten, einmal gespeicherte Tags, nur Vorschau
+
+    python -m bench.overview_memory [--questions 100000] [--json ergebnis.json]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.synthetic import build_database  # noqa: E402
+from connection import close_connections  # noqa: E402
+from database import get_questions_overview, get_questions_page  # noqa: E402
+from overview_store import OverviewStore  # noqa: E402
+
+
+def legacy_overview(db_path):
+    """Übersicht wie vor dem Tabellenmodell: alle Zeilen plus voller Text je Frage"""
+    rows = []
+    texts = {}
+    for qid, title, points, tags, count, questiontext in get_questions_overview(db_path, with_text=True):
+        rows.append((qid, title, points, tags, count))
+        texts[qid] = questiontext or ""
+    return rows, texts
+
+
+def page_tuples(db_path, page_size=5000):
+    """Was QuestionTableModel.rows bisher nach vollständigem Scrollen hielt"""
+    rows = []
+    while True:
+        page = get_questions_page(db_path, after_id=rows[-1][0] if rows else 0, limit=page_size)
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+def measure(load):
+    """(belegt MB, Spitze MB, Ladezeit ms) für eine Lade-Funktion"""
+    # Ladezeit ohne tracemalloc messen, das jede Allokation mitschreibt
+    start = time.perf_counter()
+    load()
+    elapsed = (time.perf_counter() - start) * 1000
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / 2**20, peak / 2**20, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, default=100_000)
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_database(db_path, args.questions)
+        variants = [('bisher', lambda: legacy_overview(db_path)),
+                    ('Tupel-Seiten', lambda: page_tuples(db_path)),
+                    ('OverviewStore', lambda: OverviewStore.load(db_path))]
+        results = {name: measure(load) for name, load in variants}
+        close_connections(db_path)
+
+    print(f"{args.questions} Fragen")
+    print(f"{'Variante':<16}{'belegt MB':>11}{'Spitze MB':>11}{'Laden ms':>10}{'Faktor':>9}")
+    for name, (current, peak, elapsed) in results.items():
+        print(f"{name:<16}{current:>11.1f}{peak:>11.1f}{elapsed:>10.0f}{results['bisher'][0] / current:>8.1f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'questions': args.questions,
+                       'mb': {name: {'current': current, 'peak': peak, 'load_ms': elapsed}
+                              for name, (current, peak, elapsed) in results.items()}}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
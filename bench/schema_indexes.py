@@ -0,0 +1,121 @@
+"""Misst Übersichts- und Exportabfragen vor und nach den Schema-Migrationen.
+
+Erzeugt eine synthetische Datenbank mit 100.000 Antworten, entfernt die
+Indizes der Migrationen (Stand "vorher"), misst, migriert mit
+init_database_schema und misst erneut. Der Export läuft dabei ohne
+render_cache, sonst würde der erste Lauf den Cache für alle folgenden füllen;
+der Cache wird danach getrennt gemessen (leer und gefüllt).
+
+    python -m bench.schema_indexes [--answers 100000] [--json ergebnis.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection import get_connection, close_connections  # noqa: E402
+from database import (  # noqa: E402
+    init_database_schema, get_questions_overview, get_questions_page, iter_questions
+)
+from exporter import export_to_moodle_xml  # noqa: E402
+
+ANSWERS_PER_QUESTION = 5
+
+
+def build_database(db_path, answer_count, seed=1):
+    """Legt eine Datenbank mit answer_count Antworten (je 5 pro Frage) an"""
+    init_database_schema(db_path)
+    rnd = random.Random(seed)
+    conn = get_connection(db_path)
+    question_count = answer_count // ANSWERS_PER_QUESTION
+    with conn:
+        conn.executemany(
+            "INSERT INTO questions (id, title, questiontext, single, tags, points) VALUES (?, ?, ?, ?, ?, ?)",
+            ((qid, f"Frage {qid}", f"Fragetext {qid} " * rnd.randint(3, 30), rnd.randint(0, 1),
+              "Bench,Kapitel" + str(qid % 20), 1.0) for qid in range(1, question_count + 1)))
+        conn.executemany(
+            "INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
+            ((qid, f"Antwort {n} zu {qid}", 1 if n == 0 else 0)
+             for n in range(ANSWERS_PER_QUESTION) for qid in range(1, question_count + 1)))
+    return question_count
+
+
+def time_call(fn, repeat=3):
+    """Beste Laufzeit von repeat Aufrufen in Millisekunden"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure(db_path, question_count, out_dir):
+    ids = list(range(1, question_count + 1, 4))
+    xml_file = os.path.join(out_dir, 'export.xml')
+    return {
+        'get_questions_overview': time_call(lambda: get_questions_overview(db_path)),
+        'get_questions_page': time_call(lambda: get_questions_page(db_path, after_id=question_count // 2)),
+        'iter_questions': time_call(lambda: sum(1 for _ in iter_questions(db_path, ids))),
+        'export_to_moodle_xml': time_call(
+            lambda: export_to_moodle_xml(db_path, ids, xml_file, streaming=True, use_cache=False), 1),
+    }
+
+
+def measure_render_cache(db_path, question_count, out_dir):
+    """Streaming-Export mit leerem und mit gefülltem render_cache"""
+    ids = list(range(1, question_count + 1, 4))
+    xml_file = os.path.join(out_dir, 'export.xml')
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("DELETE FROM render_cache")
+
+    def export():
+        export_to_moodle_xml(db_path, ids, xml_file, streaming=True)
+
+    return {'export_cache_cold': time_call(export, 1), 'export_cache_warm': time_call(export)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--answers', type=int, default=100_000)
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        question_count = build_database(db_path, args.answers)
+
+        # Stand vor den Migrationen herstellen
+        conn = get_connection(db_path)
+        conn.execute("DROP INDEX IF EXISTS idx_answers_question_id")
+        conn.execute("PRAGMA user_version = 0")
+        conn.execute("ANALYZE")
+        before = measure(db_path, question_count, tmp)
+
+        init_database_schema(db_path)
+        conn.execute("ANALYZE")
+        after = measure(db_path, question_count, tmp)
+        cache = measure_render_cache(db_path, question_count, tmp)
+        close_connections(db_path)
+
+    print(f"{question_count} Fragen, {args.answers} Antworten")
+    print(f"{'Abfrage':<24}{'vorher ms':>12}{'nachher ms':>12}{'Faktor':>9}")
+    for name in before:
+        print(f"{name:<24}{before[name]:>12.1f}{after[name]:>12.1f}{before[name] / after[name]:>8.1f}x")
+    print(f"render_cache: Export leer {cache['export_cache_cold']:.1f} ms, "
+          f"gefüllt {cache['export_cache_warm']:.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'answers': args.answers, 'questions': question_count,
+                       'before_ms': before, 'after_ms': after, 'render_cache_ms': cache}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
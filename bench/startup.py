@@ -0,0 +1,144 @@
+"""Misst die Startzeit bis zum fertigen Hauptfenster (time-to-window).
+
+Startet main.py über ein kleines Startskript (PROBE), das im Auswahldialog
+eine synthetische Datenbank öffnet und das Programm beendet, sobald das
+Hauptfenster steht; main.py selbst enthält dafür keinen Code. Zusätzlich wird
+-X importtime ausgewertet: die teuersten Importe werden ausgegeben, und
+python-docx, lxml, exporter und dialogs dürfen beim Start nicht geladen
+werden (sie werden erst bei Bedarf importiert).
+
+Dem gepackten PyInstaller-Build lässt sich kein Startskript unterschieben;
+er wartet auf die Auswahl im Dialog und wird daher nicht gemessen.
+
+    python -m bench.startup [--runs 5] [--budget-ms 1500] [--json ergebnis.json]
+
+Ohne Bildschirm (CI) mit QT_QPA_PLATFORM=offscreen aufrufen.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.synthetic import build_database  # noqa: E402
+from connection import close_connections  # noqa: E402
+
+# Zielwert time-to-window (ohne die Zeit, die der Auswahldialog offen ist)
+STARTUP_BUDGET_MS = 1500
+
+# Module, die erst beim ersten Export/Dialog geladen werden dürfen
+LAZY_MODULES = ('docx', 'lxml', 'exporter', 'dialogs')
+
+# Führt main.py wie "python main.py" aus: der Auswahldialog wird nicht angezeigt,
+# es gilt die erste Option (Bestehende öffnen) mit der Datenbank aus sys.argv.
+# Das Programm endet, sobald die Ereignisschleife mit dem Hauptfenster läuft
+PROBE = """
+import runpy, sys
+from PyQt6 import QtWidgets
+from PyQt6.QtCore import QTimer
+
+main_py, db_path = sys.argv[1:3]
+
+
+class ProbeApplication(QtWidgets.QApplication):
+    def exec(self):
+        QTimer.singleShot(0, self.quit)
+        return super().exec()
+
+
+class ProbeMessageBox(QtWidgets.QMessageBox):
+    first_button = None
+
+    def addButton(self, *args):
+        button = super().addButton(*args)
+        if self.first_button is None:
+            self.first_button = button
+        return button
+
+    def exec(self):
+        return 0
+
+    def clickedButton(self):
+        return self.first_button
+
+
+QtWidgets.QApplication = ProbeApplication
+QtWidgets.QMessageBox = ProbeMessageBox
+QtWidgets.QFileDialog.getOpenFileName = staticmethod(lambda *args, **kwargs: (db_path, ''))
+sys.argv = [main_py]
+runpy.run_path(main_py, run_name='__main__')
+"""
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def parse_importtime(stderr):
+    """-X importtime Ausgabe -> {Modul: (kumuliert µs, Tiefe)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(2)), len(match.group(3)) // 2)
+    return modules
+
+
+def run_once(python_args, db_path):
+    """Startet main.py einmal über PROBE und liefert (Wandzeit ms, stderr)"""
+    command = [sys.executable, *python_args, '-c', PROBE, os.path.join(ROOT, 'main.py'), db_path]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        sys.exit(f"Fehler: Start fehlgeschlagen ({result.returncode})\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=10, help="Anzahl der ausgegebenen teuersten Importe")
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_database(db_path, args.questions)
+        close_connections(db_path)
+
+        run_once([], db_path)  # Aufwärmen (Dateicache)
+        times = [run_once([], db_path)[0] for _ in range(args.runs)]
+        _, stderr = run_once(['-X', 'importtime'], db_path)
+        modules = parse_importtime(stderr)
+
+    best = min(times)
+    print(f"main.py: time-to-window {best:.0f} ms "
+          f"(bester von {args.runs}, Median {sorted(times)[len(times) // 2]:.0f} ms), Budget {args.budget_ms:.0f} ms")
+
+    if modules:
+        top_level = sorted(((us, name) for name, (us, depth) in modules.items() if depth == 0), reverse=True)
+        print(f"{'Import':<28}{'ms':>10}")
+        for us, name in top_level[:args.top]:
+            print(f"{name:<28}{us / 1000:>10.1f}")
+        eager = [name for name in LAZY_MODULES if name in modules]
+        if eager:
+            sys.exit(f"Fehler: beim Start geladen, obwohl erst bei Bedarf nötig: {', '.join(eager)}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'runs_ms': times, 'best_ms': best, 'budget_ms': args.budget_ms,
+                       'imports_ms': {name: us / 1000 for name, (us, _) in modules.items()}}, f, indent=2)
+
+    if best > args.budget_ms:
+        sys.exit(f"Fehler: Startzeit {best:.0f} ms über dem Budget von {args.budget_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark-Suite: misst die Kernoperationen auf synthetischen Fragenbanken.
+
+Für jede Größe wird eine Datenbank und eine passende Moodle-XML-Datei
+erzeugt und gemessen. Die Ergebnisse (Millisekunden) werden als JSON
+geschrieben; mit --compare wird gegen eine frühere Ergebnisdatei verglichen.
+
+    python -m bench --sizes 1000 10000 --output bench_results.json
+    python -m bench --sizes 1000 10000 --compare bench_results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.synthetic import SIZES, build_database, write_moodle_xml  # noqa: E402
+from connection import close_connections  # noqa: E402
+from database import (  # noqa: E402
+    init_database_schema, import_moodle_xml, get_questions_overview, duplicate_question,
+    search_questions, count_questions, rescale_points, retag_questions, delete_questions, undo_last_change
+)
+from exporter import export_to_moodle_xml, export_to_word  # noqa: E402
+
+# Suchbegriffe wie beim Tippen in der Live-Suche
+SEARCH_TERMS = ["J", "Ja", "Java", "Kapitel 3", "Verschlüsselung Adresse", "#4711"]
+
+# Anzahl Fragen für Exporte (Word ist deutlich langsamer als XML)
+EXPORT_LIMIT = 10_000
+WORD_EXPORT_LIMIT = 1_000
+DUPLICATE_CALLS = 100
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _search_like_gui(db_path, term):
+    """Was die Live-Suche pro Suchbegriff ausführt: Trefferzahl + erste Seite"""
+    count_questions(db_path, term)
+    search_questions(db_path, term, limit=500)
+
+
+def run_size(size, work_dir):
+    """Misst alle Operationen für eine Fragenbank mit size Fragen"""
+    db_path = os.path.join(work_dir, f'bank_{size}.db')
+    xml_path = os.path.join(work_dir, f'bank_{size}.xml')
+    results = {}
+
+    results['build_database'] = _timed(lambda: build_database(db_path, size))
+    write_moodle_xml(xml_path, size)
+
+    import_db = os.path.join(work_dir, f'import_{size}.db')
+    init_database_schema(import_db)
+    results['import_moodle_xml'] = _timed(lambda: import_moodle_xml(import_db, xml_path, streaming=True))
+    close_connections(import_db)
+
+    results['get_questions_overview'] = _timed(lambda: get_questions_overview(db_path))
+
+    search_times = [_timed(lambda term=term: _search_like_gui(db_path, term)) for term in SEARCH_TERMS]
+    results['search_avg'] = sum(search_times) / len(search_times)
+    results['search_max'] = max(search_times)
+
+    ids = list(range(1, min(size, EXPORT_LIMIT) + 1))
+    results['export_to_moodle_xml'] = _timed(
+        lambda: export_to_moodle_xml(db_path, ids, os.path.join(work_dir, 'export.xml'), streaming=True))
+    # Derselbe Export noch einmal: alle Fragmente kommen aus dem render_cache
+    results['export_to_moodle_xml_warm'] = _timed(
+        lambda: export_to_moodle_xml(db_path, ids, os.path.join(work_dir, 'export.xml'), streaming=True))
+    word_ids = ids[:WORD_EXPORT_LIMIT]
+    results['export_to_word'] = _timed(
+        lambda: export_to_word(db_path, word_ids, os.path.join(work_dir, 'export.docx')))
+
+    calls = min(DUPLICATE_CALLS, size)
+    results['duplicate_question_avg'] = _timed(
+        lambda: [duplicate_question(db_path, qid) for qid in range(1, calls + 1)]) / calls
+
+    # Sammeländerungen samt Journal (wie Bearbeiten → Auswahl bearbeiten) und deren Rückgängig
+    results['rescale_points'] = _timed(lambda: rescale_points(db_path, ids, factor=2.0))
+    results['undo_rescale_points'] = _timed(lambda: undo_last_change(db_path))
+    results['retag_questions'] = _timed(lambda: retag_questions(db_path, ids, add=['bench']))
+    results['undo_retag_questions'] = _timed(lambda: undo_last_change(db_path))
+    results['delete_questions'] = _timed(lambda: delete_questions(db_path, ids))
+    results['undo_delete_questions'] = _timed(lambda: undo_last_change(db_path))
+
+    close_connections(db_path)
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    for size, timings in results.items():
+        print(f"\n{size} Fragen")
+        for name, ms in timings.items():
+            line = f"  {name:<26}{ms:>12.1f} ms"
+            old = (baseline or {}).get(size, {}).get(name)
+            if old:
+                line += f"   vorher {old:>10.1f} ms  ({ms / old:>5.2f}x)"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES[:2],
+                        help=f"Anzahl Fragen pro Lauf (Standard: {SIZES[:2]}, verfügbar u.a. {SIZES})")
+    parser.add_argument('--output', help="Ergebnisse als JSON speichern")
+    parser.add_argument('--compare', help="Frühere JSON-Ergebnisse zum Vergleich")
+    parser.add_argument('--work-dir', help="Verzeichnis für die Testdaten (Standard: temporär)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+        results = {str(size): run_size(size, work_dir) for size in args.sizes}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_results(results, baseline)
+
+    if args.output:
+        report = {
+            'revision': _git_revision(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Erzeugt realistische synthetische Fragenbanken für Benchmarks.
+
+Gemischte Fragetypen (Multiple/Single Choice, Essay, Kurzantwort),
+2–10 Antworten pro Choice-Frage und 1–4 Tags aus einem festen Vorrat.
+Mit gleichem seed entstehen immer dieselben Daten.
+
+    python -m bench.synthetic --questions 10000 --db bank.db --xml bank.xml
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection import get_connection  # noqa: E402
+from database import init_database_schema, question_hash, refresh_question_tags  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+TYPE_WEIGHTS = [('multichoice', 80), ('essay', 10), ('shortanswer', 10)]
+
+TAGS = [
+    "Java", "JavaScript", "Python", "SQL", "Netzwerke", "Datenbanken", "OOP",
+    "Algorithmen", "Betriebssysteme", "Security", "Web", "Git", "Linux",
+    "Kapitel 1", "Kapitel 2", "Kapitel 3", "Kapitel 4", "Kapitel 5", "Test", "Wiederholung",
+]
+
+WORDS = (
+    "Welche Aussage über den Begriff ist richtig wenn man die Eigenschaften einer "
+    "Klasse Methode Variable Tabelle Schleife Funktion Schnittstelle Abfrage Datei "
+    "Prozess Adresse Speicher Übertragung Verschlüsselung betrachtet und vergleicht"
+).split()
+
+
+def _sentence(rnd, min_words, max_words):
+    return " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(min_words, max_words)))
+
+
+def generate_questions(count, seed=1):
+    """Liefert count Frage-Datensätze (Format wie database.iter_questions)"""
+    rnd = random.Random(seed)
+    types = [t for t, _ in TYPE_WEIGHTS]
+    weights = [w for _, w in TYPE_WEIGHTS]
+    for qid in range(1, count + 1):
+        question_type = rnd.choices(types, weights)[0]
+        single = rnd.randint(0, 1) if question_type == 'multichoice' else 1
+        answers = []
+        if question_type == 'multichoice':
+            answer_count = rnd.randint(2, 10)
+            correct = set(rnd.sample(range(answer_count), 1 if single else rnd.randint(1, answer_count)))
+            answers = [(_sentence(rnd, 1, 12), 1 if n in correct else 0, None) for n in range(answer_count)]
+        elif question_type == 'shortanswer':
+            answers = [(_sentence(rnd, 1, 3), 1, None) for _ in range(rnd.randint(1, 3))]
+        yield {
+            'id': qid,
+            'title': f"{_sentence(rnd, 2, 6)} #{qid}",
+            'questiontext': _sentence(rnd, 10, 80) + "?",
+            'single': single,
+            'tags': ",".join(rnd.sample(TAGS, rnd.randint(1, 4))),
+            'points': rnd.choice([0.5, 1.0, 1.0, 2.0, 3.0]),
+            'question_type': question_type,
+            'answers': answers,
+        }
+
+
+def build_database(db_path, count, seed=1, batch_size=10_000):
+    """Legt eine Datenbank über init_database_schema an und füllt sie mit count Fragen"""
+    init_database_schema(db_path)
+    conn = get_connection(db_path)
+    batch = []
+
+    def flush():
+        with conn:
+            conn.executemany(
+                """INSERT INTO questions (id, title, questiontext, single, tags, points, question_type, content_hash)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(q['id'], q['title'], q['questiontext'], q['single'], q['tags'], q['points'], q['question_type'],
+                  question_hash(q['title'], q['questiontext'], q['question_type'], q['answers'])) for q in batch])
+            conn.executemany(
+                "INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
+                [(q['id'], text, is_correct) for q in batch for text, is_correct, _ in q['answers']])
+            refresh_question_tags(conn.cursor(), [q['id'] for q in batch])
+        batch.clear()
+
+    for question in generate_questions(count, seed):
+        batch.append(question)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+
+def write_moodle_xml(filename, count, seed=1):
+    """Schreibt dieselben Fragen als Moodle XML (wie der Exporter sie erzeugt)"""
+    from exporter import _write_moodle_xml_streaming
+    _write_moodle_xml_streaming(generate_questions(count, seed), filename)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, default=SIZES[0])
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--db', help="Ziel-Datenbank (darf noch nicht existieren)")
+    parser.add_argument('--xml', help="Ziel-Datei für Moodle XML")
+    args = parser.parse_args(argv)
+    if not args.db and not args.xml:
+        parser.error("--db und/oder --xml angeben")
+    if args.db:
+        if os.path.exists(args.db):
+            parser.error(f"{args.db} existiert bereits")
+        build_database(args.db, args.questions, args.seed)
+    if args.xml:
+        write_moodle_xml(args.xml, args.questions, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Vergleicht den Word-Export: bisherige Implementierung, Blöcke, parallele Blöcke.
+
+Die bisherige Implementierung (ein Dokument, Style-Namen, table.cell) ist
+als Referenz hier nachgebaut. Alle Varianten müssen dieselbe document.xml
+erzeugen, sonst bricht der Benchmark ab.
+
+    python -m bench.word_export [--questions 2000] [--jobs 2 4] [--json ergebnis.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.synthetic import build_database  # noqa: E402
+from connection import close_connections  # noqa: E402
+from database import iter_questions  # noqa: E402
+from exporter import export_to_word  # noqa: E402
+
+
+def legacy_export_to_word(db_path, question_ids, filename):
+    """Word-Export vor der Umstellung auf Blöcke (Referenz für den Vergleich)"""
+    from docx import Document
+    from docx.shared import Inches, Pt, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    doc = Document()
+    title = doc.add_heading('Test - Multiple Choice Fragen', level=1)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    doc.add_paragraph()
+
+    for idx, record in enumerate(iter_questions(db_path, question_ids), 1):
+        if idx > 1:
+            doc.add_page_break()
+        doc.add_heading(f"Frage {idx}: {record['title']}", level=2)
+        points_para = doc.add_paragraph(f"Punkte: {record['points']:.1f}")
+        points_para.runs[0].bold = True
+        question_para = doc.add_paragraph(record['questiontext'])
+        question_para.style = 'Intense Quote'
+
+        if record['question_type'] in ['multichoice', 'shortanswer']:
+            answers = record['answers']
+            if answers:
+                table = doc.add_table(rows=len(answers), cols=2)
+                table.style = 'Light Grid Accent 1'
+                table.columns[0].width = Inches(0.5)
+                table.columns[1].width = Inches(5.5)
+                for i, (answertext, is_correct, _) in enumerate(answers):
+                    checkbox_cell = table.cell(i, 0)
+                    checkbox_cell.text = '☐'
+                    checkbox_para = checkbox_cell.paragraphs[0]
+                    checkbox_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                    checkbox_para.runs[0].font.size = Pt(16)
+                    answer_cell = table.cell(i, 1)
+                    answer_cell.text = answertext
+                    if is_correct == 1:
+                        answer_run = answer_cell.paragraphs[0].runs[0]
+                        answer_run.font.color.rgb = RGBColor(0, 128, 0)
+                        answer_run.font.bold = True
+        elif record['question_type'] == 'essay':
+            doc.add_paragraph('Antwort:')
+            doc.add_paragraph('_' * 80)
+            doc.add_paragraph()
+            doc.add_paragraph('_' * 80)
+            doc.add_paragraph()
+
+        if record['tags']:
+            tags_para = doc.add_paragraph(f"Tags: {record['tags']}")
+            tags_para.runs[0].font.italic = True
+            tags_para.runs[0].font.size = Pt(9)
+            tags_para.runs[0].font.color.rgb = RGBColor(128, 128, 128)
+
+    doc.save(filename)
+
+
+def _document_xml(filename):
+    with zipfile.ZipFile(filename) as docx_file:
+        return docx_file.read('word/document.xml')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[os.cpu_count() or 1],
+                        help="Anzahl Worker-Prozesse für den parallelen Export")
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_database(db_path, args.questions)
+        ids = list(range(1, args.questions + 1))
+
+        variants = [('bisher', lambda f: legacy_export_to_word(db_path, ids, f)),
+                    ('Blöcke', lambda f: export_to_word(db_path, ids, f))]
+        for jobs in args.jobs:
+            variants.append((f'parallel ({jobs} Prozesse)',
+                             lambda f, jobs=jobs: export_to_word(db_path, ids, f, parallel=True, max_workers=jobs)))
+
+        results = {}
+        reference = None
+        for name, export in variants:
+            filename = os.path.join(tmp, f'{len(results)}.docx')
+            start = time.perf_counter()
+            export(filename)
+            results[name] = (time.perf_counter() - start) * 1000
+            document_xml = _document_xml(filename)
+            if reference is None:
+                reference = document_xml
+            elif document_xml != reference:
+                sys.exit(f"Fehler: {name} erzeugt ein anderes Dokument als die bisherige Implementierung")
+        close_connections(db_path)
+
+    print(f"{args.questions} Fragen, {os.cpu_count()} CPU-Kerne")
+    print(f"{'Variante':<28}{'ms':>10}{'Faktor':>9}")
+    for name, ms in results.items():
+        print(f"{name:<28}{ms:>10.0f}{results['bisher'] / ms:>8.1f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'questions': args.questions, 'cpu_count': os.cpu_count(), 'ms': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
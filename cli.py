@@ -0,0 +1,241 @@
+"""moodle-tool: Kommandozeile für Import und Export ohne grafische Oberfläche.
+
+Verwendet nur database.py und exporter.py (kein PyQt6), startet daher in
+wenigen Millisekunden und eignet sich für Skripte und nächtliche Jobs:
+
+    python cli.py import fragen.db kapitel*.xml --jobs 4
+    python cli.py import fragen.db kapitel1.xml --on-duplicate update
+    python cli.py dedupe fragen.db
+    python cli.py undo fragen.db
+    python cli.py export-xml fragen.db kurs.xml --tag "Kurs 3A" --tag Java
+    python cli.py export-xml fragen.db kurs.xml --any-tag Java --any-tag Python
+    python cli.py export-xml fragen.db neu.xml --profile moodle-kurs3a
+    python cli.py profiles fragen.db
+    python cli.py export-docx fragen.db test.docx --ids 100-250
+    python cli.py variants fragen.db pruefung.docx --tag "Kurs 3A" --count 4 --seed 2026
+    python cli.py search fragen.db "Schleife"
+    python cli.py stats fragen.db
+"""
+import argparse
+import os
+import sys
+import time
+
+from database import (
+    init_database_schema, import_moodle_xml, import_moodle_xml_files, select_question_ids,
+    search_questions, get_statistics, merge_duplicate_questions, undo_last_change, redo_last_change,
+    get_export_profiles, DUPLICATE_POLICIES, DEFAULT_DUPLICATE_POLICY
+)
+
+
+def _parse_id_range(text):
+    """'100-250', '100-' oder '-250' in (von, bis) umwandeln"""
+    start, sep, end = text.partition('-')
+    if not sep:
+        start = end = text
+    try:
+        return (int(start) if start else None, int(end) if end else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungültiger ID-Bereich: {text} (erwartet z.B. 100-250)")
+
+
+def _open_database(db_path, create=False):
+    if not create and not os.path.exists(db_path):
+        sys.exit(f"Fehler: Datenbank {db_path} existiert nicht")
+    init_database_schema(db_path)
+
+
+def _selected_ids(args):
+    id_from, id_to = args.ids if args.ids else (None, None)
+    return select_question_ids(args.db, tags=args.tag, any_tags=args.any_tag, id_from=id_from, id_to=id_to,
+                               query=args.query)
+
+
+def cmd_import(args):
+    _open_database(args.db, create=True)
+    if len(args.xml_files) == 1:
+        imported_count, message = import_moodle_xml(args.db, args.xml_files[0], streaming=True,
+                                                    on_duplicate=args.on_duplicate)
+        print(f"{args.xml_files[0]}: {message}")
+        return 0 if message.startswith("✓") else 1
+
+    def progress(done, total, xml_file, imported_count, message):
+        print(f"[{done}/{total}] {xml_file}: {message}")
+
+    total_count, results = import_moodle_xml_files(args.db, args.xml_files, max_workers=args.jobs, progress=progress,
+                                                   on_duplicate=args.on_duplicate)
+    failed = [name for name, _, message in results if not message.startswith("✓")]
+    print(f"{total_count} Fragen aus {len(results) - len(failed)} von {len(results)} Dateien importiert")
+    return 1 if failed else 0
+
+
+def cmd_export_xml(args):
+    _open_database(args.db)
+    if args.profile:
+        from exporter import export_changes_to_moodle_xml
+        # Ohne Filter direkt das Delta über den updated_at-Index holen statt erst alle IDs
+        has_selection = args.tag or args.any_tag or args.ids or args.query
+        count = export_changes_to_moodle_xml(args.db, args.profile, args.output,
+                                             _selected_ids(args) if has_selection else None)
+        if count:
+            print(f"{count} neue oder geänderte Fragen exportiert: {args.output}")
+        else:
+            print(f"Keine Änderungen seit dem letzten Export mit Profil {args.profile}")
+        return 0
+
+    from exporter import export_to_moodle_xml
+    question_ids = _selected_ids(args)
+    export_to_moodle_xml(args.db, question_ids, args.output, streaming=True)
+    print(f"{len(question_ids)} Fragen exportiert: {args.output}")
+    return 0
+
+
+def cmd_export_docx(args):
+    _open_database(args.db)
+    from exporter import export_to_word
+    question_ids = _selected_ids(args)
+    export_to_word(args.db, question_ids, args.output, parallel=args.jobs != 1, max_workers=args.jobs)
+    print(f"{len(question_ids)} Fragen als Word-Dokument exportiert: {args.output}")
+    return 0
+
+
+def cmd_variants(args):
+    _open_database(args.db)
+    from exporter import export_exam_variants
+    question_ids = _selected_ids(args)
+    files = export_exam_variants(args.db, question_ids, args.output, args.count, seed=args.seed,
+                                 shuffle_questions=not args.keep_question_order,
+                                 shuffle_answers=not args.keep_answer_order, xml=args.xml)
+    print(f"{args.count} Varianten mit je {len(question_ids)} Fragen erstellt:")
+    for filename in files:
+        print(f"  {filename}")
+    return 0
+
+
+def cmd_search(args):
+    _open_database(args.db)
+    for qid, title, points, tags, count, snippet in search_questions(args.db, args.text, limit=args.limit):
+        print(f"{qid:>7}  {title}  [{tags}]  {points:.1f} P.  {count} Antw.")
+        print(f"         {snippet}")
+    return 0
+
+
+def cmd_profiles(args):
+    _open_database(args.db)
+    for name, last_export in get_export_profiles(args.db):
+        print(f"{name:<24}  letzter Export {time.strftime('%d.%m.%Y %H:%M:%S', time.localtime(last_export))}")
+    return 0
+
+
+def cmd_dedupe(args):
+    _open_database(args.db)
+    group_count, removed_count = merge_duplicate_questions(args.db)
+    print(f"{removed_count} Duplikate in {group_count} Gruppen zusammengeführt")
+    return 0
+
+
+def cmd_undo(args):
+    _open_database(args.db)
+    description = redo_last_change(args.db) if args.command == 'redo' else undo_last_change(args.db)
+    if description is None:
+        print("Nichts zum " + ("Wiederholen" if args.command == 'redo' else "Rückgängigmachen"))
+        return 1
+    print(f"{'Wiederholt' if args.command == 'redo' else 'Rückgängig gemacht'}: {description}")
+    return 0
+
+
+def cmd_stats(args):
+    _open_database(args.db)
+    stats = get_statistics(args.db)
+    print(f"Datenbank:      {args.db} ({os.path.getsize(args.db) / 1024:.0f} KB)")
+    print(f"Schema-Version: {stats['schema_version']}")
+    print(f"Fragen:         {stats['questions']} ({stats['total_points']:.1f} Punkte)")
+    print(f"Antworten:      {stats['answers']}")
+    for question_type, count in stats['by_type'].items():
+        print(f"  {question_type:<14}{count}")
+    print(f"Tags:           {len(stats['tags'])}")
+    for tag, count in list(stats['tags'].items())[:args.top_tags]:
+        print(f"  {tag:<28}{count}")
+    return 0
+
+
+def _add_selection_arguments(parser):
+    parser.add_argument('--tag', action='append', help="nur Fragen mit diesem Tag (mehrfach = alle Tags)")
+    parser.add_argument('--any-tag', action='append', help="nur Fragen mit mindestens einem dieser Tags (mehrfach)")
+    parser.add_argument('--ids', type=_parse_id_range, help="ID-Bereich, z.B. 100-250")
+    parser.add_argument('--query', help="nur Treffer dieser Volltextsuche")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='moodle-tool', description="Moodle MCQ Tool ohne GUI")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('import', help="Moodle XML Dateien importieren")
+    p.add_argument('db')
+    p.add_argument('xml_files', nargs='+')
+    p.add_argument('--jobs', type=int, help="Anzahl paralleler Parser-Prozesse (Standard: alle Kerne)")
+    p.add_argument('--on-duplicate', choices=DUPLICATE_POLICIES, default=DEFAULT_DUPLICATE_POLICY,
+                   help="Fragen mit bereits vorhandenem Inhalt überspringen, aktualisieren oder doppelt anlegen")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('export-xml', help="Fragen als Moodle XML exportieren (.xml.gz = komprimiert)")
+    p.add_argument('db')
+    p.add_argument('output')
+    p.add_argument('--profile', help="nur seit dem letzten Export mit diesem Profil neue oder geänderte Fragen")
+    _add_selection_arguments(p)
+    p.set_defaults(func=cmd_export_xml)
+
+    p = sub.add_parser('profiles', help="Exportprofile mit Zeitpunkt des letzten Exports")
+    p.add_argument('db')
+    p.set_defaults(func=cmd_profiles)
+
+    p = sub.add_parser('export-docx', help="Fragen als Word-Dokument exportieren")
+    p.add_argument('db')
+    p.add_argument('output')
+    p.add_argument('--jobs', type=int, help="Anzahl paralleler Render-Prozesse (Standard: alle Kerne, 1 = seriell)")
+    _add_selection_arguments(p)
+    p.set_defaults(func=cmd_export_docx)
+
+    p = sub.add_parser('variants', help="Gemischte Prüfungsvarianten (Word, optional XML) plus Lösungsblatt")
+    p.add_argument('db')
+    p.add_argument('output', help="Basisname, z.B. pruefung.docx -> pruefung_A.docx, ...")
+    p.add_argument('--count', type=int, default=4, help="Anzahl Varianten")
+    p.add_argument('--seed', help="gleicher Seed = gleiche Varianten (Standard: zufällig)")
+    p.add_argument('--xml', action='store_true', help="zusätzlich je Variante Moodle XML schreiben")
+    p.add_argument('--keep-question-order', action='store_true', help="Fragen nicht mischen")
+    p.add_argument('--keep-answer-order', action='store_true', help="Antworten nicht mischen")
+    _add_selection_arguments(p)
+    p.set_defaults(func=cmd_variants)
+
+    p = sub.add_parser('search', help="Volltextsuche")
+    p.add_argument('db')
+    p.add_argument('text')
+    p.add_argument('--limit', type=int, default=20)
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser('dedupe', help="Fragen mit gleichem Inhalt zusammenführen")
+    p.add_argument('db')
+    p.set_defaults(func=cmd_dedupe)
+
+    p = sub.add_parser('undo', help="Letzte Änderung (Löschen, Tags, Dedupe, ...) rückgängig machen")
+    p.add_argument('db')
+    p.set_defaults(func=cmd_undo)
+
+    p = sub.add_parser('redo', help="Zuletzt rückgängig gemachte Änderung wiederholen")
+    p.add_argument('db')
+    p.set_defaults(func=cmd_undo)
+
+    p = sub.add_parser('stats', help="Kennzahlen der Datenbank")
+    p.add_argument('db')
+    p.add_argument('--top-tags', type=int, default=10)
+    p.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
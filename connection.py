@@ -0,0 +1,104 @@
+import os
+import sqlite3
+import threading
+import weakref
+
+# Einstellungen für jede Verbindung
+CACHE_SIZE_KIB = 64 * 1024          # Seiten-Cache pro Verbindung (64 MB)
+MMAP_SIZE = 256 * 1024 * 1024       # Datei bis 256 MB per mmap lesen
+BUSY_TIMEOUT_MS = 5000              # Warten statt "database is locked"
+STATEMENT_CACHE_SIZE = 256          # vorbereitete Statements pro Verbindung
+
+_lock = threading.Lock()
+_thread_connections = []            # {Pfad: Verbindung} je lebendem Thread, für close_connections
+
+
+class _ThreadAlive:
+    """Lebt genau so lange wie die threading.local-Daten seines Threads"""
+
+
+class _ThreadConnections(threading.local):
+    """Verbindungen des aktuellen Threads.
+
+    Endet ein Thread (auch ein Worker-Thread des QThreadPool), gibt Python
+    seine threading.local-Daten frei. Der Finalizer schließt dann dessen
+    Verbindungen, damit keine Verbindungen und Dateihandles toter Threads
+    offen bleiben.
+    """
+
+    def __init__(self):
+        self.connections = {}
+        self.alive = _ThreadAlive()
+        with _lock:
+            _thread_connections.append(self.connections)
+        weakref.finalize(self.alive, _close_thread_connections, self.connections)
+
+
+def _close_thread_connections(connections):
+    with _lock:
+        _thread_connections[:] = [other for other in _thread_connections if other is not connections]
+        closing = list(connections.values())
+        connections.clear()
+    for conn in closing:
+        conn.close()
+
+
+_local = _ThreadConnections()
+
+
+def _key(db_path):
+    return os.path.abspath(db_path)
+
+
+def _is_open(conn):
+    try:
+        conn.total_changes
+        return True
+    except sqlite3.ProgrammingError:
+        return False
+
+
+def _open(db_path):
+    """Öffnet eine neue Verbindung und setzt die PRAGMAs"""
+    conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def get_connection(db_path):
+    """Liefert die langlebige Verbindung des aktuellen Threads zu db_path.
+
+    Jeder Thread (GUI und Hintergrund-Worker) bekommt pro Datenbankdatei
+    genau eine Verbindung, die beim ersten Zugriff geöffnet und danach
+    wiederverwendet wird. Dank WAL-Modus blockieren lesende Worker den
+    schreibenden GUI-Thread nicht.
+    """
+    connections = _local.connections
+    key = _key(db_path)
+    conn = connections.get(key)
+    # Mit close_connections geschlossene Verbindungen neu öffnen
+    if conn is None or not _is_open(conn):
+        conn = _open(key)
+        with _lock:
+            connections[key] = conn
+    return conn
+
+
+def close_connections(db_path=None):
+    """Schließt alle Verbindungen zu db_path (bzw. alle) aus allen Threads.
+
+    Nötig bevor eine Datenbankdatei gelöscht oder ersetzt wird. Darf nur
+    aufgerufen werden, wenn keine Hintergrundarbeit mehr auf der DB läuft.
+    Verbindungen beendeter Threads sind bereits geschlossen.
+    """
+    key = _key(db_path) if db_path else None
+    with _lock:
+        for connections in _thread_connections:
+            for path in [path for path in connections if key is None or path == key]:
+                connections.pop(path).close()
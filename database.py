@@ -1,10 +1,77 @@
 import sqlite3
+import hashlib
 import os
-import xml.etree.ElementTree as ET
+import re
+import time
+from contextlib import contextmanager
+from itertools import groupby
+
+from connection import get_connection
+
+# Anzahl Fragen pro executemany-Batch beim Streaming-Import
+IMPORT_BATCH_SIZE = 1000
+
+# Anzahl IDs pro "IN (...)"-Abfrage (SQLite erlaubt je nach Version nur 999 Parameter)
+QUERY_CHUNK_SIZE = 500
+
+# Umgang mit Fragen, deren Inhalts-Hash beim Import schon in der DB vorkommt:
+# "skip" = nicht importieren, "update" = bestehende Frage überschreiben,
+# "duplicate" = trotzdem als neue Frage anlegen (früheres Verhalten)
+DUPLICATE_POLICIES = ('skip', 'update', 'duplicate')
+DEFAULT_DUPLICATE_POLICY = 'skip'
+
+# Fragetypen, die Oberfläche und Exporter kennen
+QUESTION_TYPES = ('multichoice', 'shortanswer', 'essay')
+
+# Aufbewahrung im Änderungsjournal (undo/redo): höchstens so viele Einträge,
+# so viele Fragen-Abbilder insgesamt und nicht älter als so viele Tage.
+# Der jeweils neueste Eintrag bleibt immer erhalten.
+JOURNAL_MAX_ENTRIES = 100
+JOURNAL_MAX_QUESTIONS = 100_000
+JOURNAL_MAX_AGE_DAYS = 30
+
+# #Tag bzw. #"Tag mit Leerzeichen" in der Sucheingabe = exakter Tag-Filter
+SEARCH_TAG_PATTERN = re.compile(r'#"([^"]+)"|#([^\s#"]+)')
+
+
+class InvalidMoodleXML(Exception):
+    """Die Datei ist gültiges XML, aber kein Moodle-Quiz"""
+
+
+class OperationCancelled(Exception):
+    """Import/Export wurde über is_cancelled() abgebrochen (Transaktion zurückgerollt)"""
+
+
+# Beobachter für Änderungen an einzelnen Fragen: callback(db_path, question_ids)
+_change_listeners = []
+
+
+def add_change_listener(callback):
+    """Meldet callback(db_path, question_ids) nach jeder Änderung an, die im Journal landet.
+
+    question_ids enthält angelegte, geänderte und gelöschte Fragen; ob eine
+    Frage noch existiert, prüft der Empfänger selbst. Der Aufruf erfolgt
+    nach dem Commit im Thread der Änderung. Importe melden nichts, danach
+    wird ohnehin alles neu geladen.
+    """
+    _change_listeners.append(callback)
+
+
+def remove_change_listener(callback):
+    if callback in _change_listeners:
+        _change_listeners.remove(callback)
+
+
+def notify_question_changes(db_path, question_ids):
+    """Benachrichtigt alle Beobachter über geänderte Fragen (nach dem Commit aufrufen)"""
+    question_ids = list(question_ids)
+    if question_ids:
+        for callback in list(_change_listeners):
+            callback(db_path, question_ids)
 
 def init_database_schema(db_path):
     """Erstellt die Tabellen falls nicht vorhanden"""
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     c = conn.cursor()
     
     # Prüfen ob question_type Spalte existiert
@@ -32,71 +99,1171 @@ def init_database_schema(db_path):
         is_correct INTEGER DEFAULT 0,
         FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
     )''')
+
+    # Volltextindex für die Live-Suche
+    _create_search_index(c)
     conn.commit()
-    conn.close()
 
-def get_questions_overview(db_path):
-    """Liefert Übersicht: ID, Titel, Punkte, Tags, Anzahl Antworten"""
-    conn = sqlite3.connect(db_path)
+    # Versionierte Migrationen (PRAGMA user_version)
+    _apply_migrations(conn)
+
+
+def _migration_answer_indexes(c):
+    """Index für Antwort-Abfragen je Frage; verwaiste Antworten einmalig entfernen"""
+    # Vor dem Aktivieren von foreign_keys hat ON DELETE CASCADE nie gegriffen
+    c.execute("DELETE FROM answers WHERE question_id NOT IN (SELECT id FROM questions)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_answers_question_id ON answers (question_id, id)")
+
+
+def _migration_content_hash(c):
+    """Spalte content_hash samt Index für die Duplikaterkennung; Hashes einmalig berechnen"""
+    c.execute("PRAGMA table_info(questions)")
+    if 'content_hash' not in [column[1] for column in c.fetchall()]:
+        c.execute("ALTER TABLE questions ADD COLUMN content_hash TEXT")
+    c.execute("SELECT id FROM questions WHERE content_hash IS NULL")
+    for chunk in _chunks([row[0] for row in c.fetchall()], QUERY_CHUNK_SIZE):
+        _schema2_refresh_hashes(c, chunk)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_questions_content_hash ON questions (content_hash)")
+
+
+def _schema2_refresh_hashes(c, question_ids):
+    """Hash-Berechnung für Migration 2, liest nur Spalten, die es bei Schema-Version 2 schon gibt.
+
+    Nicht durch load_questions ersetzen: das liest auch Spalten späterer
+    Migrationen (fraction, raw_xml, version) und scheitert an alten Datenbanken.
+    """
+    placeholders = ",".join("?" * len(question_ids))
+    c.execute(f"SELECT id, title, questiontext, question_type FROM questions WHERE id IN ({placeholders})",
+              question_ids)
+    questions = {qid: (title, questiontext, question_type, []) for qid, title, questiontext, question_type
+                 in c.fetchall()}
+    c.execute(f"""SELECT question_id, answertext, is_correct FROM answers
+                  WHERE question_id IN ({placeholders}) ORDER BY question_id, id""", question_ids)
+    for qid, answertext, is_correct in c.fetchall():
+        if qid in questions:
+            questions[qid][3].append((answertext, is_correct))
+    c.executemany("UPDATE questions SET content_hash=? WHERE id=?",
+                  [(question_hash(*question), qid) for qid, question in questions.items()])
+
+
+def _migration_tags(c):
+    """Tabellen tags/question_tags (invertierter Index Tag -> Fragen) aus questions.tags aufbauen"""
+    c.execute('''CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS question_tags (
+        tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+        question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+        PRIMARY KEY (tag_id, question_id)
+    ) WITHOUT ROWID''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_question_tags_question_id ON question_tags (question_id)")
+    c.execute("SELECT id FROM questions WHERE tags != ''")
+    refresh_question_tags(c, [row[0] for row in c.fetchall()])
+
+
+def _migration_journal(c):
+    """Änderungsjournal: je Vorgang ein Eintrag, je betroffener Frage ein Vorher-Abbild (JSON).
+
+    after_image wird erst beim Rückgängigmachen gefüllt und für redo gebraucht.
+    """
+    c.execute('''CREATE TABLE IF NOT EXISTS journal (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at REAL NOT NULL,
+        description TEXT NOT NULL,
+        question_count INTEGER NOT NULL DEFAULT 0,
+        undone INTEGER NOT NULL DEFAULT 0
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS journal_rows (
+        journal_id INTEGER NOT NULL REFERENCES journal(id) ON DELETE CASCADE,
+        question_id INTEGER NOT NULL,
+        before_image TEXT,
+        after_image TEXT,
+        PRIMARY KEY (journal_id, question_id)
+    ) WITHOUT ROWID''')
+
+
+def _migration_question_types(c):
+    """Spalten für weitere Moodle-Fragetypen: Teilpunkte je Antwort und Original-XML"""
+    if 'fraction' not in _table_columns(c, 'answers'):
+        # Bewertung in Prozent wie im Moodle XML; NULL = 100 bzw. 0 je nach is_correct
+        c.execute("ALTER TABLE answers ADD COLUMN fraction REAL")
+    if 'raw_xml' not in _table_columns(c, 'questions'):
+        # Vollständiges <question>-Element für Typen, die nicht in Spalten abgebildet werden
+        c.execute("ALTER TABLE questions ADD COLUMN raw_xml TEXT")
+
+
+def _migration_render_cache(c):
+    """Zeilenversion je Frage und Cache für die gerenderten <question>-Fragmente.
+
+    Ein Cache-Eintrag gilt nur für die Version und den Renderer, mit denen er
+    erzeugt wurde. Jede Änderung an der Frage erhöht questions.version per
+    Trigger (Anweisungen, die version selbst hochzählen, überspringt er);
+    Änderungen an Antworten löschen den Eintrag direkt, das ist billiger
+    als die Frage-Zeile bei jeder Antwort neu zu schreiben.
+    """
+    if 'version' not in _table_columns(c, 'questions'):
+        c.execute("ALTER TABLE questions ADD COLUMN version INTEGER DEFAULT 1")
+    c.execute('''CREATE TABLE IF NOT EXISTS render_cache (
+        question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+        version INTEGER NOT NULL,
+        renderer INTEGER NOT NULL,
+        xml BLOB NOT NULL
+    )''')
+    # content_hash zählt nicht, sonst würde jeder Hash-Abgleich die Version erhöhen
+    c.execute('''CREATE TRIGGER IF NOT EXISTS questions_version_update
+        AFTER UPDATE OF title, questiontext, single, tags, points, question_type, raw_xml ON questions
+        WHEN new.version IS old.version BEGIN
+        UPDATE questions SET version = COALESCE(old.version, 0) + 1 WHERE id = new.id;
+    END''')
+    for event, question_ids in (('insert', 'new.question_id'), ('delete', 'old.question_id'),
+                                ('update', 'old.question_id, new.question_id')):
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS answers_render_cache_{event} AFTER {event.upper()} ON answers BEGIN
+            DELETE FROM render_cache WHERE question_id IN ({question_ids});
+        END''')
+
+
+# Aktuelle Zeit in SQL als Unix-Zeitstempel, wie time.time() auf der Python-Seite
+SQL_NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+
+
+def _migration_timestamps(c):
+    """Anlage- und Änderungszeit je Frage sowie Exportprofile für Delta-Exporte.
+
+    updated_at wird im selben Trigger wie version gesetzt; Anweisungen, die
+    version selbst hochzählen, setzen auch updated_at selbst. Bestehende
+    Fragen behalten NULL (Zeitpunkt unbekannt) und zählen erst nach ihrer
+    nächsten Änderung als geändert.
+    """
+    columns = _table_columns(c, 'questions')
+    for column in ('created_at', 'updated_at'):
+        if column not in columns:
+            c.execute(f"ALTER TABLE questions ADD COLUMN {column} REAL")
+    # Delta-Export: Bereichsabfrage updated_at >= letzter Lauf, Kosten proportional zu den Änderungen
+    c.execute("CREATE INDEX IF NOT EXISTS idx_questions_updated_at ON questions (updated_at)")
+    c.execute("DROP TRIGGER IF EXISTS questions_version_update")
+    c.execute(f'''CREATE TRIGGER questions_version_update
+        AFTER UPDATE OF title, questiontext, single, tags, points, question_type, raw_xml ON questions
+        WHEN new.version IS old.version BEGIN
+        UPDATE questions SET version = COALESCE(old.version, 0) + 1, updated_at = {SQL_NOW} WHERE id = new.id;
+    END''')
+    # Einfügungen ohne Zeitstempel (Dialog, Duplizieren); der Import setzt beide Spalten selbst
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS questions_timestamps_insert
+        AFTER INSERT ON questions WHEN new.updated_at IS NULL BEGIN
+        UPDATE questions SET created_at = COALESCE(new.created_at, {SQL_NOW}), updated_at = {SQL_NOW}
+        WHERE id = new.id;
+    END''')
+    c.execute('''CREATE TABLE IF NOT EXISTS export_profiles (
+        name TEXT PRIMARY KEY COLLATE NOCASE,
+        last_export REAL NOT NULL
+    )''')
+
+
+def _migration_raw_xml_hashes(c):
+    """content_hash von Fragen mit Original-XML neu berechnen (Einstellungen aus dem XML gehören dazu)"""
+    c.execute("SELECT id FROM questions WHERE raw_xml IS NOT NULL")
+    for chunk in _chunks([row[0] for row in c.fetchall()], QUERY_CHUNK_SIZE):
+        placeholders = ",".join("?" * len(chunk))
+        # Nur Spalten lesen, die es bei Schema-Version 8 gibt (nicht load_questions, siehe Migration 2)
+        c.execute(f"""SELECT id, title, questiontext, question_type, raw_xml FROM questions
+                      WHERE id IN ({placeholders})""", chunk)
+        questions = {qid: (title, questiontext, question_type, [], raw_xml)
+                     for qid, title, questiontext, question_type, raw_xml in c.fetchall()}
+        c.execute(f"""SELECT question_id, answertext, is_correct, fraction FROM answers
+                      WHERE question_id IN ({placeholders}) ORDER BY question_id, id""", chunk)
+        for qid, answertext, is_correct, fraction in c.fetchall():
+            questions[qid][3].append((answertext, is_correct, fraction))
+        c.executemany("UPDATE questions SET content_hash=? WHERE id=?",
+                      [(question_hash(*question), qid) for qid, question in questions.items()])
+
+
+# Schema-Migrationen in Reihenfolge; Position + 1 = user_version danach.
+# Neue Migrationen nur hinten anhängen, bestehende nie ändern.
+MIGRATIONS = [
+    _migration_answer_indexes,
+    _migration_content_hash,
+    _migration_tags,
+    _migration_journal,
+    _migration_question_types,
+    _migration_render_cache,
+    _migration_timestamps,
+    _migration_raw_xml_hashes,
+]
+
+
+def schema_version(db_path):
+    """Aktuelle Schema-Version der Datenbank (PRAGMA user_version)"""
+    return get_connection(db_path).execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply_migrations(conn):
+    """Führt alle noch fehlenden Migrationen aus, jede in einer eigenen Transaktion"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            migration(c)
+            c.execute(f"PRAGMA user_version = {number}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def _create_search_index(c):
+    """Legt den FTS5-Volltextindex samt Triggern an und füllt ihn beim ersten Mal.
+
+    Ohne FTS5-Unterstützung in SQLite wird nichts angelegt, search_questions
+    fällt dann auf eine LIKE-Suche zurück.
+    """
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='questions_fts'")
+    exists = c.fetchone() is not None
+    try:
+        c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+            title, tags, questiontext,
+            content='questions', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )''')
+    except sqlite3.OperationalError:
+        return
+
+    c.execute('''CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO questions_fts (rowid, title, tags, questiontext)
+        VALUES (new.id, new.title, new.tags, new.questiontext);
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN
+        INSERT INTO questions_fts (questions_fts, rowid, title, tags, questiontext)
+        VALUES ('delete', old.id, old.title, old.tags, old.questiontext);
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS questions_fts_update AFTER UPDATE OF title, tags, questiontext ON questions BEGIN
+        INSERT INTO questions_fts (questions_fts, rowid, title, tags, questiontext)
+        VALUES ('delete', old.id, old.title, old.tags, old.questiontext);
+        INSERT INTO questions_fts (rowid, title, tags, questiontext)
+        VALUES (new.id, new.title, new.tags, new.questiontext);
+    END''')
+
+    # Bestehende Datenbank (Migration): Index einmalig aus questions aufbauen
+    if not exists:
+        c.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+
+def get_questions_overview(db_path, with_text=False):
+    """Liefert Übersicht: ID, Titel, Punkte, Tags, Anzahl Antworten
+
+    Mit with_text=True wird zusätzlich der Fragetext als sechste Spalte in
+    derselben Abfrage geliefert (statt einer Abfrage pro Frage).
+    """
+    text_column = ", q.questiontext" if with_text else ""
+    c = get_connection(db_path).cursor()
+    c.execute(f"SELECT q.id, q.title, q.points, q.tags, COUNT(a.id){text_column} FROM questions q LEFT JOIN answers a ON q.id=a.question_id GROUP BY q.id")
+    return c.fetchall()
+
+
+# Länge der Fragetext-Vorschau in der Übersicht; längere Texte werden mit "..." gekürzt
+PREVIEW_LENGTH = 80
+
+# Vorschau des Fragetexts in SQL (in Python: _preview in overview_store.py)
+PREVIEW_SQL = f"""CASE WHEN length(q.questiontext) > {PREVIEW_LENGTH}
+                       THEN substr(q.questiontext, 1, {PREVIEW_LENGTH}) || '...'
+                       ELSE q.questiontext END"""
+
+# Spalten einer Übersichtszeile: ID, Titel, Punkte, Tags, Anzahl Antworten, Vorschau
+OVERVIEW_COLUMNS = f"q.id, q.title, q.points, q.tags, COUNT(a.id), {PREVIEW_SQL}"
+
+
+def get_questions_page(db_path, after_id=0, limit=500):
+    """Eine Seite der Übersicht für die Tabellenanzeige (nach ID sortiert).
+
+    Liefert ID, Titel, Punkte, Tags, Anzahl Antworten und eine auf 80 Zeichen
+    gekürzte Vorschau des Fragetexts für alle Fragen mit ID > after_id.
+    Das Nachladen über after_id statt OFFSET kostet pro Seite gleich viel.
+    """
+    c = get_connection(db_path).cursor()
+    c.execute(f"""SELECT {OVERVIEW_COLUMNS}
+                  FROM (SELECT * FROM questions WHERE id > ? ORDER BY id LIMIT ?) q
+                  LEFT JOIN answers a ON a.question_id = q.id
+                  GROUP BY q.id ORDER BY q.id""", (after_id, limit))
+    return c.fetchall()
+
+
+def get_overview_rows(db_path, question_ids):
+    """Übersichtszeilen wie get_questions_page für einzelne Fragen, als {ID: Zeile}.
+
+    Nicht (mehr) vorhandene Fragen fehlen im Ergebnis.
+    """
+    c = get_connection(db_path).cursor()
+    rows = {}
+    for chunk in _chunks(list(question_ids), QUERY_CHUNK_SIZE):
+        c.execute(f"""SELECT {OVERVIEW_COLUMNS}
+                      FROM questions q LEFT JOIN answers a ON a.question_id = q.id
+                      WHERE q.id IN ({",".join("?" * len(chunk))})
+                      GROUP BY q.id""", chunk)
+        rows.update((row[0], row) for row in c.fetchall())
+    return rows
+
+
+def get_question_text(db_path, question_id):
+    """Vollständiger Fragetext einer Frage (die Übersicht hält nur eine Vorschau)"""
+    c = get_connection(db_path).cursor()
+    c.execute("SELECT questiontext FROM questions WHERE id=?", (question_id,))
+    row = c.fetchone()
+    return (row[0] or "") if row else ""
+
+
+def _has_search_index(c):
+    """Prüft ob der FTS5-Volltextindex existiert"""
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='questions_fts'")
+    return c.fetchone() is not None
+
+
+def _fts_query(text):
+    """Baut aus der Sucheingabe eine FTS5-Abfrage: jedes Wort als Präfix, alle Wörter müssen vorkommen"""
+    return " ".join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def _like_pattern(text):
+    """LIKE-Muster für eine Teilstring-Suche (mit \\ als Escape-Zeichen)"""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _split_search_text(text):
+    """Trennt #Tag bzw. #"Tag mit Leerzeichen" von der Sucheingabe; gibt (Suchtext, Tags) zurück"""
+    tags = [quoted or plain for quoted, plain in SEARCH_TAG_PATTERN.findall(text)]
+    return SEARCH_TAG_PATTERN.sub(" ", text).strip(), tags
+
+
+def _search_conditions(text, tags, question_ids=None):
+    """WHERE-Klausel der Teilstring-Suche (ohne FTS5) samt Tag- und ID-Filter; gibt (SQL, Parameter) zurück"""
+    conditions = []
+    params = []
+    if text:
+        conditions.append("(title LIKE ? ESCAPE '\\' OR tags LIKE ? ESCAPE '\\' OR questiontext LIKE ? ESCAPE '\\')")
+        params.extend([_like_pattern(text)] * 3)
+    if tags:
+        subquery, tag_params = _tag_filter(tags)
+        conditions.append(f"id IN ({subquery})")
+        params.extend(tag_params)
+    if question_ids is not None:
+        conditions.append(f"id IN ({','.join('?' * len(question_ids))})")
+        params.extend(question_ids)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+@contextmanager
+def _cancellable(conn, is_cancelled):
+    """Bricht laufende Abfragen ab (sqlite3.OperationalError), sobald is_cancelled() True liefert"""
+    if is_cancelled is None:
+        yield
+        return
+    conn.set_progress_handler(lambda: 1 if is_cancelled() else 0, 10000)
+    try:
+        yield
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+def search_questions(db_path, text, limit=None, offset=0, is_cancelled=None, question_ids=None):
+    """Volltextsuche über Titel, Tags und Fragetext.
+
+    Liefert wie get_questions_page ID, Titel, Punkte, Tags und Anzahl
+    Antworten, dazu als sechste Spalte einen Ausschnitt des Fragetexts mit
+    »markierten« Treffern. Sortiert nach Relevanz (Treffer im Titel zählen
+    am meisten). limit/offset erlauben seitenweises Nachladen.
+    #Tag im Suchtext filtert exakt nach diesem Tag (über question_tags).
+    question_ids beschränkt die Suche auf diese Fragen.
+    """
+    conn = get_connection(db_path)
     c = conn.cursor()
-    c.execute("SELECT q.id, q.title, q.points, q.tags, COUNT(a.id) FROM questions q LEFT JOIN answers a ON q.id=a.question_id GROUP BY q.id")
-    rows = c.fetchall()
-    conn.close()
+    text, tags = _split_search_text(text)
+    match = _fts_query(text)
+    limit = -1 if limit is None else limit
+
+    with _cancellable(conn, is_cancelled):
+        if match and _has_search_index(c):
+            filter_condition, filter_params = "", []
+            if tags:
+                subquery, filter_params = _tag_filter(tags)
+                filter_condition = f" AND rowid IN ({subquery})"
+            if question_ids is not None:
+                filter_condition += f" AND rowid IN ({','.join('?' * len(question_ids))})"
+                filter_params = [*filter_params, *question_ids]
+            c.execute(f"""WITH hits AS (
+                              SELECT rowid AS id,
+                                     bm25(questions_fts, 10.0, 5.0, 1.0) AS score,
+                                     snippet(questions_fts, 2, '»', '«', '…', 16) AS snippet
+                              FROM questions_fts WHERE questions_fts MATCH ?{filter_condition}
+                              ORDER BY score LIMIT ? OFFSET ?
+                          )
+                          SELECT q.id, q.title, q.points, q.tags, COUNT(a.id), hits.snippet
+                          FROM hits JOIN questions q ON q.id = hits.id
+                          LEFT JOIN answers a ON a.question_id = q.id
+                          GROUP BY q.id ORDER BY hits.score""", (match, *filter_params, limit, offset))
+        else:
+            # Fallback ohne FTS5, für Eingaben ohne Wortzeichen oder nur #Tags: Teilstring-Suche
+            where, params = _search_conditions(text, tags, question_ids)
+            c.execute(f"""SELECT {OVERVIEW_COLUMNS}
+                          FROM (SELECT * FROM questions{where}
+                                ORDER BY id LIMIT ? OFFSET ?) q
+                          LEFT JOIN answers a ON a.question_id = q.id
+                          GROUP BY q.id ORDER BY q.id""", (*params, limit, offset))
+        return c.fetchall()
+
+
+def get_search_rows(db_path, text, question_ids):
+    """Suchtreffer wie search_questions für einzelne Fragen, als {ID: Zeile}.
+
+    Fragen, die nicht (mehr) vorhanden sind oder nicht zur Suche passen,
+    fehlen im Ergebnis.
+    """
+    rows = {}
+    for chunk in _chunks(list(question_ids), QUERY_CHUNK_SIZE):
+        rows.update((row[0], row) for row in search_questions(db_path, text, question_ids=chunk))
     return rows
 
+
+def count_questions(db_path, text=None, is_cancelled=None):
+    """Anzahl aller Fragen bzw. (mit text) der Suchtreffer"""
+    conn = get_connection(db_path)
+    c = conn.cursor()
+    text, tags = _split_search_text(text or "")
+    match = _fts_query(text)
+    with _cancellable(conn, is_cancelled):
+        if match and _has_search_index(c):
+            tag_condition, tag_params = "", []
+            if tags:
+                subquery, tag_params = _tag_filter(tags)
+                tag_condition = f" AND rowid IN ({subquery})"
+            c.execute(f"SELECT COUNT(*) FROM questions_fts WHERE questions_fts MATCH ?{tag_condition}",
+                      (match, *tag_params))
+        else:
+            where, params = _search_conditions(text, tags)
+            c.execute(f"SELECT COUNT(*) FROM questions{where}", params)
+        return c.fetchone()[0]
+
+
+def select_question_ids(db_path, tags=None, id_from=None, id_to=None, query=None, any_tags=None,
+                        changed_since=None):
+    """IDs aller Fragen, die allen angegebenen Filtern entsprechen (nach ID sortiert).
+
+    tags: Liste von Tags, die alle exakt vorkommen müssen (ohne Groß/Klein),
+    any_tags: Liste von Tags, von denen mindestens einer vorkommen muss,
+    id_from/id_to: ID-Bereich inklusive Grenzen, query: Volltextsuche,
+    changed_since: nur Fragen, die seit diesem Zeitstempel angelegt oder
+    geändert wurden (über idx_questions_updated_at).
+    """
+    c = get_connection(db_path).cursor()
+    conditions = []
+    params = []
+    for tag_list, match_all in ((tags, True), (any_tags, False)):
+        if tag_list:
+            subquery, tag_params = _tag_filter(tag_list, match_all)
+            conditions.append(f"q.id IN ({subquery})")
+            params.extend(tag_params)
+    if id_from is not None:
+        conditions.append("q.id >= ?")
+        params.append(id_from)
+    if id_to is not None:
+        conditions.append("q.id <= ?")
+        params.append(id_to)
+    if query:
+        match = _fts_query(query)
+        if match and _has_search_index(c):
+            conditions.append("q.id IN (SELECT rowid FROM questions_fts WHERE questions_fts MATCH ?)")
+            params.append(match)
+        else:
+            conditions.append("(q.title LIKE ? ESCAPE '\\' OR q.tags LIKE ? ESCAPE '\\' "
+                              "OR q.questiontext LIKE ? ESCAPE '\\')")
+            params.extend([_like_pattern(query)] * 3)
+    if changed_since is not None:
+        # Ohne ANALYZE schätzt SQLite den Bereich zu groß und scannt lieber nach id;
+        # der Hinweis "meist wenige Treffer" lässt es den updated_at-Index nehmen
+        conditions.append("likelihood(q.updated_at >= ?, 0.01)")
+        params.append(changed_since)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    c.execute(f"SELECT q.id FROM questions q{where} ORDER BY q.id", params)
+    return [row[0] for row in c.fetchall()]
+
+
+def get_statistics(db_path):
+    """Kennzahlen der Datenbank für Übersichten (Anzahl Fragen, Antworten, Typen, Tags)"""
+    c = get_connection(db_path).cursor()
+    c.execute("SELECT COUNT(*), COALESCE(SUM(points), 0) FROM questions")
+    question_count, total_points = c.fetchone()
+    c.execute("SELECT COUNT(*) FROM answers")
+    answer_count = c.fetchone()[0]
+    c.execute("SELECT COALESCE(question_type, 'multichoice'), COUNT(*) FROM questions GROUP BY 1 ORDER BY 2 DESC")
+    by_type = dict(c.fetchall())
+    return {
+        'questions': question_count,
+        'answers': answer_count,
+        'total_points': total_points,
+        'by_type': by_type,
+        'tags': dict(get_tag_counts(db_path)),
+        'schema_version': schema_version(db_path),
+    }
+
+
+def _chunks(items, size):
+    """Teilt eine Liste in aufeinanderfolgende Blöcke der Größe size"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def load_questions(c, question_ids):
+    """Lädt Fragen inkl. Antworten mit je einer Abfrage für Fragen und Antworten.
+
+    Gibt ein Dict {id: Datensatz} zurück; nicht vorhandene IDs fehlen darin.
+    Antworten sind Tupel (Text, is_correct, fraction), fraction ist None
+    bei voller bzw. keiner Punktzahl.
+    question_ids darf höchstens QUERY_CHUNK_SIZE Einträge haben.
+    """
+    ids = list(dict.fromkeys(question_ids))
+    if not ids:
+        return {}
+    placeholders = ",".join("?" * len(ids))
+
+    c.execute(f"""SELECT id, title, questiontext, single, tags, points, question_type, raw_xml, version
+                  FROM questions WHERE id IN ({placeholders})""", ids)
+    records = {}
+    for qid, title, questiontext, single, tags, points, question_type, raw_xml, version in c.fetchall():
+        records[qid] = {
+            'id': qid,
+            'title': title,
+            'questiontext': questiontext,
+            'single': single,
+            'tags': tags or '',
+            'points': points,
+            'question_type': question_type or 'multichoice',
+            'raw_xml': raw_xml,
+            'version': version,
+            'answers': [],
+        }
+
+    c.execute(f"""SELECT question_id, answertext, is_correct, fraction FROM answers
+                  WHERE question_id IN ({placeholders}) ORDER BY question_id, id""", ids)
+    for qid, answertext, is_correct, fraction in c.fetchall():
+        if qid in records:
+            records[qid]['answers'].append((answertext, is_correct, fraction))
+    return records
+
+
+def _normalize_text(text):
+    """Leerraum vereinheitlichen (Zeilenumbrüche, Einrückung, Ränder)"""
+    return " ".join((text or "").split())
+
+
+# Kinder von <question>, die aus den Spalten kommen bzw. nicht zum Inhalt zählen
+RAW_XML_HASH_IGNORED = ('name', 'questiontext', 'defaultgrade', 'tags')
+
+
+def _canonical_raw_xml(raw_xml):
+    """Original-XML in kanonischer Form (C14N) ohne die Felder aus RAW_XML_HASH_IGNORED"""
+    import xml.etree.ElementTree as ET
+    try:
+        question = ET.fromstring(raw_xml)
+    except ET.ParseError:
+        return _normalize_text(raw_xml)
+    for child in [child for child in question if child.tag in RAW_XML_HASH_IGNORED]:
+        question.remove(child)
+    return ET.canonicalize(ET.tostring(question, encoding='unicode'), strip_text=True)
+
+
+def question_hash(title, questiontext, question_type, answers, raw_xml=None):
+    """Inhalts-Hash einer Frage aus Titel, Fragetext, Typ und Antworten.
+
+    Leerraum und die Reihenfolge der Antworten spielen keine Rolle, Tags
+    und Punkte gehören nicht zum Inhalt. Antworten sind (Text, is_correct)
+    oder (Text, is_correct, fraction); Teilpunkte gehen nur in den Hash ein,
+    wenn sie gesetzt sind, bestehende Hashes bleiben also gültig. Bei Typen
+    mit Original-XML zählen auch dessen Einstellungen (Toleranzen,
+    Drag-and-drop-Felder, ...) zum Inhalt.
+    """
+    answer_parts = []
+    for answer in answers:
+        part = f"{1 if answer[1] else 0}:{_normalize_text(answer[0])}"
+        if len(answer) > 2 and answer[2] is not None:
+            part += f"@{answer[2]!r}"
+        answer_parts.append(part)
+    parts = [_normalize_text(title), _normalize_text(questiontext), question_type or 'multichoice']
+    parts.extend(sorted(answer_parts))
+    if raw_xml:
+        parts.append(_canonical_raw_xml(raw_xml))
+    return hashlib.sha1("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+def _record_hash(record):
+    return question_hash(record['title'], record['questiontext'],
+                         record.get('question_type', 'multichoice'), record['answers'], record.get('raw_xml'))
+
+
+def refresh_content_hashes(c, question_ids):
+    """Berechnet content_hash der angegebenen Fragen neu (nach jeder Änderung aufrufen)"""
+    for chunk in _chunks(list(question_ids), QUERY_CHUNK_SIZE):
+        records = load_questions(c, chunk)
+        c.executemany("UPDATE questions SET content_hash=? WHERE id=?",
+                      [(_record_hash(record), qid) for qid, record in records.items()])
+
+
+def _tag_key(tag):
+    """Vergleichsschlüssel wie COLLATE NOCASE in SQLite (nur A-Z ohne Groß-/Kleinschreibung)"""
+    return tag.lower() if tag.isascii() else tag.encode().lower().decode()
+
+
+def split_tags(tags):
+    """Kommagetrennter Tag-String -> Liste ohne Leerzeichen, leere Einträge und Doppelte"""
+    result = []
+    seen = set()
+    for tag in (tags or '').split(','):
+        tag = tag.strip()
+        key = _tag_key(tag)
+        if tag and key not in seen:
+            seen.add(key)
+            result.append(tag)
+    return result
+
+
+def join_tags(tags):
+    """Liste von Tags -> kommagetrennter String für questions.tags"""
+    return ",".join(split_tags(",".join(tags)))
+
+
+def _store_question_tags(c, tagged_questions, replace=True):
+    """Schreibt question_tags für [(Frage-ID, Tag-String), ...]; replace=False nur für neue Fragen"""
+    tagged_questions = list(tagged_questions)
+    if replace:
+        c.executemany("DELETE FROM question_tags WHERE question_id=?", [(qid,) for qid, _ in tagged_questions])
+    links = [(qid, tag) for qid, tags in tagged_questions for tag in split_tags(tags)]
+    names = list(dict.fromkeys(tag for _, tag in links))
+    # Neue Tags anlegen; bei geänderter Groß-/Kleinschreibung gilt die zuletzt gespeicherte
+    c.executemany("""INSERT INTO tags (name) VALUES (?)
+                     ON CONFLICT (name) DO UPDATE SET name=excluded.name
+                     WHERE name != excluded.name COLLATE BINARY""", [(name,) for name in names])
+    tag_ids = {}
+    for chunk in _chunks(names, QUERY_CHUNK_SIZE):
+        c.execute(f"SELECT name, id FROM tags WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+        tag_ids.update((_tag_key(name), tag_id) for name, tag_id in c.fetchall())
+    c.executemany("INSERT OR IGNORE INTO question_tags (tag_id, question_id) VALUES (?, ?)",
+                  [(tag_ids[_tag_key(tag)], qid) for qid, tag in links])
+
+
+def refresh_question_tags(c, question_ids):
+    """Überträgt questions.tags der angegebenen Fragen nach tags/question_tags (nach jeder Änderung aufrufen)"""
+    for chunk in _chunks(list(question_ids), QUERY_CHUNK_SIZE):
+        c.execute(f"SELECT id, tags FROM questions WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+        _store_question_tags(c, c.fetchall())
+
+
+def _tag_filter(tags, match_all=True):
+    """Unterabfrage mit den IDs der Fragen, die alle (match_all) bzw. mindestens einen der Tags haben.
+
+    Läuft über den Primärschlüssel (tag_id, question_id) von question_tags,
+    Tags werden exakt verglichen (Groß-/Kleinschreibung egal).
+    Gibt (SQL, Parameter) zurück.
+    """
+    tags = split_tags(",".join(tags))
+    sql = f"""SELECT qt.question_id FROM tags t JOIN question_tags qt ON qt.tag_id = t.id
+              WHERE t.name IN ({",".join("?" * len(tags))})"""
+    if match_all and len(tags) > 1:
+        sql += f" GROUP BY qt.question_id HAVING COUNT(*) = {len(tags)}"
+    return sql, tags
+
+
+def get_tag_counts(db_path, tags=None, match_all=True):
+    """Alle Tags mit Anzahl Fragen [(Tag, Anzahl), ...], häufigste zuerst.
+
+    Mit tags werden nur die Fragen gezählt, die diesem Tag-Filter
+    entsprechen (z.B. welche weiteren Tags haben die Java-Fragen).
+    """
+    c = get_connection(db_path).cursor()
+    where = ""
+    params = []
+    if tags:
+        subquery, params = _tag_filter(tags, match_all)
+        where = f" WHERE qt.question_id IN ({subquery})"
+    c.execute(f"""SELECT t.name, COUNT(*) FROM question_tags qt JOIN tags t ON t.id = qt.tag_id{where}
+                  GROUP BY t.id ORDER BY 2 DESC, t.name""", params)
+    return c.fetchall()
+
+
+def iter_questions(db_path, question_ids, chunk_size=QUERY_CHUNK_SIZE):
+    """Liefert die Fragen zu question_ids blockweise in der übergebenen Reihenfolge.
+
+    Statt zwei Abfragen pro Frage werden pro Block von chunk_size IDs nur
+    zwei Abfragen ausgeführt. Nicht vorhandene IDs werden übersprungen.
+    """
+    question_ids = list(question_ids)
+    c = get_connection(db_path).cursor()
+    for chunk in _chunks(question_ids, chunk_size):
+        records = load_questions(c, chunk)
+        for qid in chunk:
+            if qid in records:
+                yield records[qid]
+
+
+def iter_question_fragments(db_path, question_ids, render, renderer, chunk_size=QUERY_CHUNK_SIZE):
+    """Liefert das gerenderte XML-Fragment jeder Frage in der Reihenfolge von question_ids.
+
+    Gültige Einträge aus render_cache (gleiche Version der Frage, gleicher
+    renderer) werden direkt übernommen. Nur neue oder geänderte Fragen
+    werden geladen, mit render(Datensatz) -> bytes gerendert und pro Block
+    in den Cache geschrieben. Ist die Datenbank gerade gesperrt, wird der
+    Block einfach nicht zwischengespeichert.
+    """
+    question_ids = list(question_ids)
+    conn = get_connection(db_path)
+    c = conn.cursor()
+    for chunk in _chunks(question_ids, chunk_size):
+        c.execute(f"""SELECT q.id, rc.xml FROM questions q
+                      LEFT JOIN render_cache rc
+                             ON rc.question_id = q.id AND rc.version = q.version AND rc.renderer = ?
+                      WHERE q.id IN ({",".join("?" * len(chunk))})""", (renderer, *chunk))
+        fragments = dict(c.fetchall())
+        missing = [qid for qid, xml in fragments.items() if xml is None]
+        if missing:
+            records = load_questions(c, missing)
+            rows = []
+            for qid, record in records.items():
+                fragments[qid] = render(record)
+                rows.append((qid, record['version'], renderer, fragments[qid]))
+            try:
+                with conn:
+                    c.executemany("""INSERT OR REPLACE INTO render_cache (question_id, version, renderer, xml)
+                                     VALUES (?, ?, ?, ?)""", rows)
+            except sqlite3.OperationalError:
+                pass
+        for qid in chunk:
+            if fragments.get(qid) is not None:
+                yield fragments[qid]
+
+
+def get_export_profiles(db_path):
+    """Alle Exportprofile als [(Name, Zeitstempel des letzten Exports)], nach Name sortiert"""
+    c = get_connection(db_path).cursor()
+    c.execute("SELECT name, last_export FROM export_profiles ORDER BY name")
+    return c.fetchall()
+
+
+def get_export_profile_time(db_path, name):
+    """Zeitstempel des letzten Exports mit diesem Profil oder None, wenn es noch nie lief"""
+    c = get_connection(db_path).cursor()
+    c.execute("SELECT last_export FROM export_profiles WHERE name=?", (name,))
+    row = c.fetchone()
+    return row[0] if row else None
+
+
+def mark_export_profile(db_path, name, timestamp):
+    """Merkt sich timestamp als letzten Export des Profils (legt es bei Bedarf an)"""
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("""INSERT INTO export_profiles (name, last_export) VALUES (?, ?)
+                        ON CONFLICT(name) DO UPDATE SET last_export=excluded.last_export""", (name, timestamp))
+
+
 def save_question(db_path, title, questiontext, single, tags, points, answers):
     """Speichert Frage + Antworten"""
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     c = conn.cursor()
-    
-    c.execute("INSERT INTO questions (title, questiontext, single, tags, points) VALUES (?, ?, ?, ?, ?)",
-             (title, questiontext, single, tags, points))
-    qid = c.lastrowid
-    
-    for answer_text, is_correct in answers:
-        if answer_text.strip():
-            c.execute("INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
-                     (qid, answer_text.strip(), is_correct))
-    
-    conn.commit()
-    conn.close()
+    with conn, record_changes(c, "Neue Frage") as changed_ids:
+        c.execute("INSERT INTO questions (title, questiontext, single, tags, points) VALUES (?, ?, ?, ?, ?)",
+                 (title, questiontext, single, tags, points))
+        qid = c.lastrowid
+        changed_ids.append(qid)
+        
+        for answer_text, is_correct in answers:
+            if answer_text.strip():
+                c.execute("INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
+                         (qid, answer_text.strip(), is_correct))
+        refresh_content_hashes(c, [qid])
+        refresh_question_tags(c, [qid])
+    notify_question_changes(db_path, [qid])
     return qid
 
 def duplicate_question(db_path, question_id):
     """Dupliziert eine Frage inkl. aller Antworten"""
-    conn = sqlite3.connect(db_path)
+    conn = get_connection(db_path)
     c = conn.cursor()
     
     # Original-Frage laden
-    c.execute("SELECT title, questiontext, single, tags, points, question_type FROM questions WHERE id=?", (question_id,))
+    c.execute("SELECT title, questiontext, single, tags, points, question_type, raw_xml FROM questions WHERE id=?",
+              (question_id,))
     result = c.fetchone()
     if not result:
-        conn.close()
         return None
     
-    title, questiontext, single, tags, points, question_type = result
+    title, questiontext, single, tags, points, question_type, raw_xml = result
     # Titel mit "(Kopie)" markieren
     new_title = f"{title} (Kopie)"
     
-    # Neue Frage einfügen
-    c.execute("""INSERT INTO questions (title, questiontext, single, tags, points, question_type) 
-                VALUES (?, ?, ?, ?, ?, ?)""",
-             (new_title, questiontext, single, tags, points, question_type))
-    new_qid = c.lastrowid
-    
-    # Antworten kopieren
-    c.execute("SELECT answertext, is_correct FROM answers WHERE question_id=?", (question_id,))
-    answers = c.fetchall()
-    for answer_text, is_correct in answers:
-        c.execute("INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
-                 (new_qid, answer_text, is_correct))
-    
-    conn.commit()
-    conn.close()
+    with conn, record_changes(c, "Frage duplizieren") as changed_ids:
+        # Neue Frage einfügen
+        c.execute("""INSERT INTO questions (title, questiontext, single, tags, points, question_type, raw_xml) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                 (new_title, questiontext, single, tags, points, question_type, raw_xml))
+        new_qid = c.lastrowid
+        changed_ids.append(new_qid)
+        
+        # Antworten kopieren
+        c.execute("""INSERT INTO answers (question_id, answertext, is_correct, fraction)
+                    SELECT ?, answertext, is_correct, fraction FROM answers WHERE question_id=? ORDER BY id""",
+                 (new_qid, question_id))
+        refresh_content_hashes(c, [new_qid])
+        refresh_question_tags(c, [new_qid])
+    notify_question_changes(db_path, [new_qid])
     return new_qid
 
-def import_moodle_xml(db_path, xml_filename):
+
+def merge_duplicate_questions(db_path):
+    """Führt Fragen mit gleichem Inhalts-Hash in einem Durchlauf zusammen.
+
+    Behalten wird jeweils die älteste Frage (kleinste ID), die Tags der
+    Duplikate werden übernommen, die Duplikate samt Antworten gelöscht.
+    Gibt (Anzahl Gruppen, Anzahl gelöschter Fragen) zurück.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, content_hash, tags FROM questions
+                     WHERE content_hash IN (SELECT content_hash FROM questions
+                                            GROUP BY content_hash HAVING COUNT(*) > 1)
+                     ORDER BY content_hash, id""")
+        tag_updates = []
+        removed_ids = []
+        groups = groupby(c.fetchall(), key=lambda row: row[1])
+        group_count = 0
+        for _, group in groups:
+            (keep_id, _, keep_tags), *duplicates = group
+            merged_tags = join_tags([keep_tags or ''] + [duplicate_tags or '' for _, _, duplicate_tags in duplicates])
+            removed_ids.extend((qid,) for qid, _, _ in duplicates)
+            if merged_tags != (keep_tags or ''):
+                tag_updates.append((merged_tags, keep_id))
+            group_count += 1
+
+        changed_ids = [qid for _, qid in tag_updates] + [qid for (qid,) in removed_ids]
+        if removed_ids:
+            with record_changes(c, f"Duplikate zusammenführen ({len(removed_ids)} Frage(n))", changed_ids):
+                c.executemany("UPDATE questions SET tags=? WHERE id=?", tag_updates)
+                _store_question_tags(c, [(qid, tags) for tags, qid in tag_updates])
+                # Antworten und Tag-Zuordnungen werden über ON DELETE CASCADE mitgelöscht
+                c.executemany("DELETE FROM questions WHERE id=?", removed_ids)
+    notify_question_changes(db_path, changed_ids)
+    return group_count, len(removed_ids)
+
+
+@contextmanager
+def _batch_ids(c, question_ids):
+    """Legt die IDs in der temporären Tabelle batch_ids ab, damit Sammeländerungen mit je einer Anweisung auskommen"""
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS batch_ids (id INTEGER PRIMARY KEY)")
+    c.execute("DELETE FROM temp.batch_ids")
+    c.executemany("INSERT OR IGNORE INTO temp.batch_ids (id) VALUES (?)", ((qid,) for qid in question_ids))
+    try:
+        yield "SELECT id FROM temp.batch_ids"
+    finally:
+        c.execute("DELETE FROM temp.batch_ids")
+
+
+def delete_questions(db_path, question_ids):
+    """Löscht viele Fragen in einer Transaktion; gibt die Anzahl gelöschter Fragen zurück"""
+    question_ids = list(question_ids)
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        with record_changes(c, f"Löschen ({len(question_ids)} Frage(n))", question_ids), \
+                _batch_ids(c, question_ids) as selected:
+            # Antworten und Tag-Zuordnungen werden über ON DELETE CASCADE mitgelöscht
+            c.execute(f"DELETE FROM questions WHERE id IN ({selected})")
+            deleted_count = c.rowcount
+    notify_question_changes(db_path, question_ids)
+    return deleted_count
+
+
+def retag_questions(db_path, question_ids, add=(), remove=(), replace=False):
+    """Ändert die Tags vieler Fragen in einer Transaktion.
+
+    add: Tags, die ergänzt werden, remove: Tags, die entfernt werden (ohne
+    Groß-/Kleinschreibung), replace=True verwirft vorher alle bisherigen Tags.
+    Gibt die Anzahl geänderter Fragen zurück.
+    """
+    add = split_tags(",".join(add))
+    remove = split_tags(",".join(remove))
+    removed = {_tag_key(tag) for tag in remove}
+    question_ids = list(question_ids)
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        with record_changes(c, f"Tags ändern ({len(question_ids)} Frage(n))", question_ids), \
+                _batch_ids(c, question_ids) as selected:
+            c.execute(f"SELECT id, tags FROM questions WHERE id IN ({selected})")
+            updates = []
+            for qid, tags in c.fetchall():
+                new_tags = [] if replace else [tag for tag in split_tags(tags) if _tag_key(tag) not in removed]
+                keys = {_tag_key(tag) for tag in new_tags}
+                new_tags = ",".join(new_tags + [tag for tag in add if _tag_key(tag) not in keys])
+                if new_tags != (tags or ''):
+                    updates.append((new_tags, qid))
+            # version gleich mitzählen, dann muss der Trigger die Zeilen nicht noch einmal schreiben
+            now = time.time()
+            c.executemany("UPDATE questions SET tags=?, version=COALESCE(version, 0) + 1, updated_at=? WHERE id=?",
+                          [(tags, now, qid) for tags, qid in updates])
+
+            # Tag-Index mengenbasiert nachziehen statt pro Frage neu aufzubauen
+            if replace:
+                c.execute(f"DELETE FROM question_tags WHERE question_id IN ({selected})")
+            elif remove:
+                c.execute(f"""DELETE FROM question_tags WHERE question_id IN ({selected})
+                              AND tag_id IN (SELECT id FROM tags WHERE name IN ({",".join("?" * len(remove))}))""",
+                          remove)
+            if add:
+                c.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", [(tag,) for tag in add])
+                c.execute(f"""INSERT OR IGNORE INTO question_tags (tag_id, question_id)
+                              SELECT t.id, b.id FROM tags t, temp.batch_ids b
+                              WHERE t.name IN ({",".join("?" * len(add))})
+                                AND b.id IN (SELECT id FROM questions)""", add)
+    notify_question_changes(db_path, [qid for _, qid in updates])
+    return len(updates)
+
+
+def rescale_points(db_path, question_ids, factor=None, points=None):
+    """Setzt die Punkte vieler Fragen auf points oder multipliziert sie mit factor (auf 2 Stellen gerundet)"""
+    if (factor is None) == (points is None):
+        raise ValueError("Entweder factor oder points angeben")
+    question_ids = list(question_ids)
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        with record_changes(c, f"Punkte ändern ({len(question_ids)} Frage(n))", question_ids), \
+                _batch_ids(c, question_ids) as selected:
+            if points is not None:
+                c.execute(f"""UPDATE questions SET points=?, version=COALESCE(version, 0) + 1, updated_at=?
+                              WHERE id IN ({selected})""", (points, time.time()))
+            else:
+                c.execute(f"""UPDATE questions SET points=round(points * ?, 2), version=COALESCE(version, 0) + 1,
+                                                   updated_at=?
+                              WHERE id IN ({selected})""", (factor, time.time()))
+            changed_count = c.rowcount
+    notify_question_changes(db_path, question_ids)
+    return changed_count
+
+
+def set_single_choice(db_path, question_ids, single):
+    """Stellt viele Fragen auf Single Choice (single=1) bzw. Multiple Choice (0) um"""
+    question_ids = list(question_ids)
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        with record_changes(c, f"{'Single' if single else 'Multiple'} Choice ({len(question_ids)} Frage(n))",
+                            question_ids), _batch_ids(c, question_ids) as selected:
+            c.execute(f"UPDATE questions SET single=? WHERE id IN ({selected}) AND single IS NOT ?",
+                      (single, single))
+            changed_count = c.rowcount
+    notify_question_changes(db_path, question_ids)
+    return changed_count
+
+
+def set_question_type(db_path, question_ids, question_type):
+    """Ändert den Fragetyp vieler Fragen; bei 'essay' werden die Antworten gelöscht.
+
+    Importierte Fragen anderer Typen verlieren dabei ihr Original-XML und
+    werden ab dann aus den Spalten exportiert.
+    Gibt die Anzahl geänderter Fragen zurück.
+    """
+    if question_type not in QUESTION_TYPES:
+        raise ValueError(f"Unbekannter Fragetyp: {question_type}")
+    question_ids = list(question_ids)
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        with record_changes(c, f"Fragetyp {question_type} ({len(question_ids)} Frage(n))", question_ids), \
+                _batch_ids(c, question_ids) as selected:
+            c.execute(f"""SELECT id FROM questions
+                          WHERE id IN ({selected}) AND COALESCE(question_type, 'multichoice') != ?""",
+                      (question_type,))
+            changed_ids = [row[0] for row in c.fetchall()]
+            c.execute(f"""UPDATE questions SET question_type=?, raw_xml=NULL
+                          WHERE id IN ({selected}) AND COALESCE(question_type, 'multichoice') != ?""",
+                      (question_type, question_type))
+            if question_type == 'essay':
+                # Freitextfragen haben keine Antwortoptionen
+                c.execute(f"DELETE FROM answers WHERE question_id IN ({selected})")
+            refresh_content_hashes(c, changed_ids)
+    notify_question_changes(db_path, changed_ids)
+    return len(changed_ids)
+
+
+def _table_columns(c, table):
+    c.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in c.fetchall()]
+
+
+def _image_fields(c, table, alias):
+    """'spalte', wert-Paare für json_object über alle Spalten von table.
+
+    json_object schreibt REAL nur mit 15 Stellen (Zeitstempel wie created_at
+    kämen beim Rückgängigmachen leicht verändert zurück); REAL-Spalten werden
+    daher mit 17 Stellen als Text abgelegt, die REAL-Affinität macht beim
+    Zurückschreiben wieder exakt dieselbe Zahl daraus.
+    """
+    c.execute(f"PRAGMA table_info({table})")
+    fields = []
+    for _, column, declared_type, *_ in c.fetchall():
+        value = f"{alias}.{column}"
+        if declared_type.upper() == 'REAL':
+            value = f"CASE WHEN typeof({value}) = 'real' THEN printf('%!.17g', {value}) ELSE {value} END"
+        fields.append(f"'{column}', {value}")
+    return ", ".join(fields)
+
+
+def _question_image_sql(c):
+    """SQL-Ausdruck für das JSON-Abbild einer Frage q (alle Spalten) samt ihrer Antworten.
+
+    Die Spalten kommen aus PRAGMA table_info, spätere Migrationen werden
+    also automatisch mit aufgezeichnet.
+    """
+    question = _image_fields(c, 'questions', 'q')
+    answer = _image_fields(c, 'answers', 'a')
+    return f"""json_object('question', json_object({question}),
+                           'answers', (SELECT json_group_array(json_object({answer}))
+                                       FROM answers a WHERE a.question_id = q.id))"""
+
+
+def _write_before_images(c, journal_id, question_ids):
+    """Speichert die Abbilder der vorhandenen Fragen unter question_ids als before_image.
+
+    Eine einzige INSERT ... SELECT-Anweisung über temp.batch_ids: SQLite baut
+    die JSON-Abbilder selbst, ohne Umweg über Python oder Chunks.
+    """
+    with _batch_ids(c, question_ids) as selected:
+        c.execute(f"""INSERT OR IGNORE INTO journal_rows (journal_id, question_id, before_image)
+                      SELECT ?, q.id, {_question_image_sql(c)} FROM questions q
+                      WHERE q.id IN ({selected})""", (journal_id,))
+
+
+def _write_after_images(c, journal_id):
+    """Speichert den aktuellen Stand aller Fragen eines Eintrags als after_image (NULL = gelöscht)"""
+    c.execute(f"""UPDATE journal_rows SET after_image = (SELECT {_question_image_sql(c)} FROM questions q
+                                                         WHERE q.id = journal_rows.question_id)
+                  WHERE journal_id=?""", (journal_id,))
+
+
+@contextmanager
+def record_changes(c, description, question_ids=()):
+    """Zeichnet eine Änderung an Fragen im Journal auf (für undo/redo).
+
+    Vorher werden die Abbilder der Fragen question_ids gespeichert; IDs, die
+    der Aufrufer in der gelieferten Liste ergänzt (neu angelegte Fragen),
+    werden ohne Abbild vermerkt. Der Aufwand hängt nur von der Anzahl
+    betroffener Fragen ab, nicht von der Größe der Datenbank. Muss in der
+    Transaktion der Änderung laufen, damit bei einem Fehler auch der
+    Journal-Eintrag zurückgerollt wird.
+    """
+    changed_ids = list(question_ids)
+    # Neue Änderung: rückgängig gemachte Einträge können nicht mehr wiederholt werden
+    c.execute("DELETE FROM journal WHERE undone=1")
+    c.execute("INSERT INTO journal (created_at, description) VALUES (?, ?)", (time.time(), description))
+    journal_id = c.lastrowid
+    _write_before_images(c, journal_id, changed_ids)
+    yield changed_ids
+    if not changed_ids:
+        c.execute("DELETE FROM journal WHERE id=?", (journal_id,))
+        return
+    c.executemany("INSERT OR IGNORE INTO journal_rows (journal_id, question_id) VALUES (?, ?)",
+                  [(journal_id, qid) for qid in changed_ids])
+    c.execute("UPDATE journal SET question_count=(SELECT COUNT(*) FROM journal_rows WHERE journal_id=?) WHERE id=?",
+              (journal_id, journal_id))
+    _compact_journal(c)
+
+
+def _compact_journal(c, max_entries=JOURNAL_MAX_ENTRIES, max_questions=JOURNAL_MAX_QUESTIONS,
+                     max_age_days=JOURNAL_MAX_AGE_DAYS):
+    """Entfernt alte Journal-Einträge nach der Aufbewahrungsregel; gibt die Anzahl zurück"""
+    c.execute("""DELETE FROM journal WHERE id IN (
+                     SELECT id FROM (SELECT id, created_at,
+                                            ROW_NUMBER() OVER (ORDER BY id DESC) AS position,
+                                            SUM(question_count) OVER (ORDER BY id DESC) AS total
+                                     FROM journal)
+                     WHERE position > 1 AND (position > ? OR total > ? OR created_at < ?))""",
+              (max_entries, max_questions, time.time() - max_age_days * 86400))
+    return c.rowcount
+
+
+def compact_journal(db_path, max_entries=JOURNAL_MAX_ENTRIES, max_questions=JOURNAL_MAX_QUESTIONS,
+                    max_age_days=JOURNAL_MAX_AGE_DAYS):
+    """Entfernt alte Journal-Einträge (siehe JOURNAL_MAX_*); gibt die Anzahl entfernter Einträge zurück"""
+    conn = get_connection(db_path)
+    with conn:
+        return _compact_journal(conn.cursor(), max_entries, max_questions, max_age_days)
+
+
+def _restore_journal_images(c, journal_id, column):
+    """Setzt alle Fragen eines Journal-Eintrags auf das Abbild in column zurück; gibt deren IDs zurück"""
+    question_columns = _table_columns(c, 'questions')
+    answer_columns = _table_columns(c, 'answers')
+    c.execute("SELECT question_id FROM journal_rows WHERE journal_id=?", (journal_id,))
+    question_ids = [row[0] for row in c.fetchall()]
+    # Aktuellen Stand entfernen (Antworten/Tags per CASCADE), dann Abbild mit den alten IDs einfügen
+    c.execute("DELETE FROM questions WHERE id IN (SELECT question_id FROM journal_rows WHERE journal_id=?)",
+              (journal_id,))
+    c.execute(f"""INSERT INTO questions ({", ".join(question_columns)})
+                  SELECT {", ".join(f"json_extract(j.{column}, '$.question.{col}')" for col in question_columns)}
+                  FROM journal_rows j WHERE j.journal_id=? AND j.{column} IS NOT NULL""", (journal_id,))
+    c.execute(f"""INSERT INTO answers ({", ".join(answer_columns)})
+                  SELECT {", ".join(f"json_extract(a.value, '$.{col}')" for col in answer_columns)}
+                  FROM journal_rows j, json_each(j.{column}, '$.answers') a
+                  WHERE j.journal_id=? AND j.{column} IS NOT NULL""", (journal_id,))
+    # Wiederhergestellte Fragen gelten als geändert, damit Delta-Exporte sie mitnehmen
+    c.execute("""UPDATE questions SET updated_at=?
+                 WHERE id IN (SELECT question_id FROM journal_rows WHERE journal_id=?)""", (time.time(), journal_id))
+    refresh_question_tags(c, question_ids)
+    return question_ids
+
+
+def get_undo_state(db_path):
+    """(Beschreibung der rückgängig machbaren, Beschreibung der wiederholbaren Änderung), jeweils oder None"""
+    c = get_connection(db_path).cursor()
+    c.execute("SELECT description FROM journal WHERE undone=0 ORDER BY id DESC LIMIT 1")
+    undo = c.fetchone()
+    c.execute("SELECT description FROM journal WHERE undone=1 ORDER BY id LIMIT 1")
+    redo = c.fetchone()
+    return (undo[0] if undo else None), (redo[0] if redo else None)
+
+
+def undo_last_change(db_path):
+    """Macht die letzte aufgezeichnete Änderung rückgängig; gibt deren Beschreibung zurück (None = nichts da)"""
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        c.execute("SELECT id, description FROM journal WHERE undone=0 ORDER BY id DESC LIMIT 1")
+        row = c.fetchone()
+        if row is None:
+            return None
+        # Nachher-Abbild erst jetzt festhalten: es ist der aktuelle Stand (spart Aufwand beim Aufzeichnen)
+        _write_after_images(c, row[0])
+        question_ids = _restore_journal_images(c, row[0], 'before_image')
+        c.execute("UPDATE journal SET undone=1 WHERE id=?", (row[0],))
+    notify_question_changes(db_path, question_ids)
+    return row[1]
+
+
+def redo_last_change(db_path):
+    """Wiederholt die zuletzt rückgängig gemachte Änderung; gibt deren Beschreibung zurück (None = nichts da)"""
+    conn = get_connection(db_path)
+    with conn:
+        c = conn.cursor()
+        c.execute("SELECT id, description FROM journal WHERE undone=1 ORDER BY id LIMIT 1")
+        row = c.fetchone()
+        if row is None:
+            return None
+        question_ids = _restore_journal_images(c, row[0], 'after_image')
+        c.execute("UPDATE journal SET undone=0 WHERE id=?", (row[0],))
+    notify_question_changes(db_path, question_ids)
+    return row[1]
+
+
+def import_moodle_xml(db_path, xml_filename, streaming=False, batch_size=IMPORT_BATCH_SIZE,
+                      on_duplicate=DEFAULT_DUPLICATE_POLICY):
     """Importiert Moodle XML Fragen in die lokale DB"""
+    if streaming:
+        return import_moodle_xml_streaming(db_path, xml_filename, batch_size, on_duplicate=on_duplicate)
+    import xml.etree.ElementTree as ET
     try:
         tree = ET.parse(xml_filename)
         root = tree.getroot()
@@ -104,59 +1271,496 @@ def import_moodle_xml(db_path, xml_filename):
         if root.tag != 'quiz':
             return 0, "Fehler: Ungültiges Moodle XML (kein <quiz> Root)"
         
-        imported_count = 0
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        questions = []
+        conn = get_connection(db_path)
+        with conn:
+            c = conn.cursor()
         
-        for question_elem in root.findall('question'):
-            if question_elem.get('type') != 'multichoice':
-                continue  # Nur MC-Fragen importieren
-            
-            # Frage-Daten extrahieren
-            name_elem = question_elem.find('.//name/text')
-            title = name_elem.text.strip() if name_elem is not None else "Unbenannte Frage"
-            
-            qtext_elem = question_elem.find('.//questiontext/text')
-            questiontext = qtext_elem.text.strip() if qtext_elem is not None else ""
-            
-            single_elem = question_elem.find('single')
-            single = 1 if single_elem is not None and single_elem.text == 'true' else 0
-            
-            defaultgrade_elem = question_elem.find('defaultgrade')
-            points = float(defaultgrade_elem.text) if defaultgrade_elem is not None else 1.0
-            
-            # Tags extrahieren
-            tags = ""
-            tags_root = question_elem.find('tags')
-            if tags_root is not None:
-                for tag_elem in tags_root.findall('tag/text'):
-                    if tag_elem is not None and tag_elem.text:
-                        tags += tag_elem.text.strip() + ","
-                tags = tags.rstrip(',')
-            
-            # Frage einfügen
-            c.execute("""INSERT INTO questions (title, questiontext, single, tags, points) 
-                        VALUES (?, ?, ?, ?, ?)""",
-                     (title, questiontext, single, tags, points))
-            qid = c.lastrowid
-            
-            # Antworten einfügen
-            for answer_elem in question_elem.findall('answer'):
-                answertext_elem = answer_elem.find('text')
-                fraction = answer_elem.get('fraction', '0')
-                is_correct = 1 if fraction == '100' else 0
-                
-                if answertext_elem is not None and answertext_elem.text:
-                    c.execute("INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
-                             (qid, answertext_elem.text.strip(), is_correct))
-            
-            imported_count += 1
+            for question_elem in root.findall('question'):
+                record = _parse_question_element(question_elem)
+                if record is not None:
+                    questions.append(record)
         
-        conn.commit()
-        conn.close()
-        return imported_count, f"✓ {imported_count} MC-Fragen importiert!"
+            # Einfügen inkl. Duplikatprüfung über den Inhalts-Hash
+            imported_count, _, duplicate_count = _insert_questions(c, questions, batch_size,
+                                                                   on_duplicate=on_duplicate)
+        
+        return imported_count, f"✓ {imported_count} Fragen importiert{_duplicate_note(duplicate_count, on_duplicate)}!"
         
     except ET.ParseError as e:
         return 0, f"XML Parse Fehler: {str(e)}"
     except Exception as e:
         return 0, f"Import Fehler: {str(e)}"
+
+
+def _first_text(elem):
+    """Text des ersten <text>-Kindelements (oder None)"""
+    for child in elem:
+        if child.tag == 'text':
+            return child.text
+    return None
+
+
+def _parse_fraction(text):
+    """Moodle-Bewertung ('100', '33.33333', '-50') -> (is_correct, fraction).
+
+    fraction ist None bei 100 bzw. 0, dann genügt is_correct.
+    """
+    try:
+        fraction = float(text)
+    except (TypeError, ValueError):
+        fraction = 0.0
+    if fraction in (0.0, 100.0):
+        return (1 if fraction else 0), None
+    return (1 if fraction > 0 else 0), fraction
+
+
+def _element_xml(elem):
+    """Serialisiert ein Element (ElementTree oder lxml) ohne nachfolgenden Text"""
+    if hasattr(elem, 'getparent'):
+        from lxml import etree
+        return etree.tostring(elem, encoding='unicode', with_tail=False)
+    import xml.etree.ElementTree as ET
+    tail, elem.tail = elem.tail, None
+    try:
+        return ET.tostring(elem, encoding='unicode')
+    finally:
+        elem.tail = tail
+
+
+def _parse_question_element(elem):
+    """Extrahiert eine Frage aus einem <question>-Element (ElementTree oder lxml).
+
+    Die gemeinsamen Felder werden in einem Durchlauf gelesen statt mit einem
+    find() pro Feld, das spart beim Massenimport den Großteil der Zeit. Den
+    Rest erledigt der Parser des Fragetyps aus QUESTION_PARSERS; unbekannte
+    Typen behalten ihr Original-XML. Gibt None für Einträge ohne Frage
+    (Kategorien) zurück.
+    """
+    question_type = elem.get('type')
+    parser = QUESTION_PARSERS.get(question_type, _parse_other)
+    if parser is None:
+        return None
+
+    title = None
+    questiontext = None
+    single = 0
+    points = 1.0
+    tags = []
+    answers = []
+
+    for child in elem:
+        tag = child.tag
+        if tag == 'answer':
+            text = _first_text(child)
+            if text:
+                answers.append((text.strip(), *_parse_fraction(child.get('fraction', '0'))))
+        elif tag == 'name':
+            title = _first_text(child)
+        elif tag == 'questiontext':
+            questiontext = _first_text(child)
+        elif tag == 'single':
+            single = 1 if child.text == 'true' else 0
+        elif tag == 'defaultgrade':
+            points = float(child.text)
+        elif tag == 'tags':
+            for tag_elem in child:
+                text = _first_text(tag_elem) if tag_elem.tag == 'tag' else None
+                if text:
+                    tags.append(text.strip())
+
+    record = {
+        'title': title.strip() if title else "Unbenannte Frage",
+        'questiontext': questiontext.strip() if questiontext else "",
+        'single': single,
+        'tags': join_tags(tags),
+        'points': points,
+        'question_type': question_type or 'multichoice',
+        'raw_xml': None,
+        'answers': answers,
+    }
+    parser(elem, record)
+    # Hash schon hier berechnen, beim Mehrfach-Import also parallel in den Worker-Prozessen
+    record['content_hash'] = _record_hash(record)
+    return record
+
+
+def _parse_multichoice(elem, record):
+    """Multiple/Single Choice: alles steckt schon in den gemeinsamen Feldern"""
+
+
+def _parse_truefalse(elem, record):
+    """Wahr/Falsch: Antworten 'true'/'false' mit ihrer Bewertung"""
+    record['single'] = 1
+
+
+def _parse_shortanswer(elem, record):
+    """Kurzantwort: akzeptierte Antworten samt Teilpunkten"""
+    record['single'] = 1
+
+
+def _parse_essay(elem, record):
+    """Freitext: Moodle schreibt eine leere Platzhalter-Antwort, die entfällt"""
+    record['single'] = 1
+    record['answers'] = []
+
+
+def _parse_numerical(elem, record):
+    """Numerisch: Zahlen als Antworten, Toleranzen und Einheiten bleiben im Original-XML"""
+    record['single'] = 1
+    record['raw_xml'] = _element_xml(elem)
+
+
+def _parse_matching(elem, record):
+    """Zuordnung: Paare "Teilfrage → Antwort" für Anzeige und Suche, Export aus dem Original-XML"""
+    record['single'] = 1
+    record['raw_xml'] = _element_xml(elem)
+    pairs = []
+    for child in elem:
+        if child.tag != 'subquestion':
+            continue
+        subquestion = (_first_text(child) or "").strip()
+        answer = child.find('answer')
+        answer_text = ((_first_text(answer) if answer is not None else None) or "").strip()
+        if subquestion:
+            pairs.append((f"{subquestion} → {answer_text}", 1, None))
+    record['answers'] = pairs
+
+
+def _parse_cloze(elem, record):
+    """Lückentext: die Lücken stehen im Fragetext, Export aus dem Original-XML"""
+    record['single'] = 1
+    record['answers'] = []
+    record['raw_xml'] = _element_xml(elem)
+
+
+def _parse_other(elem, record):
+    """Sonstige Fragetypen (calculated, ddwtos, ...): unverändert als Original-XML behalten"""
+    record['raw_xml'] = _element_xml(elem)
+
+
+# Moodle-Fragetyp -> Parser für die typspezifischen Felder; None = kein Import.
+# Nicht aufgeführte Typen übernimmt _parse_other.
+QUESTION_PARSERS = {
+    'multichoice': _parse_multichoice,
+    'truefalse': _parse_truefalse,
+    'shortanswer': _parse_shortanswer,
+    'essay': _parse_essay,
+    'numerical': _parse_numerical,
+    'matching': _parse_matching,
+    'cloze': _parse_cloze,
+    'category': None,  # Kategorie-Einträge sind keine Fragen
+}
+
+
+def _iter_moodle_questions(xml_filename):
+    """Liest <question>-Elemente streamend (iterparse) und liefert Datensätze.
+
+    Jedes fertig gelesene Element wird sofort wieder freigegeben, der
+    Speicherbedarf bleibt daher unabhängig von der Dateigröße konstant.
+    Verwendet lxml falls installiert (deutlich schneller), sonst ElementTree.
+    xml_filename darf auch ein geöffnetes Binär-Dateiobjekt sein.
+    """
+    try:
+        from lxml import etree
+    except ImportError:
+        etree = None
+
+    if etree is None:
+        yield from _iter_moodle_questions_et(xml_filename)
+        return
+
+    try:
+        context = etree.iterparse(xml_filename, events=('end',), tag='question')
+        for _, elem in context:
+            parent = elem.getparent()
+            if parent.getparent() is not None:
+                continue
+            if parent.tag != 'quiz':
+                raise InvalidMoodleXML("Ungültiges Moodle XML (kein <quiz> Root)")
+            record = _parse_question_element(elem)
+            if record is not None:
+                yield record
+            # Verarbeitetes Element freigeben
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+        if context.root is None or context.root.tag != 'quiz':
+            raise InvalidMoodleXML("Ungültiges Moodle XML (kein <quiz> Root)")
+    except etree.XMLSyntaxError as e:
+        import xml.etree.ElementTree as ET
+        raise ET.ParseError(str(e)) from e
+
+
+def _iter_moodle_questions_et(xml_filename):
+    """ElementTree-Variante von _iter_moodle_questions"""
+    import xml.etree.ElementTree as ET
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(xml_filename, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = elem
+                if root.tag != 'quiz':
+                    raise InvalidMoodleXML("Ungültiges Moodle XML (kein <quiz> Root)")
+            continue
+
+        depth -= 1
+        if depth != 1 or elem.tag != 'question':
+            continue
+        record = _parse_question_element(elem)
+        if record is not None:
+            yield record
+        # Verarbeitetes Element freigeben
+        elem.clear()
+        root.remove(elem)
+
+
+def _find_content_hashes(c, hashes):
+    """Sucht Inhalts-Hashes über den Index; gibt {hash: kleinste ID} zurück"""
+    found = {}
+    for chunk in _chunks(list(set(hashes)), QUERY_CHUNK_SIZE):
+        c.execute(f"""SELECT content_hash, MIN(id) FROM questions
+                      WHERE content_hash IN ({",".join("?" * len(chunk))}) GROUP BY content_hash""", chunk)
+        found.update(c.fetchall())
+    return found
+
+
+def _answer_rows(qid, answers):
+    """Zeilen für answers aus (Text, is_correct[, fraction])-Tupeln"""
+    return [(qid, answer[0], answer[1], answer[2] if len(answer) > 2 else None) for answer in answers]
+
+
+def _insert_question_batch(c, batch, on_duplicate=DEFAULT_DUPLICATE_POLICY):
+    """Fügt einen Batch Fragen + Antworten mit je einem executemany ein.
+
+    Die IDs werden vorab vergeben, damit die Antworten ohne lastrowid pro
+    Frage zugeordnet werden können. Fragen, deren Inhalts-Hash schon in der
+    DB (oder früher im Batch) vorkommt, werden je nach on_duplicate
+    übersprungen, aktualisiert oder trotzdem eingefügt.
+    Gibt (eingefügte Fragen, geschriebene Zeilen, Duplikate) zurück.
+    """
+    c.execute("""SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name='questions'), 0),
+                            COALESCE((SELECT MAX(id) FROM questions), 0))""")
+    next_id = c.fetchone()[0] + 1
+
+    hashes = [q.get('content_hash') or _record_hash(q) for q in batch]
+    known = {} if on_duplicate == 'duplicate' else _find_content_hashes(c, hashes)
+
+    question_rows = []
+    answer_rows = []
+    updated = {}
+    duplicate_count = 0
+    now = time.time()
+    for q, content_hash in zip(batch, hashes):
+        qid = known.get(content_hash)
+        if qid is not None:
+            duplicate_count += 1
+            if on_duplicate == 'update':
+                updated[qid] = q
+            continue
+        qid = next_id
+        next_id += 1
+        if on_duplicate != 'duplicate':
+            known[content_hash] = qid
+        question_rows.append((qid, q['title'], q['questiontext'], q['single'], q['tags'], q['points'],
+                              q.get('question_type', 'multichoice'), q.get('raw_xml'), content_hash, now, now))
+        answer_rows.extend(_answer_rows(qid, q['answers']))
+
+    c.executemany("""INSERT INTO questions (id, title, questiontext, single, tags, points, question_type, raw_xml,
+                                            content_hash, created_at, updated_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", question_rows)
+    c.executemany("INSERT INTO answers (question_id, answertext, is_correct, fraction) VALUES (?, ?, ?, ?)",
+                  answer_rows)
+    _store_question_tags(c, [(row[0], row[4]) for row in question_rows], replace=False)
+    row_count = len(question_rows) + len(answer_rows)
+    if updated:
+        # Gleicher Inhalt (gleicher Hash): Metadaten und exakten Wortlaut übernehmen.
+        # Überschreibt vorhandene Fragen, daher im Journal (ein Eintrag pro Batch)
+        with record_changes(c, f"Import aktualisiert ({len(updated)} Frage(n))", list(updated)):
+            c.executemany("""UPDATE questions SET title=?, questiontext=?, single=?, tags=?, points=?, question_type=?,
+                                                  raw_xml=?, version=COALESCE(version, 0) + 1, updated_at=?
+                             WHERE id=?""",
+                          [(q['title'], q['questiontext'], q['single'], q['tags'], q['points'],
+                            q.get('question_type', 'multichoice'), q.get('raw_xml'), now, qid)
+                           for qid, q in updated.items()])
+            c.executemany("DELETE FROM answers WHERE question_id=?", [(qid,) for qid in updated])
+            answer_rows = [row for qid, q in updated.items() for row in _answer_rows(qid, q['answers'])]
+            c.executemany("INSERT INTO answers (question_id, answertext, is_correct, fraction) VALUES (?, ?, ?, ?)",
+                          answer_rows)
+            _store_question_tags(c, [(qid, q['tags']) for qid, q in updated.items()])
+        row_count += len(updated) + len(answer_rows)
+    return len(question_rows), row_count, duplicate_count
+
+
+def _insert_questions(c, questions, batch_size=IMPORT_BATCH_SIZE, on_batch=None,
+                      on_duplicate=DEFAULT_DUPLICATE_POLICY):
+    """Fügt Frage-Datensätze in Batches ein; gibt (Fragen, Zeilen, Duplikate) zurück.
+
+    on_batch() wird nach jedem Batch aufgerufen (Fortschritt, Abbruchprüfung).
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unbekannte Duplikat-Regel: {on_duplicate}")
+    totals = [0, 0, 0]
+    batch = []
+    for question in questions:
+        batch.append(question)
+        if len(batch) >= batch_size:
+            totals = [t + n for t, n in zip(totals, _insert_question_batch(c, batch, on_duplicate))]
+            batch = []
+            if on_batch is not None:
+                on_batch()
+    if batch:
+        totals = [t + n for t, n in zip(totals, _insert_question_batch(c, batch, on_duplicate))]
+        if on_batch is not None:
+            on_batch()
+    return tuple(totals)
+
+
+def _import_error_message(error):
+    """Fehlermeldung eines fehlgeschlagenen Imports wie in import_moodle_xml"""
+    import xml.etree.ElementTree as ET
+    if isinstance(error, ET.ParseError):
+        return f"XML Parse Fehler: {str(error)}"
+    if isinstance(error, InvalidMoodleXML):
+        return f"Fehler: {str(error)}"
+    return f"Import Fehler: {str(error)}"
+
+
+def _duplicate_note(duplicate_count, on_duplicate):
+    """Zusatz zur Erfolgsmeldung, z.B. ", 3 Duplikate übersprungen" """
+    if not duplicate_count or on_duplicate == 'duplicate':
+        return ""
+    action = "aktualisiert" if on_duplicate == 'update' else "übersprungen"
+    return f", {duplicate_count} Duplikate {action}"
+
+
+def _import_success_message(imported_count, row_count, elapsed, duplicate_count=0,
+                            on_duplicate=DEFAULT_DUPLICATE_POLICY):
+    return (f"✓ {imported_count} Fragen importiert{_duplicate_note(duplicate_count, on_duplicate)}! "
+            f"({row_count / max(elapsed, 1e-9):,.0f} Zeilen/s)")
+
+
+def _check_cancelled(is_cancelled):
+    if is_cancelled is not None and is_cancelled():
+        raise OperationCancelled()
+
+
+def import_moodle_xml_streaming(db_path, xml_filename, batch_size=IMPORT_BATCH_SIZE,
+                                progress=None, is_cancelled=None, on_duplicate=DEFAULT_DUPLICATE_POLICY):
+    """Importiert große Moodle XML Dateien streamend mit Batch-Inserts.
+
+    Alle Batches laufen in einer Transaktion: bei einem Parse-Fehler mitten
+    in der Datei wird nichts importiert (wie beim normalen Import).
+    on_duplicate (siehe DUPLICATE_POLICIES) regelt Fragen, deren Inhalt
+    schon in der DB vorkommt.
+    progress(gelesene Bytes, Dateigröße) wird nach jedem Batch aufgerufen.
+    Liefert is_cancelled() True, wird zurückgerollt und OperationCancelled
+    ausgelöst.
+    """
+    conn = get_connection(db_path)
+    c = conn.cursor()
+    start = time.perf_counter()
+    try:
+        with open(xml_filename, 'rb') as f:
+            total_bytes = os.fstat(f.fileno()).st_size
+
+            def on_batch():
+                _check_cancelled(is_cancelled)
+                if progress is not None:
+                    progress(f.tell(), total_bytes)
+
+            c.execute("BEGIN IMMEDIATE")
+            imported_count, row_count, duplicate_count = _insert_questions(
+                c, _iter_moodle_questions(f), batch_size, on_batch, on_duplicate)
+            _check_cancelled(is_cancelled)
+            conn.commit()
+    except OperationCancelled:
+        conn.rollback()
+        raise
+    except Exception as e:
+        if conn.in_transaction:
+            conn.rollback()
+        return 0, _import_error_message(e)
+    if progress is not None:
+        progress(total_bytes, total_bytes)
+
+    return imported_count, _import_success_message(imported_count, row_count, time.perf_counter() - start,
+                                                   duplicate_count, on_duplicate)
+
+
+def parse_moodle_xml_file(xml_filename):
+    """Liest eine Moodle XML Datei in Frage-Datensätze (läuft in Worker-Prozessen).
+
+    Gibt (Datensätze, None) oder bei Fehlern ([], Fehlermeldung) zurück, damit
+    keine Exceptions zwischen Prozessen übertragen werden müssen.
+    """
+    try:
+        return list(_iter_moodle_questions(xml_filename)), None
+    except Exception as e:
+        return [], _import_error_message(e)
+
+
+def import_moodle_xml_files(db_path, xml_filenames, max_workers=None, batch_size=IMPORT_BATCH_SIZE, progress=None,
+                            is_cancelled=None, on_duplicate=DEFAULT_DUPLICATE_POLICY):
+    """Importiert mehrere Moodle XML Dateien; das Parsen läuft parallel in Prozessen.
+
+    Die Worker-Prozesse parsen und normalisieren je eine Datei, geschrieben
+    wird ausschließlich im aufrufenden Prozess (eine Transaktion pro Datei,
+    in der Reihenfolge, in der die Dateien fertig werden).
+    progress(erledigt, gesamt, dateiname, anzahl, meldung) wird nach jeder Datei
+    aufgerufen. Gibt (Fragen gesamt, [(dateiname, anzahl, meldung), ...]) zurück.
+    Bei Abbruch über is_cancelled() wird die gerade geschriebene Datei
+    zurückgerollt und OperationCancelled ausgelöst; bereits abgeschlossene
+    Dateien bleiben importiert. on_duplicate wie bei import_moodle_xml_streaming.
+    """
+    xml_filenames = list(xml_filenames)
+    conn = get_connection(db_path)
+    results = []
+
+    def write(xml_filename, questions, error):
+        _check_cancelled(is_cancelled)
+        if error:
+            imported_count, message = 0, error
+        else:
+            start = time.perf_counter()
+            c = conn.cursor()
+            try:
+                c.execute("BEGIN IMMEDIATE")
+                imported_count, row_count, duplicate_count = _insert_questions(
+                    c, questions, batch_size, lambda: _check_cancelled(is_cancelled), on_duplicate)
+                conn.commit()
+                message = _import_success_message(imported_count, row_count, time.perf_counter() - start,
+                                                  duplicate_count, on_duplicate)
+            except OperationCancelled:
+                conn.rollback()
+                raise
+            except Exception as e:
+                conn.rollback()
+                imported_count, message = 0, _import_error_message(e)
+        results.append((xml_filename, imported_count, message))
+        if progress is not None:
+            progress(len(results), len(xml_filenames), xml_filename, imported_count, message)
+
+    if max_workers == 1 or len(xml_filenames) <= 1:
+        for xml_filename in xml_filenames:
+            _check_cancelled(is_cancelled)
+            write(xml_filename, *parse_moodle_xml_file(xml_filename))
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(parse_moodle_xml_file, f): f for f in xml_filenames}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        questions, error = future.result()
+                    except Exception as e:  # z.B. abgestürzter Worker-Prozess
+                        questions, error = [], _import_error_message(e)
+                    write(futures[future], questions, error)
+            except OperationCancelled:
+                # Noch nicht gestartete Dateien gar nicht mehr parsen
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    return sum(count for _, count, _ in results), results
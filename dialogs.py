@@ -1,19 +1,31 @@
 import os
-import sqlite3
+import time
 from PyQt6.QtWidgets import (
     QDialog, QLineEdit, QTextEdit, QCheckBox,
     QDoubleSpinBox, QPushButton, QMessageBox, QFileDialog,
     QListWidget, QLabel, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QScrollArea, QWidget, QComboBox
+    QScrollArea, QWidget, QComboBox, QProgressDialog, QSpinBox
 )
 from PyQt6.QtCore import Qt
 
+from connection import get_connection, close_connections
+from database import (
+    refresh_content_hashes, refresh_question_tags, record_changes, split_tags, join_tags, notify_question_changes
+)
+
+# Antwortfelder einer neuen Frage; beim Bearbeiten so viele wie die Frage Antworten hat
+ANSWER_FIELDS = 5
+
 
 class QuestionDialog(QDialog):
     def __init__(self, db_path, question_id=None, parent=None):
         super().__init__(parent)
         self.db_path = db_path
         self.question_id = question_id
+        # Importierter Fragetyp ohne eigene Eingabemaske (z.B. 'matching'), sonst None
+        self.imported_type = None
+        # Teilpunkte der geladenen Antworten (None = 100 bzw. 0)
+        self.answer_fractions = []
         self.setWindowTitle("Frage bearbeiten" if question_id else "Neue MC-Frage erstellen")
         self.setWindowState(Qt.WindowState.WindowMaximized)
         self.setup_ui()
@@ -136,39 +148,11 @@ class QuestionDialog(QDialog):
         
         self.answers = []
         self.answer_containers = []
-        for i in range(5):
-            # Vertikales Layout für jede Antwort
-            answer_container = QVBoxLayout()
-            answer_container.setSpacing(5)
-            
-            # Label und Checkbox in einer Zeile
-            header_layout = QHBoxLayout()
-            answer_label = QLabel(f"Antwort {i+1}:")
-            answer_label.setStyleSheet("font-size: 14px; font-weight: bold;")
-            header_layout.addWidget(answer_label)
-            
-            correct_cb = QCheckBox("✅ Richtig")
-            correct_cb.setStyleSheet("font-size: 14px; padding: 5px;")
-            header_layout.addWidget(correct_cb)
-            header_layout.addStretch()
-            
-            answer_container.addLayout(header_layout)
-            
-            # Textfeld darunter
-            answer_edit = QTextEdit()
-            answer_edit.setMinimumHeight(100)
-            answer_edit.setMaximumHeight(150)
-            answer_edit.setStyleSheet("font-size: 14px; padding: 10px; border: 2px solid #ddd; border-radius: 8px;")
-            answer_edit.setPlaceholderText(f"Antwort {i+1} hier eingeben (mehrzeilig, HTML möglich)...")
-            answer_container.addWidget(answer_edit)
-            
-            # Widget Container für Ein/Ausblenden
-            container_widget = QWidget()
-            container_widget.setLayout(answer_container)
-            main_layout.addWidget(container_widget)
-            
-            self.answer_containers.append(container_widget)
-            self.answers.extend([answer_edit, correct_cb])
+        self.answers_layout = QVBoxLayout()
+        self.answers_layout.setSpacing(20)
+        main_layout.addLayout(self.answers_layout)
+        for _ in range(ANSWER_FIELDS):
+            self.add_answer_field()
 
         # SPEICHERN BUTTON
         main_layout.addSpacing(20)
@@ -208,62 +192,98 @@ class QuestionDialog(QDialog):
         dialog_layout.addWidget(scroll_area)
         self.setLayout(dialog_layout)
 
+    def add_answer_field(self):
+        """Hängt ein weiteres Antwortfeld (Text + Richtig-Checkbox) an"""
+        i = len(self.answer_containers)
+        # Vertikales Layout für jede Antwort
+        answer_container = QVBoxLayout()
+        answer_container.setSpacing(5)
+
+        # Label und Checkbox in einer Zeile
+        header_layout = QHBoxLayout()
+        answer_label = QLabel(f"Antwort {i+1}:")
+        answer_label.setStyleSheet("font-size: 14px; font-weight: bold;")
+        header_layout.addWidget(answer_label)
+
+        correct_cb = QCheckBox("✅ Richtig")
+        correct_cb.setStyleSheet("font-size: 14px; padding: 5px;")
+        header_layout.addWidget(correct_cb)
+        header_layout.addStretch()
+
+        answer_container.addLayout(header_layout)
+
+        # Textfeld darunter
+        answer_edit = QTextEdit()
+        answer_edit.setMinimumHeight(100)
+        answer_edit.setMaximumHeight(150)
+        answer_edit.setStyleSheet("font-size: 14px; padding: 10px; border: 2px solid #ddd; border-radius: 8px;")
+        answer_edit.setPlaceholderText(f"Antwort {i+1} hier eingeben (mehrzeilig, HTML möglich)...")
+        answer_container.addWidget(answer_edit)
+
+        # Widget Container für Ein/Ausblenden
+        container_widget = QWidget()
+        container_widget.setLayout(answer_container)
+        container_widget.setVisible(self.question_type_combo.currentIndex() in (0, 2))
+        self.answers_layout.addWidget(container_widget)
+
+        self.answer_containers.append(container_widget)
+        self.answers.extend([answer_edit, correct_cb])
+
     def on_question_type_changed(self, index):
         """Blendet Antwortfelder aus/ein je nach Fragetyp"""
         is_mc = (index == 0)  # Multiple Choice
+        has_answers = index in (0, 2)  # Multiple Choice und Kurzantwort (akzeptierte Antworten)
         
         # Single Choice Checkbox nur bei MC anzeigen
         self.single_cb.setVisible(is_mc)
         
         # Antworten-Titel und Container anzeigen/verstecken
-        self.answers_title.setVisible(is_mc)
+        self.answers_title.setVisible(has_answers)
         for container in self.answer_containers:
-            container.setVisible(is_mc)
+            container.setVisible(has_answers)
 
     def get_tags_string(self):
-        tags = []
-        for tag_edit in self.tag_edits:
-            tag_text = tag_edit.text().strip()
-            if tag_text:
-                tags.append(tag_text)
-        return ",".join(tags)
+        return join_tags(tag_edit.text() for tag_edit in self.tag_edits)
 
     def load_question(self):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        c = get_connection(self.db_path).cursor()
         c.execute("SELECT title, questiontext, single, tags, points, question_type FROM questions WHERE id=?", (self.question_id,))
         row = c.fetchone()
         if not row:
-            conn.close()
             return
         self.title_edit.setText(row[0])
         self.question_edit.setPlainText(row[1])
         self.single_cb.setChecked(row[2] == 1)
         self.points_spin.setValue(row[4])
         
+        c.execute("SELECT answertext, is_correct, fraction FROM answers WHERE question_id=? ORDER BY id",
+                  (self.question_id,))
+        answers = c.fetchall()
+        # Importierte Fragen haben oft mehr als ANSWER_FIELDS Antworten: keine darf beim Speichern verloren gehen
+        while len(self.answer_containers) < len(answers):
+            self.add_answer_field()
+
         # Fragetyp laden
         question_type = row[5] if len(row) > 5 else 'multichoice'
         if question_type == 'essay':
             self.question_type_combo.setCurrentIndex(1)
         elif question_type == 'shortanswer':
             self.question_type_combo.setCurrentIndex(2)
-        else:
+        elif question_type in (None, 'multichoice'):
             self.question_type_combo.setCurrentIndex(0)
+        else:
+            # Importierte Typen: nur Titel, Text, Punkte und Tags bearbeitbar, Antworten bleiben
+            self.imported_type = question_type
+            self.question_type_combo.addItem(f"📥 {question_type} (importiert, Antworten unverändert)")
+            self.question_type_combo.setCurrentIndex(3)
         
-        tags_str = row[3]
-        if tags_str:
-            tag_list = [t.strip() for t in tags_str.split(',') if t.strip()]
-            for i, tag_edit in enumerate(self.tag_edits):
-                if i < len(tag_list):
-                    tag_edit.setText(tag_list[i])
+        for tag_edit, tag in zip(self.tag_edits, split_tags(row[3])):
+            tag_edit.setText(tag)
         
-        c.execute("SELECT answertext, is_correct FROM answers WHERE question_id=? ORDER BY id", (self.question_id,))
-        answers = c.fetchall()
-        for i, (answer_text, is_correct) in enumerate(answers):
-            if i * 2 < len(self.answers):
-                self.answers[2 * i].setPlainText(answer_text)
-                self.answers[2 * i + 1].setChecked(is_correct == 1)
-        conn.close()
+        for i, (answer_text, is_correct, fraction) in enumerate(answers):
+            self.answers[2 * i].setPlainText(answer_text)
+            self.answers[2 * i + 1].setChecked(is_correct == 1)
+            self.answer_fractions.append((is_correct, fraction))
 
     def save_question(self):
         if not self.title_edit.text().strip():
@@ -276,44 +296,63 @@ class QuestionDialog(QDialog):
             question_type = 'essay'
         elif question_type_index == 2:
             question_type = 'shortanswer'
+        elif question_type_index == 3:
+            question_type = self.imported_type
         else:
             question_type = 'multichoice'
         
         answers = []
-        # Nur Antworten speichern wenn Multiple Choice
-        if question_type == 'multichoice':
+        # Antworten nur bei Multiple Choice und Kurzantwort (akzeptierte Antworten)
+        if question_type_index in (0, 2):
             for i in range(0, len(self.answers), 2):
                 answer_text = self.answers[i].toPlainText()
                 is_correct = 1 if self.answers[i + 1].isChecked() else 0
-                answers.append((answer_text, is_correct))
+                # Importierte Teilpunkte behalten, solange richtig/falsch nicht umgestellt wurde
+                loaded = self.answer_fractions[i // 2] if i // 2 < len(self.answer_fractions) else (None, None)
+                fraction = loaded[1] if loaded[0] == is_correct else None
+                answers.append((answer_text, is_correct, fraction))
         
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        conn = get_connection(self.db_path)
         tags = self.get_tags_string()
         
-        if self.question_id:
-            c.execute(
-                """UPDATE questions SET title=?, questiontext=?, single=?, tags=?, points=?, question_type=? WHERE id=?""",
-                (self.title_edit.text().strip(), self.question_edit.toPlainText().strip(),
-                 1 if self.single_cb.isChecked() else 0, tags, self.points_spin.value(), question_type, self.question_id)
-            )
-            c.execute("DELETE FROM answers WHERE question_id=?", (self.question_id,))
-            qid = self.question_id
-        else:
-            c.execute(
-                "INSERT INTO questions (title, questiontext, single, tags, points, question_type) VALUES (?, ?, ?, ?, ?, ?)",
-                (self.title_edit.text().strip(), self.question_edit.toPlainText().strip(),
-                 1 if self.single_cb.isChecked() else 0, tags, self.points_spin.value(), question_type)
-            )
-            qid = c.lastrowid
+        c = conn.cursor()
+        description = f"Frage bearbeiten (ID {self.question_id})" if self.question_id else "Neue Frage"
+        # Im Journal aufzeichnen, damit das Überschreiben rückgängig gemacht werden kann
+        with conn, record_changes(c, description, [self.question_id] if self.question_id else []) as changed_ids:
+            if self.question_id and question_type == self.imported_type:
+                # Original-XML und Antworten bleiben, nur die bearbeitbaren Felder ändern
+                c.execute(
+                    """UPDATE questions SET title=?, questiontext=?, tags=?, points=? WHERE id=?""",
+                    (self.title_edit.text().strip(), self.question_edit.toPlainText().strip(),
+                     tags, self.points_spin.value(), self.question_id)
+                )
+                qid = self.question_id
+            elif self.question_id:
+                c.execute(
+                    """UPDATE questions SET title=?, questiontext=?, single=?, tags=?, points=?, question_type=?,
+                                            raw_xml=NULL WHERE id=?""",
+                    (self.title_edit.text().strip(), self.question_edit.toPlainText().strip(),
+                     1 if self.single_cb.isChecked() else 0, tags, self.points_spin.value(), question_type, self.question_id)
+                )
+                c.execute("DELETE FROM answers WHERE question_id=?", (self.question_id,))
+                qid = self.question_id
+            else:
+                c.execute(
+                    "INSERT INTO questions (title, questiontext, single, tags, points, question_type) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.title_edit.text().strip(), self.question_edit.toPlainText().strip(),
+                     1 if self.single_cb.isChecked() else 0, tags, self.points_spin.value(), question_type)
+                )
+                qid = c.lastrowid
+                changed_ids.append(qid)
         
-        for answer_text, is_correct in answers:
-            if answer_text.strip():
-                c.execute("INSERT INTO answers (question_id, answertext, is_correct) VALUES (?, ?, ?)",
-                         (qid, answer_text.strip(), is_correct))
+            for answer_text, is_correct, fraction in answers:
+                if answer_text.strip():
+                    c.execute("INSERT INTO answers (question_id, answertext, is_correct, fraction) VALUES (?, ?, ?, ?)",
+                             (qid, answer_text.strip(), is_correct, fraction))
+            refresh_content_hashes(c, [qid])
+            refresh_question_tags(c, [qid])
+        notify_question_changes(self.db_path, [qid])
         
-        conn.commit()
-        conn.close()
         QMessageBox.information(self, "✅ Erfolg", "Frage gespeichert!")
         self.accept()
 
@@ -378,8 +417,168 @@ class SettingsDialog(QDialog):
         reply = QMessageBox.question(self, "Löschen bestätigen", f"Sollen '{db_name}' gelöscht werden?\n\nACHTUNG: Alle Fragen gehen verloren!", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
             try:
+                close_connections(db_path)
                 os.remove(db_path)
                 QMessageBox.information(self, "Gelöscht", f"'{db_name}' entfernt!")
                 self.refresh_db_list()
             except Exception as e:
                 QMessageBox.critical(self, "Fehler", f"Konnte nicht löschen:\n{str(e)}")
+
+
+class ExamVariantsDialog(QDialog):
+    """Einstellungen für gemischte Prüfungsvarianten (Anzahl, Seed, Mischen, XML)"""
+
+    def __init__(self, question_count, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🎲 Prüfungsvarianten erstellen")
+        self.setMinimumWidth(450)
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(f"{question_count} ausgewählte Fragen"))
+
+        grid = QGridLayout()
+        grid.addWidget(QLabel("Anzahl Varianten:"), 0, 0)
+        self.count_spin = QSpinBox()
+        self.count_spin.setRange(1, 26)
+        self.count_spin.setValue(4)
+        grid.addWidget(self.count_spin, 0, 1)
+        grid.addWidget(QLabel("Seed:"), 1, 0)
+        self.seed_edit = QLineEdit()
+        self.seed_edit.setPlaceholderText("leer = zufällig (steht auf dem Lösungsblatt)")
+        grid.addWidget(self.seed_edit, 1, 1)
+        layout.addLayout(grid)
+
+        self.shuffle_questions_cb = QCheckBox("Reihenfolge der Fragen mischen")
+        self.shuffle_questions_cb.setChecked(True)
+        layout.addWidget(self.shuffle_questions_cb)
+        self.shuffle_answers_cb = QCheckBox("Reihenfolge der Antworten mischen")
+        self.shuffle_answers_cb.setChecked(True)
+        layout.addWidget(self.shuffle_answers_cb)
+        self.xml_cb = QCheckBox("Zusätzlich je Variante eine Moodle XML Datei")
+        layout.addWidget(self.xml_cb)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        ok_btn = QPushButton("Weiter...")
+        ok_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Abbrechen")
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(ok_btn)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    def options(self):
+        """Keyword-Argumente für exporter.export_exam_variants"""
+        return {
+            'variant_count': self.count_spin.value(),
+            'seed': self.seed_edit.text().strip() or None,
+            'shuffle_questions': self.shuffle_questions_cb.isChecked(),
+            'shuffle_answers': self.shuffle_answers_cb.isChecked(),
+            'xml': self.xml_cb.isChecked(),
+        }
+
+
+class BatchTagsDialog(QDialog):
+    """Tags mehrerer Fragen auf einmal ergänzen, entfernen oder ersetzen"""
+
+    def __init__(self, question_count, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("🏷️ Tags der Auswahl ändern")
+        self.setMinimumWidth(450)
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(f"{question_count} ausgewählte Fragen"))
+
+        grid = QGridLayout()
+        grid.addWidget(QLabel("Hinzufügen:"), 0, 0)
+        self.add_edit = QLineEdit()
+        self.add_edit.setPlaceholderText("z.B. Kurs 3A, Java")
+        grid.addWidget(self.add_edit, 0, 1)
+        grid.addWidget(QLabel("Entfernen:"), 1, 0)
+        self.remove_edit = QLineEdit()
+        self.remove_edit.setPlaceholderText("kommagetrennt")
+        grid.addWidget(self.remove_edit, 1, 1)
+        layout.addLayout(grid)
+
+        self.replace_cb = QCheckBox("Bisherige Tags vorher alle entfernen")
+        self.replace_cb.toggled.connect(self.remove_edit.setDisabled)
+        layout.addWidget(self.replace_cb)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        ok_btn = QPushButton("Übernehmen")
+        ok_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Abbrechen")
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(ok_btn)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    def options(self):
+        """Keyword-Argumente für database.retag_questions"""
+        return {
+            'add': split_tags(self.add_edit.text()),
+            'remove': [] if self.replace_cb.isChecked() else split_tags(self.remove_edit.text()),
+            'replace': self.replace_cb.isChecked(),
+        }
+
+
+def _format_amount(value, unit):
+    """Menge für die Fortschrittsanzeige; Bytes werden in MB angegeben"""
+    if unit == "B":
+        return f"{value / 1e6:,.1f} MB"
+    return f"{value:,.0f} {unit}"
+
+
+def _format_duration(seconds):
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    return f"{seconds // 60:.0f} min {seconds % 60:.0f} s"
+
+
+class TaskProgressDialog(QProgressDialog):
+    """Fortschritt eines Hintergrund-Imports/-Exports mit Durchsatz und Restzeit"""
+
+    # Auflösung des Balkens (Bytezahlen passen nicht immer in den int-Bereich)
+    STEPS = 1000
+
+    def __init__(self, title, label, unit, parent=None):
+        super().__init__(label, "Abbrechen", 0, self.STEPS, parent)
+        self.label = label
+        self.cancel_button = QPushButton("Abbrechen")
+        self.setCancelButton(self.cancel_button)
+        self.unit = unit
+        self.start = time.perf_counter()
+        self.setWindowTitle(title)
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setMinimumDuration(300)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        self.setMinimumWidth(420)
+        self.canceled.connect(self.on_canceled)
+        self.setValue(0)
+
+    def update_progress(self, done, total):
+        if self.wasCanceled():
+            return
+        if total:
+            self.setValue(min(int(done * self.STEPS / total), self.STEPS))
+        text = f"{self.label}\n{_format_amount(done, self.unit)} von {_format_amount(total, self.unit)}"
+        elapsed = time.perf_counter() - self.start
+        rate = done / elapsed if elapsed > 0 else 0
+        if rate > 0:
+            text += f" · {_format_amount(rate, self.unit)}/s"
+            if total > done:
+                text += f" · noch ca. {_format_duration((total - done) / rate)}"
+        self.setLabelText(text)
+
+    def finish(self):
+        """Schließt den Dialog, ohne dass closeEvent ein canceled auslöst"""
+        self.canceled.disconnect()
+        self.close()
+
+    def on_canceled(self):
+        # Dialog bleibt sichtbar, bis der Worker das Zurückrollen gemeldet hat
+        self.setLabelText(f"{self.label}\n⏹ Wird abgebrochen...")
+        self.cancel_button.setEnabled(False)
+        self.show()
@@ -1,218 +1,645 @@
+import copy
+import gzip
+import os
+import random
+import time
 import xml.etree.ElementTree as ET
-import sqlite3
-from docx import Document
-from docx.shared import Inches, Pt, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
+from database import (
+    iter_questions, iter_question_fragments, split_tags, OperationCancelled,
+    select_question_ids, get_export_profile_time, mark_export_profile
+)
 
-def export_to_moodle_xml(db_path, question_ids, filename):
-    """Exportiert ausgewählte Fragen als Moodle XML"""
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>\n'
 
-    quiz = ET.Element('quiz')
+# Mindestabstand zwischen zwei progress()-Meldungen in Sekunden
+PROGRESS_INTERVAL = 0.1
 
-    for qid in question_ids:
-        c.execute('SELECT title, questiontext, single, tags, points, question_type FROM questions WHERE id=?', (qid,))
-        row = c.fetchone()
-        if not row:
-            continue
-        title, questiontext, single, tags, points = row[:5]
-        question_type = row[5] if len(row) > 5 else 'multichoice'
-
-        # Fragetyp bestimmen
-        if question_type == 'essay':
-            question = ET.SubElement(quiz, 'question', type='essay')
-        elif question_type == 'shortanswer':
-            question = ET.SubElement(quiz, 'question', type='shortanswer')
-        else:
-            question = ET.SubElement(quiz, 'question', type='multichoice')
+# Version von _build_question_element für den render_cache der Datenbank.
+# Bei jeder Änderung an der XML-Ausgabe erhöhen, sonst werden alte Fragmente exportiert.
+RENDER_VERSION = 1
+
+
+def _with_progress(records, total, progress=None, is_cancelled=None):
+    """Reicht Datensätze durch, meldet progress(erledigt, gesamt) und prüft is_cancelled()"""
+    done = 0
+    last_report = 0.0
+    for record in records:
+        if is_cancelled is not None and is_cancelled():
+            raise OperationCancelled()
+        yield record
+        done += 1
+        if progress is not None:
+            now = time.perf_counter()
+            if done == total or now - last_report >= PROGRESS_INTERVAL:
+                progress(done, total)
+                last_report = now
+
+
+def _open_output(filename, compress=None):
+    """Öffnet die Zieldatei binär, bei compress (Standard: Endung .gz) gzip-komprimiert"""
+    if compress is None:
+        compress = filename.lower().endswith('.gz')
+    if compress:
+        return gzip.open(filename, 'wb')
+    return open(filename, 'wb')
+
+
+def _number_text(value):
+    """Zahl wie im Moodle XML: '100', '0', '33.33333', '-50'"""
+    return f'{value:.7f}'.rstrip('0').rstrip('.')
+
+
+def _fraction_text(is_correct, fraction):
+    """Bewertung einer Antwort; ohne Teilpunkte 100 bzw. 0"""
+    if fraction is None:
+        return '100' if is_correct == 1 else '0'
+    return _number_text(fraction)
+
+
+def _set_child_text(question, tag, text):
+    """Setzt den Text von <tag><text>...</text></tag>, legt fehlende Elemente an"""
+    parent = question.find(tag)
+    if parent is None:
+        parent = ET.SubElement(question, tag)
+    text_elem = parent.find('text')
+    if text_elem is None:
+        text_elem = ET.SubElement(parent, 'text')
+    text_elem.text = text
+
+
+def _raw_question_element(record):
+    """Original-XML eines importierten Fragetyps; Titel, Fragetext, Punkte und Tags aus der DB"""
+    question = ET.fromstring(record['raw_xml'])
+    _set_child_text(question, 'name', record['title'])
+    _set_child_text(question, 'questiontext', record['questiontext'])
+
+    defaultgrade = question.find('defaultgrade')
+    if defaultgrade is None:
+        defaultgrade = ET.SubElement(question, 'defaultgrade')
+    defaultgrade.text = _number_text(record['points'])
+
+    # Tags an derselben Stelle ersetzen
+    old_tags = question.find('tags')
+    position = list(question).index(old_tags) if old_tags is not None else len(question)
+    if old_tags is not None:
+        question.remove(old_tags)
+    tag_texts = split_tags(record['tags'])
+    if tag_texts:
+        tags_root = ET.Element('tags')
+        for tag_text in tag_texts:
+            ET.SubElement(ET.SubElement(tags_root, 'tag'), 'text').text = tag_text
+        question.insert(position, tags_root)
+    return question
 
-        name = ET.SubElement(question, 'name')
-        ET.SubElement(name, 'text').text = title
 
-        questiontext_node = ET.SubElement(question, 'questiontext', format='html')
-        ET.SubElement(questiontext_node, 'text').text = questiontext
+def _build_question_element(record):
+    """Erzeugt das <question>-Element für einen Frage-Datensatz"""
+    if record.get('raw_xml'):
+        return _raw_question_element(record)
 
-        ET.SubElement(question, 'generalfeedback', format='html').text = ''
-        ET.SubElement(question, 'defaultgrade').text = f'{points:.1f}'
+    title = record['title']
+    questiontext = record['questiontext']
+    single = record['single']
+    tags = record['tags']
+    points = record['points']
+    question_type = record['question_type']
+
+    # Fragetyp bestimmen
+    if question_type == 'essay':
+        question = ET.Element('question', type='essay')
+    elif question_type == 'shortanswer':
+        question = ET.Element('question', type='shortanswer')
+    elif question_type == 'truefalse':
+        question = ET.Element('question', type='truefalse')
+    else:
+        question = ET.Element('question', type='multichoice')
+
+    name = ET.SubElement(question, 'name')
+    ET.SubElement(name, 'text').text = title
+
+    questiontext_node = ET.SubElement(question, 'questiontext', format='html')
+    ET.SubElement(questiontext_node, 'text').text = questiontext
+
+    ET.SubElement(question, 'generalfeedback', format='html').text = ''
+    ET.SubElement(question, 'defaultgrade').text = f'{points:.1f}'
+    
+    # Nur bei Multichoice
+    if question_type == 'multichoice':
+        ET.SubElement(question, 'single').text = 'true' if single == 1 else 'false'
+        ET.SubElement(question, 'shuffleanswers').text = 'true'
+        ET.SubElement(question, 'answernumbering').text = 'abc'
         
-        # Nur bei Multichoice
-        if question_type == 'multichoice':
-            ET.SubElement(question, 'single').text = 'true' if single == 1 else 'false'
-            ET.SubElement(question, 'shuffleanswers').text = 'true'
-            ET.SubElement(question, 'answernumbering').text = 'abc'
-            
-            # All-or-Nothing Bewertungsmethode bei Multiple Choice
-            if single == 0:  # Multiple Choice
-                # Setze scoring method auf "all-or-nothing" (mcq_scoring_method)
-                # Dies ist die korrekte Moodle-Einstellung für "alle oder nichts"
-                ET.SubElement(question, 'shownumcorrect')  # Leeres Element
-            
-            # Feedback
-            ET.SubElement(question, 'correctfeedback', format='html').text = '<text>Ihre Antwort ist richtig.</text>'
-            ET.SubElement(question, 'partiallycorrectfeedback', format='html').text = '<text>Ihre Antwort ist teilweise richtig.</text>'
-            ET.SubElement(question, 'incorrectfeedback', format='html').text = '<text>Ihre Antwort ist falsch.</text>'
+        # All-or-Nothing Bewertungsmethode bei Multiple Choice
+        if single == 0:  # Multiple Choice
+            # Setze scoring method auf "all-or-nothing" (mcq_scoring_method)
+            # Dies ist die korrekte Moodle-Einstellung für "alle oder nichts"
+            ET.SubElement(question, 'shownumcorrect')  # Leeres Element
         
-        # Essay-spezifische Felder
-        if question_type == 'essay':
-            ET.SubElement(question, 'responseformat').text = 'editor'
-            ET.SubElement(question, 'responserequired').text = '1'
-            ET.SubElement(question, 'responsefieldlines').text = '15'
-            ET.SubElement(question, 'attachments').text = '0'
-            ET.SubElement(question, 'attachmentsrequired').text = '0'
-            ET.SubElement(question, 'graderinfo', format='html').text = ''
-            ET.SubElement(question, 'responsetemplate', format='html').text = ''
+        # Feedback
+        ET.SubElement(question, 'correctfeedback', format='html').text = '<text>Ihre Antwort ist richtig.</text>'
+        ET.SubElement(question, 'partiallycorrectfeedback', format='html').text = '<text>Ihre Antwort ist teilweise richtig.</text>'
+        ET.SubElement(question, 'incorrectfeedback', format='html').text = '<text>Ihre Antwort ist falsch.</text>'
+    
+    # Essay-spezifische Felder
+    if question_type == 'essay':
+        ET.SubElement(question, 'responseformat').text = 'editor'
+        ET.SubElement(question, 'responserequired').text = '1'
+        ET.SubElement(question, 'responsefieldlines').text = '15'
+        ET.SubElement(question, 'attachments').text = '0'
+        ET.SubElement(question, 'attachmentsrequired').text = '0'
+        ET.SubElement(question, 'graderinfo', format='html').text = ''
+        ET.SubElement(question, 'responsetemplate', format='html').text = ''
+    
+    # Shortanswer-spezifische Felder
+    if question_type == 'shortanswer':
+        ET.SubElement(question, 'usecase').text = '0'
+
+    # Tags
+    tags_root = ET.SubElement(question, 'tags')
+    for tag_text in split_tags(tags):
+        tag = ET.SubElement(tags_root, 'tag')
+        ET.SubElement(tag, 'text').text = tag_text
+
+    # Antworten (nur bei Multichoice, Shortanswer und Wahr/Falsch)
+    if question_type in ['multichoice', 'shortanswer', 'truefalse']:
+        answers = record['answers']
         
-        # Shortanswer-spezifische Felder
-        if question_type == 'shortanswer':
-            ET.SubElement(question, 'usecase').text = '0'
-
-        # Tags
-        tags_root = ET.SubElement(question, 'tags')
-        for t in tags.split(','):
-            tag_text = t.strip()
-            if tag_text:
-                tag = ET.SubElement(tags_root, 'tag')
-                ET.SubElement(tag, 'text').text = tag_text
-
-        # Antworten (nur bei Multichoice und Shortanswer)
-        if question_type in ['multichoice', 'shortanswer']:
-            c.execute('SELECT answertext, is_correct FROM answers WHERE question_id=?', (qid,))
-            answers = c.fetchall()
+        # Bei Multiple Choice mit All-or-Nothing
+        if question_type == 'multichoice' and single == 0:
+            # Zähle richtige Antworten
+            correct_count = sum(1 for a in answers if a[1] == 1)
             
-            # Bei Multiple Choice mit All-or-Nothing
-            if question_type == 'multichoice' and single == 0:
-                # Zähle richtige Antworten
-                correct_count = sum(1 for a in answers if a[1] == 1)
+            # All-or-Nothing: nur richtige Antworten bekommen 100%, alle anderen 0%
+            # Nur wenn ALLE richtigen ausgewählt sind UND KEINE falschen, gibt es Punkte
+            # (importierte Teilpunkte bleiben erhalten)
+            for answertext, is_correct, fraction in answers:
+                if not answertext.strip():
+                    continue
                 
-                # All-or-Nothing: nur richtige Antworten bekommen 100%, alle anderen 0%
-                # Nur wenn ALLE richtigen ausgewählt sind UND KEINE falschen, gibt es Punkte
-                for answertext, is_correct in answers:
-                    if not answertext.strip():
-                        continue
-                    
-                    answer = ET.SubElement(question, 'answer', fraction=('100' if is_correct == 1 else '0'), format='html')
-                    ET.SubElement(answer, 'text').text = answertext
-                    ET.SubElement(answer, 'feedback', format='html').text = ''
-            
-            # Bei Single Choice oder Shortanswer: normale Bewertung
-            elif question_type == 'multichoice' and single == 1:
-                for answertext, is_correct in answers:
-                    fraction = '100' if is_correct == 1 else '0'
-                    answer = ET.SubElement(question, 'answer', fraction=fraction, format='html')
-                    ET.SubElement(answer, 'text').text = answertext
-                    ET.SubElement(answer, 'feedback', format='html').text = ''
-            
-            # Shortanswer: Standard-Bewertung
-            else:
-                for answertext, is_correct in answers:
-                    fraction = '100' if is_correct == 1 else '0'
-                    answer = ET.SubElement(question, 'answer', fraction=fraction, format='html')
-                    ET.SubElement(answer, 'text').text = answertext
-                    ET.SubElement(answer, 'feedback', format='html').text = ''
+                answer = ET.SubElement(question, 'answer', fraction=_fraction_text(is_correct, fraction), format='html')
+                ET.SubElement(answer, 'text').text = answertext
+                ET.SubElement(answer, 'feedback', format='html').text = ''
+        
+        # Bei Single Choice oder Shortanswer: normale Bewertung
+        elif question_type == 'multichoice' and single == 1:
+            for answertext, is_correct, fraction in answers:
+                answer = ET.SubElement(question, 'answer', fraction=_fraction_text(is_correct, fraction), format='html')
+                ET.SubElement(answer, 'text').text = answertext
+                ET.SubElement(answer, 'feedback', format='html').text = ''
+        
+        # Shortanswer und Wahr/Falsch: Standard-Bewertung
+        else:
+            for answertext, is_correct, fraction in answers:
+                answer = ET.SubElement(question, 'answer', fraction=_fraction_text(is_correct, fraction), format='html')
+                ET.SubElement(answer, 'text').text = answertext
+                ET.SubElement(answer, 'feedback', format='html').text = ''
+
+    return question
+
+
+def _render_question(record):
+    """Serialisiertes <question>-Element einer Frage (Fragment für Streaming und Cache)"""
+    return ET.tostring(_build_question_element(record), encoding='utf-8', xml_declaration=False)
+
+
+def export_to_moodle_xml(db_path, question_ids, filename, streaming=False, compress=None,
+                         progress=None, is_cancelled=None, use_cache=True):
+    """Exportiert ausgewählte Fragen als Moodle XML
+
+    Mit streaming=True wird jedes <question>-Element sofort in die Datei
+    geschrieben, der Speicherbedarf bleibt auch bei sehr großen Exporten
+    konstant. Die Ausgabe ist in beiden Modi byte-identisch.
+    Beim Streaming werden mit use_cache die Fragmente aus dem render_cache
+    der Datenbank übernommen und nur neue oder geänderte Fragen gerendert.
+    compress=True (oder Dateiendung .gz) schreibt direkt gzip-komprimiert.
+    progress(erledigt, gesamt) meldet den Fortschritt in Fragen; bei Abbruch
+    über is_cancelled() wird die angefangene Datei gelöscht und
+    OperationCancelled ausgelöst.
+    """
+    if streaming:
+        if use_cache:
+            fragments = iter_question_fragments(db_path, question_ids, _render_question, RENDER_VERSION)
+        else:
+            fragments = map(_render_question, iter_questions(db_path, question_ids))
+        try:
+            _write_moodle_xml_fragments(_with_progress(fragments, len(question_ids), progress, is_cancelled),
+                                        filename, compress)
+        except OperationCancelled:
+            os.remove(filename)
+            raise
+        return
+
+    records = _with_progress(iter_questions(db_path, question_ids), len(question_ids), progress, is_cancelled)
+    quiz = ET.Element('quiz')
+    for record in records:
+        quiz.append(_build_question_element(record))
 
     tree = ET.ElementTree(quiz)
     
     # ✅ KORRIGIERTE XML-SCHREIBUNG (ohne short_empty_tags)
-    with open(filename, 'wb') as f:
-        f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+    with _open_output(filename, compress) as f:
+        f.write(XML_DECLARATION)
         tree.write(f, encoding='utf-8', xml_declaration=False)
-    
-    conn.close()
 
 
-def export_to_word(db_path, question_ids, filename):
-    """Exportiert ausgewählte Fragen als 2-spaltiges Word-Dokument"""
-    from docx import Document
+def _write_moodle_xml_streaming(records, filename, compress=None):
+    """Schreibt die Fragen einzeln serialisiert, ohne den ganzen <quiz>-Baum aufzubauen"""
+    _write_moodle_xml_fragments(map(_render_question, records), filename, compress)
+
+
+def _write_moodle_xml_fragments(fragments, filename, compress=None):
+    """Schreibt fertig serialisierte <question>-Fragmente in ein <quiz>"""
+    with _open_output(filename, compress) as f:
+        f.write(XML_DECLARATION)
+        empty = True
+        for fragment in fragments:
+            if empty:
+                f.write(b'<quiz>')
+                empty = False
+            f.write(fragment)
+        # Leeres Quiz wie ElementTree als "<quiz />" schreiben
+        f.write(b'<quiz />' if empty else b'</quiz>')
+
+
+def export_changes_to_moodle_xml(db_path, profile, filename, question_ids=None, compress=None,
+                                 progress=None, is_cancelled=None):
+    """Exportiert nur die Fragen, die seit dem letzten Lauf des Profils angelegt oder geändert wurden.
+
+    Beim ersten Lauf eines Profils werden alle Fragen exportiert. Mit
+    question_ids wird das Delta auf diese Auswahl beschränkt (Reihenfolge
+    bleibt erhalten). Der Zeitpunkt wird vor dem Lesen festgehalten und erst
+    nach erfolgreichem Export gespeichert: Änderungen während des Exports
+    kommen beim nächsten Lauf erneut mit, ein abgebrochener Export zählt
+    nicht. Gelöschte Fragen lassen sich in Moodle XML nicht ausdrücken.
+    Gibt die Anzahl exportierter Fragen zurück; ohne Änderungen wird keine
+    Datei geschrieben.
+    """
+    # SQL_NOW rundet auf Millisekunden ab: mit etwas Vorlauf fehlt eine Änderung
+    # direkt nach diesem Zeitpunkt beim nächsten Lauf nicht
+    started = time.time() - 0.001
+    changed = select_question_ids(db_path, changed_since=get_export_profile_time(db_path, profile))
+    if question_ids is not None:
+        changed_set = set(changed)
+        changed = [qid for qid in question_ids if qid in changed_set]
+    if changed:
+        export_to_moodle_xml(db_path, changed, filename, streaming=True, compress=compress,
+                             progress=progress, is_cancelled=is_cancelled)
+    mark_export_profile(db_path, profile, started)
+    return len(changed)
+
+
+# Fragen pro Teildokument beim Word-Export (siehe _render_word_chunk)
+WORD_CHUNK_SIZE = 200
+
+# Verwendete Formatvorlagen; ihre IDs werden pro Dokument nur einmal aufgelöst
+WORD_STYLES = ('Heading 1', 'Heading 2', 'Intense Quote', 'Light Grid Accent 1')
+
+
+def _word_style_ids(doc):
+    """Style-Name -> Style-ID (python-docx durchsucht sonst bei jeder Zuweisung alle Styles)"""
+    return {name: doc.styles[name].style_id for name in WORD_STYLES}
+
+
+def _add_word_question(doc, idx, record, style_ids, mark_correct=True):
+    """Fügt eine Frage (Überschrift, Punkte, Text, Antworttabelle, Tags) an das Dokument an.
+
+    mark_correct=False lässt die richtigen Antworten unmarkiert (Prüfungsvarianten).
+    """
     from docx.shared import Inches, Pt, RGBColor
     from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+    # Seitenumbruch vor jeder Frage (außer vor der ersten)
+    if idx > 1:
+        doc.add_page_break()
+
+    title = record['title']
+    questiontext = record['questiontext']
+    tags = record['tags']
+    points = record['points']
+    question_type = record['question_type']
+    
+    # Fragenummer und Titel (entspricht doc.add_heading(..., level=2))
+    heading = doc.add_paragraph(f'Frage {idx}: {title}')
+    heading._p.style = style_ids['Heading 2']
+    
+    # Punkteanzahl
+    points_para = doc.add_paragraph(f'Punkte: {points:.1f}')
+    points_para.runs[0].bold = True
     
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
+    # Fragetext
+    question_para = doc.add_paragraph(questiontext)
+    question_para._p.style = style_ids['Intense Quote']
     
+    # Antworten (alle Typen außer Essay, z.B. Zuordnungspaare oder Zahlen)
+    if question_type != 'essay':
+        answers = record['answers']
+        
+        if answers:
+            # 2-spaltige Tabelle für Antworten erstellen
+            table = doc.add_table(rows=len(answers), cols=2)
+            table._tbl.tblStyle_val = style_ids['Light Grid Accent 1']
+            
+            # Spaltenbreiten setzen
+            table.columns[0].width = Inches(0.5)  # Checkbox-Spalte
+            table.columns[1].width = Inches(5.5)  # Antwort-Spalte
+            
+            # Zeilenweise statt table.cell(i, j): das baut jedes Mal alle Zellen der Tabelle auf
+            for row, (answertext, is_correct, _) in zip(table.rows, answers):
+                checkbox_cell, answer_cell = row.cells
+
+                # Checkbox-Spalte
+                checkbox_cell.text = '☐'
+                checkbox_para = checkbox_cell.paragraphs[0]
+                checkbox_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                checkbox_run = checkbox_para.runs[0]
+                checkbox_run.font.size = Pt(16)
+                
+                # Antwort-Spalte
+                answer_cell.text = answertext
+                answer_para = answer_cell.paragraphs[0]
+                
+                # Richtige Antworten grün markieren (nur zur Kontrolle)
+                if mark_correct and is_correct == 1:
+                    answer_run = answer_para.runs[0]
+                    answer_run.font.color.rgb = RGBColor(0, 128, 0)
+                    answer_run.font.bold = True
+    
+    else:
+        # Essay-Fragen: Platz für Antwort lassen
+        doc.add_paragraph('Antwort:')
+        doc.add_paragraph('_' * 80)
+        doc.add_paragraph()
+        doc.add_paragraph('_' * 80)
+        doc.add_paragraph()
+    
+    # Tags hinzufügen
+    if tags:
+        tags_para = doc.add_paragraph(f'Tags: {tags}')
+        tags_para.runs[0].font.italic = True
+        tags_para.runs[0].font.size = Pt(9)
+        tags_para.runs[0].font.color.rgb = RGBColor(128, 128, 128)
+
+
+def _render_word_chunk(chunk, serialize=True):
+    """Rendert [(Fragenummer, Datensatz), ...] in ein eigenes Dokument.
+
+    Gibt die Body-Elemente zurück, mit serialize=True als XML-Bytes, damit sie
+    aus Worker-Prozessen übertragen werden können. Kleine Teildokumente
+    vermeiden außerdem, dass python-docx bei jedem neuen Absatz den immer
+    längeren Body durchsucht.
+    """
+    from docx import Document
+    from lxml import etree
+
+    doc = Document()
+    style_ids = _word_style_ids(doc)
+    for idx, record in chunk:
+        _add_word_question(doc, idx, record, style_ids)
+    body = doc.element.body
+    elements = [element for element in body.iterchildren() if element is not body.sectPr]
+    if serialize:
+        return [etree.tostring(element) for element in elements]
+    return elements
+
+
+def _word_chunks(records, size=WORD_CHUNK_SIZE):
+    """Nummeriert die Fragen durch und teilt sie in Blöcke für _render_word_chunk"""
+    chunk = []
+    for idx, record in enumerate(records, 1):
+        chunk.append((idx, record))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _new_word_document(heading):
+    """Leeres Dokument mit zentrierter Überschrift und Leerzeile"""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     # Neues Word-Dokument erstellen
     doc = Document()
     
     # Titel hinzufügen
-    title = doc.add_heading('Test - Multiple Choice Fragen', level=1)
+    title = doc.add_heading(heading, level=1)
     title.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
     doc.add_paragraph()  # Leerzeile
+    return doc
+
+
+def export_to_word(db_path, question_ids, filename, progress=None, is_cancelled=None,
+                   parallel=False, max_workers=None):
+    """Exportiert ausgewählte Fragen als 2-spaltiges Word-Dokument
+
+    Die Fragen werden in Blöcken zu WORD_CHUNK_SIZE gerendert und dann
+    zusammengefügt; mit parallel=True rendern Worker-Prozesse die Blöcke.
+    Beide Modi erzeugen dasselbe Dokument.
+    progress/is_cancelled wie bei export_to_moodle_xml; bei Abbruch wird
+    keine Datei geschrieben.
+    """
+    from docx.oxml import parse_xml
+
+    doc = _new_word_document('Test - Multiple Choice Fragen')
     
-    # Für jede Frage eine 2-spaltige Tabelle erstellen
-    for idx, qid in enumerate(question_ids, 1):
-        c.execute('SELECT title, questiontext, single, tags, points, question_type FROM questions WHERE id=?', (qid,))
-        row = c.fetchone()
-        if not row:
-            continue
-            
-        title, questiontext, single, tags, points = row[:5]
-        question_type = row[5] if len(row) > 5 else 'multichoice'
-        
-        # Fragenummer und Titel
-        heading = doc.add_heading(f'Frage {idx}: {title}', level=2)
-        
-        # Punkteanzahl
-        points_para = doc.add_paragraph(f'Punkte: {points:.1f}')
-        points_para.runs[0].bold = True
-        
-        # Fragetext
-        question_para = doc.add_paragraph(questiontext)
-        question_para.style = 'Intense Quote'
-        
-        # Antworten (nur bei Multichoice und Shortanswer)
-        if question_type in ['multichoice', 'shortanswer']:
-            c.execute('SELECT answertext, is_correct FROM answers WHERE question_id=?', (qid,))
-            answers = c.fetchall()
-            
-            if answers:
-                # 2-spaltige Tabelle für Antworten erstellen
-                table = doc.add_table(rows=len(answers), cols=2)
-                table.style = 'Light Grid Accent 1'
-                
-                # Spaltenbreiten setzen
-                table.columns[0].width = Inches(0.5)  # Checkbox-Spalte
-                table.columns[1].width = Inches(5.5)  # Antwort-Spalte
-                
-                for i, (answertext, is_correct) in enumerate(answers):
-                    # Checkbox-Spalte
-                    checkbox_cell = table.cell(i, 0)
-                    checkbox_cell.text = '☐'
-                    checkbox_para = checkbox_cell.paragraphs[0]
-                    checkbox_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    checkbox_run = checkbox_para.runs[0]
-                    checkbox_run.font.size = Pt(16)
-                    
-                    # Antwort-Spalte
-                    answer_cell = table.cell(i, 1)
-                    answer_cell.text = answertext
-                    answer_para = answer_cell.paragraphs[0]
-                    
-                    # Richtige Antworten grün markieren (nur zur Kontrolle)
-                    if is_correct == 1:
-                        answer_run = answer_para.runs[0]
-                        answer_run.font.color.rgb = RGBColor(0, 128, 0)
-                        answer_run.font.bold = True
-        
-        elif question_type == 'essay':
-            # Essay-Fragen: Platz für Antwort lassen
-            doc.add_paragraph('Antwort:')
-            doc.add_paragraph('_' * 80)
-            doc.add_paragraph()
-            doc.add_paragraph('_' * 80)
-            doc.add_paragraph()
-        
-        # Tags hinzufügen
-        if tags:
-            tags_para = doc.add_paragraph(f'Tags: {tags}')
-            tags_para.runs[0].font.italic = True
-            tags_para.runs[0].font.size = Pt(9)
-            tags_para.runs[0].font.color.rgb = RGBColor(128, 128, 128)
-        
-        # Seitenumbruch nach jeder Frage (außer bei der letzten)
-        if idx < len(question_ids):
-            doc.add_page_break()
+    # Gerenderte Blöcke in Reihenfolge vor den Abschnittseigenschaften einfügen
+    sect_pr = doc.element.body.sectPr
+    total = len(question_ids)
+    done = 0
+
+    def merge(elements, chunk_size):
+        nonlocal done
+        for element in elements:
+            sect_pr.addprevious(parse_xml(element) if isinstance(element, bytes) else element)
+        done += chunk_size
+        if progress is not None:
+            progress(done, total)
+
+    chunks = _word_chunks(iter_questions(db_path, question_ids))
+    # Ein einzelner Block oder nur ein Kern: Prozesse würden nur Zeit kosten
+    if not parallel or total <= WORD_CHUNK_SIZE or (max_workers or os.cpu_count() or 1) == 1:
+        for chunk in chunks:
+            if is_cancelled is not None and is_cancelled():
+                raise OperationCancelled()
+            merge(_render_word_chunk(chunk, serialize=False), len(chunk))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            chunk_sizes = []
+            futures = []
+            for chunk in chunks:
+                chunk_sizes.append(len(chunk))
+                futures.append(pool.submit(_render_word_chunk, chunk))
+            for future, chunk_size in zip(futures, chunk_sizes):
+                if is_cancelled is not None and is_cancelled():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise OperationCancelled()
+                merge(future.result(), chunk_size)
     
     # Dokument speichern
     doc.save(filename)
-    conn.close()
+
+
+def _variant_name(number):
+    """A, B, ..., Z, danach fortlaufende Nummern"""
+    return chr(ord('A') + number) if number < 26 else str(number + 1)
+
+
+def _answer_letter(position):
+    return chr(ord('a') + position) if position < 26 else str(position + 1)
+
+
+def plan_exam_variants(records, variant_count, seed, shuffle_questions=True, shuffle_answers=True):
+    """Legt für jede Variante Fragen- und Antwortreihenfolge fest.
+
+    Gibt pro Variante eine Liste [(Index in records, Antwortreihenfolge), ...]
+    zurück. Jede Variante hat einen eigenen, aus seed abgeleiteten Zufalls-
+    generator; gleicher seed ergibt also immer dieselben Varianten.
+    """
+    plans = []
+    for number in range(variant_count):
+        rnd = random.Random(f"{seed}:{number}")
+        question_order = list(range(len(records)))
+        if shuffle_questions:
+            rnd.shuffle(question_order)
+        plan = []
+        for index in question_order:
+            answer_order = list(range(len(records[index]['answers'])))
+            if shuffle_answers:
+                rnd.shuffle(answer_order)
+            plan.append((index, answer_order))
+        plans.append(plan)
+    return plans
+
+
+def _render_word_blocks(records):
+    """Rendert jede Frage genau einmal (als "Frage 1", ohne Seitenumbruch).
+
+    Gibt (Body-Elemente je Frage, Seitenumbruch-Absatz) zurück. Die Varianten
+    kopieren diese Vorlagen nur noch, statt jede Frage neu mit python-docx
+    aufzubauen.
+    """
+    from docx import Document
+
+    blocks = []
+    page_break = None
+    for start in range(0, len(records), WORD_CHUNK_SIZE):
+        doc = Document()
+        style_ids = _word_style_ids(doc)
+        body = doc.element.body
+        if page_break is None:
+            page_break = doc.add_page_break()._p
+        for record in records[start:start + WORD_CHUNK_SIZE]:
+            first = len(body) - 1  # Index von sectPr = erstes neues Element
+            # Varianten gehen an die Prüflinge: keine Markierung der Lösung
+            _add_word_question(doc, 1, record, style_ids, mark_correct=False)
+            blocks.append(body[first:len(body) - 1])
+    return blocks, page_break
+
+
+def _write_word_variant(blocks, page_break, plan, heading, filename):
+    """Setzt eine Variante aus kopierten Fragen-Vorlagen zusammen und speichert sie"""
+    from docx.oxml.ns import qn
+
+    doc = _new_word_document(heading)
+    sect_pr = doc.element.body.sectPr
+    for number, (index, answer_order) in enumerate(plan, 1):
+        if number > 1:
+            sect_pr.addprevious(copy.deepcopy(page_break))
+        for position, element in enumerate(blocks[index]):
+            element = copy.deepcopy(element)
+            sect_pr.addprevious(element)
+            if position == 0:
+                # Überschrift wurde als "Frage 1: ..." gerendert
+                text = element.find(f'{qn("w:r")}/{qn("w:t")}')
+                text.text = f'Frage {number}: ' + text.text[len('Frage 1: '):]
+            elif element.tag == qn('w:tbl'):
+                # Antwortzeilen in die Reihenfolge der Variante bringen
+                rows = element.findall(qn('w:tr'))
+                for row in rows:
+                    element.remove(row)
+                for answer_index in answer_order:
+                    element.append(rows[answer_index])
+    doc.save(filename)
+
+
+def _write_answer_key(records, plans, names, seed, filename):
+    """Lösungsblatt: je Variante Fragenummer, Frage und richtige Antworten (a, b, ...)"""
+    doc = _new_word_document('Lösungsschlüssel')
+    doc.add_paragraph(f'{len(records)} Fragen, {len(plans)} Varianten, Seed: {seed}')
+    style_ids = _word_style_ids(doc)
+
+    for number, (name, plan) in enumerate(zip(names, plans)):
+        if number > 0:
+            doc.add_page_break()
+        heading = doc.add_paragraph(f'Variante {name}')
+        heading._p.style = style_ids['Heading 2']
+
+        table = doc.add_table(rows=len(plan) + 1, cols=3)
+        table._tbl.tblStyle_val = style_ids['Light Grid Accent 1']
+        header = table.rows[0].cells
+        header[0].text = 'Nr.'
+        header[1].text = 'Frage'
+        header[2].text = 'Richtig'
+        for question_number, (row, (index, answer_order)) in enumerate(zip(table.rows[1:], plan), 1):
+            record = records[index]
+            correct = [_answer_letter(position) for position, answer_index in enumerate(answer_order)
+                       if record['answers'][answer_index][1] == 1]
+            number_cell, title_cell, correct_cell = row.cells
+            number_cell.text = str(question_number)
+            title_cell.text = f"{record['title']} (ID {record['id']})"
+            correct_cell.text = ", ".join(correct) if correct else '–'
+    doc.save(filename)
+
+
+def export_exam_variants(db_path, question_ids, filename, variant_count, seed=None,
+                         shuffle_questions=True, shuffle_answers=True, xml=False,
+                         progress=None, is_cancelled=None):
+    """Erzeugt variant_count gemischte Prüfungsvarianten plus Lösungsblatt.
+
+    Aus filename "test.docx" werden test_A.docx, test_B.docx, ... (mit xml=True
+    zusätzlich test_A.xml, ...) und test_Loesung.docx. Die Fragen werden nur
+    einmal geladen und nur einmal mit python-docx gerendert; jede Variante
+    kopiert diese Vorlagen und ändert nur Reihenfolge und Nummerierung.
+    Ohne seed wird einer gewürfelt und auf dem Lösungsblatt vermerkt.
+    progress(erledigte Varianten, Varianten) und is_cancelled wie bei
+    export_to_word; bei Abbruch werden die schon geschriebenen Dateien
+    gelöscht. Gibt die Liste der geschriebenen Dateien zurück.
+    """
+    if seed is None:
+        seed = random.randrange(1_000_000)
+    base, _ = os.path.splitext(filename)
+    names = [_variant_name(number) for number in range(variant_count)]
+
+    records = list(iter_questions(db_path, question_ids))
+    plans = plan_exam_variants(records, variant_count, seed, shuffle_questions, shuffle_answers)
+    blocks, page_break = _render_word_blocks(records)
+
+    written = []
+    try:
+        for done, (name, plan) in enumerate(zip(names, plans), 1):
+            if is_cancelled is not None and is_cancelled():
+                raise OperationCancelled()
+            variant_file = f'{base}_{name}.docx'
+            _write_word_variant(blocks, page_break, plan, f'Test - Multiple Choice Fragen (Variante {name})',
+                                variant_file)
+            written.append(variant_file)
+            if xml:
+                xml_file = f'{base}_{name}.xml'
+                _write_moodle_xml_streaming(
+                    (dict(records[index], answers=[records[index]['answers'][i] for i in answer_order])
+                     for index, answer_order in plan), xml_file)
+                written.append(xml_file)
+            if progress is not None:
+                progress(done, variant_count)
+
+        key_file = f'{base}_Loesung.docx'
+        _write_answer_key(records, plans, names, seed, key_file)
+        written.append(key_file)
+    except OperationCancelled:
+        for written_file in written:
+            os.remove(written_file)
+        raise
+    return written
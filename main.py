@@ -1,6 +1,5 @@
 import sys
 from PyQt6.QtWidgets import QApplication, QFileDialog, QMessageBox, QPushButton
-from main_window import MainWindow
 import os
 from database import init_database_schema
 
@@ -56,9 +55,17 @@ def select_database_at_start():
         QMessageBox.information(None, "✅ Datenbank erstellt", f"Neue Datenbank wurde erfolgreich erstellt:\n{os.path.basename(filename)}")
     
     # Hauptfenster mit gewählter DB starten
+    show_main_window(app, filename)
+
+def show_main_window(app, filename):
+    # Erst hier importieren: der Auswahldialog erscheint, bevor das Hauptfenster geladen ist
+    from main_window import MainWindow
     window = MainWindow(db_path=filename)
     window.show()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    # Nötig für den parallelen Import (ProcessPoolExecutor) in der gepackten App
+    import multiprocessing
+    multiprocessing.freeze_support()
     select_database_at_start()
\ No newline at end of file
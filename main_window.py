@@ -2,22 +2,37 @@ import os
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
-    QWidget, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QFileDialog, QLineEdit, QLabel
+    QWidget, QPushButton, QTableView,
+    QMessageBox, QFileDialog, QLineEdit, QLabel, QInputDialog
 )
 from PyQt6.QtGui import QKeySequence, QAction
-from PyQt6.QtCore import Qt
-import sqlite3
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
+
+# dialogs und exporter (python-docx, lxml) werden erst bei Bedarf importiert,
+# damit das Hauptfenster schneller erscheint
+from database import (
+    init_database_schema, import_moodle_xml_streaming, import_moodle_xml_files, duplicate_question,
+    merge_duplicate_questions, delete_questions, retag_questions, rescale_points, set_single_choice,
+    set_question_type, QUESTION_TYPES, undo_last_change, redo_last_change, get_undo_state, compact_journal,
+    get_export_profiles, add_change_listener, remove_change_listener
+)
+from question_model import QuestionTableModel
+from workers import SearchWorker, TaskWorker
+from connection import close_connections
 
-from dialogs import QuestionDialog, SettingsDialog
-from exporter import export_to_moodle_xml, export_to_word
-from database import init_database_schema, get_questions_overview, import_moodle_xml, duplicate_question
+# Exporte löschen angefangene Dateien beim Abbruch selbst (siehe exporter.py)
+EXPORT_CANCELLED_MESSAGE = "⏹ Export abgebrochen.\nAngefangene Dateien wurden gelöscht."
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, db_path="mcq_questions.db"):
+    # Wartezeit nach dem letzten Tastendruck, bevor die Suche startet
+    SEARCH_DEBOUNCE_MS = 200
+
+    def __init__(self, db_path="mcq_questions.db", search_debounce_ms=SEARCH_DEBOUNCE_MS):
         super().__init__()
         self.db_path = db_path
+        self.search_debounce_ms = search_debounce_ms
+        self.search_generation = 0
         self.init_db()
 
         # 🖥️ VOLLBILD AUTOMATISCH
@@ -27,6 +42,8 @@ class MainWindow(QMainWindow):
         self.create_menu()
         self.setup_central_widget()
         self.refresh_table()
+        # Einzeländerungen (Bearbeiten, Löschen, Sammeländerungen, Rückgängig) patchen nur ihre Zeilen
+        add_change_listener(self.on_questions_changed)
 
     def setup_central_widget(self):
         central = QWidget()
@@ -37,17 +54,16 @@ class MainWindow(QMainWindow):
         search_layout.addWidget(QLabel("🔍 Suche (live):"))
         self.search_edit = QLineEdit()
         self.search_edit.setMinimumHeight(40)
-        self.search_edit.setPlaceholderText("Titel, Tags oder Fragetext eingeben...")
-        self.search_edit.textChanged.connect(self.apply_filter)
+        self.search_edit.setPlaceholderText("Titel, Tags oder Fragetext eingeben... (#Tag bzw. #\"Tag mit Leerzeichen\" = nur Fragen mit diesem Tag)")
+        self.search_edit.textChanged.connect(self.schedule_search)
         search_layout.addWidget(self.search_edit)
         layout.addLayout(search_layout)
 
-        # 6-Spalten-Tabelle MIT FRAGETEXT
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Titel", "Punkte", "Tags", "Antworten", "Fragetext (Vorschau)"
-        ])
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        # 6-Spalten-Tabelle MIT FRAGETEXT (Modell lädt Zeilen seitenweise aus der DB)
+        self.model = QuestionTableModel(self.db_path, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.horizontalHeader().setStretchLastSection(True)
         
         # SPALTENBREITEN OPTIMAL
@@ -58,7 +74,7 @@ class MainWindow(QMainWindow):
         self.table.setColumnWidth(4, 90)   # Antworten
         self.table.setColumnWidth(5, 400)  # Fragetext
         
-        self.table.cellDoubleClicked.connect(self.edit_question)
+        self.table.doubleClicked.connect(self.edit_question)
         layout.addWidget(self.table)
 
         # BUTTONS mit LÖSCHEN (volle Breite)
@@ -85,27 +101,44 @@ class MainWindow(QMainWindow):
         export_btn = QPushButton("📤 moodle.xml exportieren")
         export_btn.setMinimumHeight(45)
         export_btn.clicked.connect(self.export_xml)
+
+        # DELTA EXPORT BUTTON
+        export_changes_btn = QPushButton("🔄 Änderungen exportieren")
+        export_changes_btn.setMinimumHeight(45)
+        export_changes_btn.clicked.connect(self.export_changes)
         
         # WORD EXPORT BUTTON
         export_word_btn = QPushButton("📄 Word exportieren")
         export_word_btn.setMinimumHeight(45)
         export_word_btn.clicked.connect(self.export_word)
 
+        # PRÜFUNGSVARIANTEN BUTTON
+        variants_btn = QPushButton("🎲 Prüfungsvarianten")
+        variants_btn.setMinimumHeight(45)
+        variants_btn.clicked.connect(self.export_exam_variants)
+
         button_layout.addWidget(new_btn)
         button_layout.addWidget(refresh_btn)
         button_layout.addWidget(duplicate_btn)
         button_layout.addWidget(delete_btn)
         button_layout.addStretch()
         button_layout.addWidget(export_btn)
+        button_layout.addWidget(export_changes_btn)
         button_layout.addWidget(export_word_btn)
+        button_layout.addWidget(variants_btn)
         layout.addLayout(button_layout)
 
         central.setLayout(layout)
         self.setCentralWidget(central)
 
-        # Daten für Filterung
-        self.all_rows = []
-        self.all_question_texts = {}
+        # Suche erst nach einer Tipp-Pause im Hintergrund starten
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.search_debounce_ms)
+        self.search_timer.timeout.connect(self.apply_filter)
+
+        self.search_latency_label = QLabel()
+        self.statusBar().addPermanentWidget(self.search_latency_label)
 
     def create_menu(self):
         menubar = self.menuBar()
@@ -119,6 +152,17 @@ class MainWindow(QMainWindow):
         
         # BEARBEITEN-MENÜ
         delete_menu = menubar.addMenu("Bearbeiten")
+
+        # Rückgängig/Wiederholen über das Änderungsjournal in der Datenbank
+        self.undo_action = QAction("↩️ Rückgängig", self)
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.undo_action.triggered.connect(self.undo_change)
+        delete_menu.addAction(self.undo_action)
+        self.redo_action = QAction("↪️ Wiederholen", self)
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        self.redo_action.triggered.connect(self.redo_change)
+        delete_menu.addAction(self.redo_action)
+        delete_menu.addSeparator()
         
         duplicate_action = QAction("📋 Frage duplizieren", self)
         duplicate_action.setShortcut(QKeySequence("Ctrl+D"))
@@ -129,6 +173,23 @@ class MainWindow(QMainWindow):
         delete_action.setShortcut(QKeySequence("Ctrl+Delete"))
         delete_action.triggered.connect(self.delete_selected_questions)
         delete_menu.addAction(delete_action)
+
+        # Sammeländerungen für alle markierten Fragen (je eine Transaktion)
+        batch_menu = delete_menu.addMenu("✏️ Auswahl bearbeiten")
+        for text, slot in [("🏷️ Tags ändern...", self.retag_selected_questions),
+                           ("🔢 Punkte setzen...", self.set_points_of_selected),
+                           ("✖️ Punkte multiplizieren...", self.rescale_points_of_selected),
+                           ("☑️ Single Choice", lambda: self.set_single_of_selected(1)),
+                           ("☑️ Multiple Choice", lambda: self.set_single_of_selected(0)),
+                           ("📝 Fragetyp ändern...", self.set_type_of_selected)]:
+            action = QAction(text, self)
+            action.triggered.connect(slot)
+            batch_menu.addAction(action)
+        
+        delete_menu.addSeparator()
+        merge_action = QAction("🧹 Duplikate zusammenführen", self)
+        merge_action.triggered.connect(self.merge_duplicates)
+        delete_menu.addAction(merge_action)
         
         # Import
         import_menu = menubar.addMenu("Import")
@@ -137,13 +198,13 @@ class MainWindow(QMainWindow):
         import_action.triggered.connect(self.import_moodle_xml)
         import_menu.addAction(import_action)
 
+    def selected_rows(self):
+        """Markierte Tabellenzeilen in Anzeigereihenfolge"""
+        return sorted(index.row() for index in self.table.selectionModel().selectedRows())
+
     def duplicate_selected_question(self):
         """📋 Dupliziert die ausgewählte Frage inkl. aller Antworten"""
-        selected_rows = []
-        for i in range(self.table.rowCount()):
-            item = self.table.item(i, 0)
-            if item and self.table.item(i, 0).isSelected():
-                selected_rows.append(i)
+        selected_rows = self.selected_rows()
 
         if len(selected_rows) == 0:
             QMessageBox.warning(self, "⚠️ Keine Auswahl", "Wähle genau eine Frage zum Duplizieren aus!")
@@ -153,15 +214,14 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "⚠️ Zu viele Fragen", "Bitte wähle nur EINE Frage zum Duplizieren aus!")
             return
 
-        question_id = int(self.table.item(selected_rows[0], 0).text())
-        title = self.table.item(selected_rows[0], 1).text()
+        question_id = self.model.question_id(selected_rows[0])
+        title = self.model.question_title(selected_rows[0])
         
         # Duplizieren
         try:
             new_qid = duplicate_question(self.db_path, question_id)
             if new_qid:
                 QMessageBox.information(self, "✅ Dupliziert", f"Frage '{title}' wurde erfolgreich dupliziert!\nNeue ID: {new_qid}")
-                self.refresh_table()
             else:
                 QMessageBox.critical(self, "❌ Fehler", "Frage konnte nicht gefunden werden!")
         except Exception as e:
@@ -169,11 +229,7 @@ class MainWindow(QMainWindow):
 
     def delete_selected_questions(self):
         """🗑️ LÖSCHT markierte Fragen mit Sicherheitsabfrage"""
-        selected_rows = []
-        for i in range(self.table.rowCount()):
-            item = self.table.item(i, 0)
-            if item and self.table.item(i, 0).isSelected():
-                selected_rows.append(i)
+        selected_rows = self.selected_rows()
 
         if not selected_rows:
             QMessageBox.warning(self, "⚠️ Keine Auswahl", "Wähle mindestens eine Frage aus!")
@@ -182,13 +238,13 @@ class MainWindow(QMainWindow):
         # TITEL der zu löschenden Fragen sammeln
         questions_to_delete = []
         for row in selected_rows:
-            qid = int(self.table.item(row, 0).text())
-            title = self.table.item(row, 1).text()
+            qid = self.model.question_id(row)
+            title = self.model.question_title(row)
             questions_to_delete.append(f"• {title} (ID: {qid})")
 
         # SICHERHEITSABFRAGE mit Liste
         delete_text = f"Sollen {len(questions_to_delete)} Frage(n) GELÖSCHT werden?\n\n"
-        delete_text += "💥 **ACHTUNG: Dieser Vorgang kann NICHT rückgängig gemacht werden!**\n\n"
+        delete_text += "↩️ Der Vorgang kann über Bearbeiten → Rückgängig (Strg+Z) zurückgenommen werden.\n\n"
         delete_text += "Zu löschende Fragen:\n" + "\n".join(questions_to_delete[:5])
         if len(questions_to_delete) > 5:
             delete_text += f"\n... und {len(questions_to_delete)-5} weitere"
@@ -204,160 +260,357 @@ class MainWindow(QMainWindow):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        # LÖSCHEN
-        question_ids = [int(self.table.item(row, 0).text()) for row in selected_rows]
+        # LÖSCHEN (eine Anweisung, Antworten per ON DELETE CASCADE)
+        question_ids = [self.model.question_id(row) for row in selected_rows]
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            for qid in question_ids:
-                c.execute("DELETE FROM questions WHERE id=?", (qid,))
-            conn.commit()
-            conn.close()
+            delete_questions(self.db_path, question_ids)
             
             QMessageBox.information(self, "✅ Gelöscht", f"🗑️ {len(question_ids)} Frage(n) erfolgreich gelöscht!")
-            self.refresh_table()
             
         except Exception as e:
             QMessageBox.critical(self, "❌ Löschfehler", f"Konnte Fragen nicht löschen:\n{str(e)}")
 
+    def selected_question_ids(self):
+        """IDs der markierten Fragen; ohne Auswahl Hinweis und leere Liste"""
+        question_ids = [self.model.question_id(row) for row in self.selected_rows()]
+        if not question_ids:
+            QMessageBox.warning(self, "⚠️ Keine Auswahl", "Wähle mindestens eine Frage aus!")
+        return question_ids
+
+    def run_batch_edit(self, function, question_ids, *args, **kwargs):
+        """Führt eine Sammeländerung aus und meldet das Ergebnis in der Statusleiste"""
+        try:
+            changed_count = function(self.db_path, question_ids, *args, **kwargs)
+        except Exception as e:
+            QMessageBox.critical(self, "❌ Fehler", f"Änderung fehlgeschlagen:\n{str(e)}")
+            return
+        self.statusBar().showMessage(f"✓ {changed_count} von {len(question_ids)} Fragen geändert")
+
+    def retag_selected_questions(self):
+        from dialogs import BatchTagsDialog
+        question_ids = self.selected_question_ids()
+        if not question_ids:
+            return
+        dialog = BatchTagsDialog(len(question_ids), self)
+        if dialog.exec():
+            self.run_batch_edit(retag_questions, question_ids, **dialog.options())
+
+    def set_points_of_selected(self):
+        question_ids = self.selected_question_ids()
+        if not question_ids:
+            return
+        points, ok = QInputDialog.getDouble(self, "🔢 Punkte setzen", f"Punkte für {len(question_ids)} Fragen:",
+                                            1.0, 0.0, 100.0, 2)
+        if ok:
+            self.run_batch_edit(rescale_points, question_ids, points=points)
+
+    def rescale_points_of_selected(self):
+        question_ids = self.selected_question_ids()
+        if not question_ids:
+            return
+        factor, ok = QInputDialog.getDouble(self, "✖️ Punkte multiplizieren",
+                                            f"Punkte von {len(question_ids)} Fragen multiplizieren mit:",
+                                            1.0, 0.0, 100.0, 2)
+        if ok:
+            self.run_batch_edit(rescale_points, question_ids, factor=factor)
+
+    def set_single_of_selected(self, single):
+        question_ids = self.selected_question_ids()
+        if question_ids:
+            self.run_batch_edit(set_single_choice, question_ids, single)
+
+    def set_type_of_selected(self):
+        question_ids = self.selected_question_ids()
+        if not question_ids:
+            return
+        question_type, ok = QInputDialog.getItem(self, "📝 Fragetyp ändern",
+                                                 f"Neuer Fragetyp für {len(question_ids)} Fragen:",
+                                                 list(QUESTION_TYPES), 0, False)
+        if not ok:
+            return
+        if question_type == 'essay':
+            reply = QMessageBox.question(self, "📝 Freitext?",
+                                         "Freitextfragen haben keine Antwortoptionen.\n"
+                                         "Die Antworten der ausgewählten Fragen werden gelöscht. Fortfahren?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        self.run_batch_edit(set_question_type, question_ids, question_type)
+
+    def merge_duplicates(self):
+        """🧹 Führt Fragen mit gleichem Inhalt (Titel, Text, Typ, Antworten) zusammen"""
+        reply = QMessageBox.question(self, "🧹 Duplikate zusammenführen?",
+                                     "Fragen mit gleichem Inhalt zusammenführen?\n\n"
+                                     "Es bleibt jeweils die älteste Frage erhalten, die Tags der Duplikate werden übernommen.",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            group_count, removed_count = merge_duplicate_questions(self.db_path)
+        except Exception as e:
+            QMessageBox.critical(self, "❌ Fehler", f"Zusammenführen fehlgeschlagen:\n{str(e)}")
+            return
+        QMessageBox.information(self, "✅ Zusammengeführt",
+                                f"✓ {removed_count} Duplikate in {group_count} Gruppen zusammengeführt")
+
     def show_settings(self):
+        from dialogs import SettingsDialog
         dialog = SettingsDialog(self.db_path, self)
         result = dialog.exec()
         if result == dialog.DialogCode.Accepted:
             new_db_text = dialog.new_db_path.text()
             if new_db_text != "Keine ausgewählt":
+                close_connections(self.db_path)
                 self.db_path = new_db_text
                 init_database_schema(self.db_path)
                 self.setWindowTitle(f"Moodle MCQ Tool v3.0 - DB: {os.path.basename(self.db_path)}")
                 self.refresh_table()
 
     def import_moodle_xml(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Moodle XML importieren", "", "Moodle XML (*.xml)")
-        if not filename:
+        filenames, _ = QFileDialog.getOpenFileNames(self, "Moodle XML importieren", "", "Moodle XML (*.xml)")
+        if not filenames:
             return
-        imported_count, message = import_moodle_xml(self.db_path, filename)
+        if len(filenames) == 1:
+            # Fortschritt in gelesenen Bytes der Datei
+            self.run_task("Import", f"📥 Importiere {os.path.basename(filenames[0])}...", "B",
+                          self.on_import_finished, import_moodle_xml_streaming, self.db_path, filenames[0],
+                          cancel_message="⏹ Import abgebrochen.\nDie laufende Transaktion wurde zurückgerollt.",
+                          refresh_on_cancel=True)
+        else:
+            # Mehrere Dateien: parallel parsen, Fortschritt in Dateien
+            self.run_task("Import", f"📥 Importiere {len(filenames)} Dateien...", "Dateien",
+                          self.on_import_files_finished, import_moodle_xml_files, self.db_path, filenames,
+                          cancel_message="⏹ Import abgebrochen.\nDie gerade gelesene Datei wurde zurückgerollt, "
+                                         "bereits abgeschlossene Dateien bleiben importiert.",
+                          refresh_on_cancel=True)
+
+    def on_import_finished(self, result):
+        imported_count, message = result
         QMessageBox.information(self, "Import abgeschlossen", message)
         self.refresh_table()
 
+    def on_import_files_finished(self, result):
+        imported_count, results = result
+        message = f"✓ {imported_count} Fragen aus {len(results)} Dateien importiert\n\n"
+        message += "\n".join(f"{os.path.basename(name)}: {file_message}" for name, _, file_message in results)
+        QMessageBox.information(self, "Import abgeschlossen", message)
+        self.refresh_table()
+
+    def run_task(self, title, label, unit, on_finished, function, *args,
+                 cancel_message=EXPORT_CANCELLED_MESSAGE, refresh_on_cancel=False, **kwargs):
+        """Startet einen Import/Export im Hintergrund mit Fortschrittsdialog.
+
+        cancel_message wird nach einem Abbruch angezeigt; mit refresh_on_cancel
+        wird danach die Tabelle neu geladen (Importe, die Teile behalten).
+        """
+        from dialogs import TaskProgressDialog
+        worker = TaskWorker(function, *args, **kwargs)
+        dialog = TaskProgressDialog(title, label, unit, self)
+        worker.signals.progress.connect(dialog.update_progress)
+        worker.signals.finished.connect(dialog.finish)
+        worker.signals.finished.connect(on_finished)
+        worker.signals.failed.connect(dialog.finish)
+        worker.signals.failed.connect(self.on_task_failed)
+        worker.signals.cancelled.connect(dialog.finish)
+        worker.signals.cancelled.connect(lambda: self.on_task_cancelled(cancel_message, refresh_on_cancel))
+        dialog.canceled.connect(worker.cancel)
+        # Referenzen halten, bis der Worker fertig ist
+        self.task_worker = worker
+        self.task_dialog = dialog
+        QThreadPool.globalInstance().start(worker)
+
+    def on_task_failed(self, error):
+        if isinstance(error, ImportError):
+            QMessageBox.critical(self, "Fehler", "Das Modul 'python-docx' ist nicht installiert.\n\nBitte installieren Sie es mit:\npip install python-docx")
+        else:
+            QMessageBox.critical(self, "Fehler", f"Vorgang fehlgeschlagen:\n{str(error)}")
+
+    def on_task_cancelled(self, message, refresh=False):
+        QMessageBox.information(self, "Abgebrochen", message)
+        if refresh:
+            self.refresh_table()
+
     def init_db(self):
         init_database_schema(self.db_path)
+        # Alte Journal-Einträge beim Start aufräumen (siehe JOURNAL_MAX_* in database.py)
+        compact_journal(self.db_path)
 
     def new_question(self):
+        from dialogs import QuestionDialog
         dialog = QuestionDialog(self.db_path, parent=self)
-        if dialog.exec():
-            self.refresh_table()
+        dialog.exec()
 
-    def edit_question(self, row, column):
-        item = self.table.item(row, 0)
-        if not item:
+    def edit_question(self, index):
+        if not index.isValid():
             return
-        question_id = int(item.text())
+        from dialogs import QuestionDialog
+        question_id = self.model.question_id(index.row())
         dialog = QuestionDialog(self.db_path, question_id=question_id, parent=self)
-        if dialog.exec():
-            self.refresh_table()
+        dialog.exec()
 
     def refresh_table(self):
-        """Lädt ALLE Fragen inkl. Fragetext-Cache"""
+        """Lädt die Fragen neu (aktueller Suchbegriff bleibt erhalten)"""
         try:
-            self.all_rows = get_questions_overview(self.db_path)
-            
-            # Fragetext-Cache füllen
-            self.all_question_texts.clear()
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            for row in self.all_rows:
-                qid = row[0]
-                c.execute("SELECT questiontext FROM questions WHERE id=?", (qid,))
-                result = c.fetchone()
-                self.all_question_texts[qid] = result[0] if result else ""
-            conn.close()
-            
-            self.apply_filter()
-            status = f"Alle Fragen geladen: {len(self.all_rows)}"
-            self.statusBar().showMessage(status)
+            self.model.set_db_path(self.db_path)
+            self.show_filter_status()
+            self.update_undo_actions()
         except Exception as e:
             QMessageBox.critical(self, "DB Fehler", f"Konnte DB nicht öffnen:\n{str(e)}")
 
-    def apply_filter(self):
-        """Filtert UND zeigt Tabelle mit Fragetext-Spalte"""
+    def on_questions_changed(self, db_path, question_ids):
+        """Änderungsmeldung aus database.py: nur die betroffenen Zeilen aktualisieren"""
+        if os.path.abspath(db_path) != os.path.abspath(self.db_path):
+            return
+        self.model.apply_changes(question_ids)
+        self.show_filter_status()
+        self.update_undo_actions()
+
+    def closeEvent(self, event):
+        remove_change_listener(self.on_questions_changed)
+        super().closeEvent(event)
+
+    def update_undo_actions(self):
+        """Beschriftet Rückgängig/Wiederholen mit der betroffenen Änderung"""
+        undo_description, redo_description = get_undo_state(self.db_path)
+        self.undo_action.setEnabled(undo_description is not None)
+        self.undo_action.setText(f"↩️ Rückgängig: {undo_description}" if undo_description else "↩️ Rückgängig")
+        self.redo_action.setEnabled(redo_description is not None)
+        self.redo_action.setText(f"↪️ Wiederholen: {redo_description}" if redo_description else "↪️ Wiederholen")
+
+    def undo_change(self):
         try:
-            search_term = self.search_edit.text().strip().lower()
-            
-            if not search_term:
-                filtered_rows = self.all_rows
-            else:
-                filtered_rows = []
-                for row in self.all_rows:
-                    qid, title, points, tags, count = row
-                    questiontext = self.all_question_texts.get(qid, "").lower()
-                    search_text = f"{title.lower()} {tags.lower()} {questiontext}"
-                    if search_term in search_text:
-                        filtered_rows.append(row)
-
-            # 6 SPALTEN FÜLLEN (mit Fragetext!)
-            self.table.setRowCount(len(filtered_rows))
-            for i, row in enumerate(filtered_rows):
-                qid, title, points, tags, count = row
-                question_preview = self.all_question_texts.get(qid, "")[:80] + "..." if len(self.all_question_texts.get(qid, "")) > 80 else self.all_question_texts.get(qid, "")
-                
-                self.table.setItem(i, 0, QTableWidgetItem(str(qid)))
-                self.table.setItem(i, 1, QTableWidgetItem(title))
-                self.table.setItem(i, 2, QTableWidgetItem(f"{points:.1f}"))
-                tags_short = tags[:25] + "..." if len(tags) > 25 else tags
-                self.table.setItem(i, 3, QTableWidgetItem(tags_short))
-                self.table.setItem(i, 4, QTableWidgetItem(str(count)))
-                self.table.setItem(i, 5, QTableWidgetItem(question_preview))
-
-            total = len(self.all_rows)
-            found = len(filtered_rows)
-            status = f"Gefunden: {found} von {total} Fragen"
-            self.statusBar().showMessage(status)
+            description = undo_last_change(self.db_path)
+        except Exception as e:
+            QMessageBox.critical(self, "❌ Fehler", f"Rückgängig fehlgeschlagen:\n{str(e)}")
+            return
+        if description:
+            self.statusBar().showMessage(f"↩️ Rückgängig gemacht: {description}")
 
+    def redo_change(self):
+        try:
+            description = redo_last_change(self.db_path)
         except Exception as e:
-            self.statusBar().showMessage(f"Filter Fehler: {str(e)}")
+            QMessageBox.critical(self, "❌ Fehler", f"Wiederholen fehlgeschlagen:\n{str(e)}")
+            return
+        if description:
+            self.statusBar().showMessage(f"↪️ Wiederholt: {description}")
+
+    def schedule_search(self):
+        """Startet den Debounce-Timer bei jedem Tastendruck neu"""
+        self.search_generation += 1
+        self.search_timer.start()
+
+    def apply_filter(self):
+        """Startet die Suche über den Volltextindex in einem Hintergrund-Thread"""
+        self.search_generation += 1
+        generation = self.search_generation
+        worker = SearchWorker(
+            self.db_path, self.search_edit.text().strip(), self.model.page_size, generation,
+            is_stale=lambda: generation != self.search_generation
+        )
+        worker.signals.finished.connect(self.on_search_finished)
+        worker.signals.failed.connect(self.on_search_failed)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_search_finished(self, generation, search_text, rows, total_count, elapsed_ms):
+        # Veraltete Ergebnisse verwerfen
+        if generation != self.search_generation:
+            return
+        self.model.set_rows(search_text, rows, total_count)
+        self.search_latency_label.setText(f"⏱️ Suche: {elapsed_ms:.0f} ms")
+        self.show_filter_status()
+
+    def on_search_failed(self, generation, message):
+        if generation == self.search_generation:
+            self.statusBar().showMessage(f"Filter Fehler: {message}")
+
+    def show_filter_status(self):
+        if self.model.search_text:
+            status = f"Gefunden: {self.model.total_count} von {self.model.question_count} Fragen"
+        else:
+            status = f"Alle Fragen geladen: {self.model.total_count}"
+        self.statusBar().showMessage(status)
 
     def export_xml(self):
-        selected_rows = set()
-        for i in range(self.table.rowCount()):
-            item = self.table.item(i, 0)
-            if item and self.table.item(i, 0).isSelected():
-                selected_rows.add(i)
+        from exporter import export_to_moodle_xml
+        selected_rows = self.selected_rows()
 
         if not selected_rows:
             QMessageBox.warning(self, "Fehler", "Wähle mindestens eine Frage aus!")
             return
 
-        question_ids = [int(self.table.item(row, 0).text()) for row in selected_rows]
-        filename, _ = QFileDialog.getSaveFileName(self, "moodle.xml speichern", "moodle_quiz.xml", "XML (*.xml)")
+        question_ids = [self.model.question_id(row) for row in selected_rows]
+        filename, _ = QFileDialog.getSaveFileName(self, "moodle.xml speichern", "moodle_quiz.xml",
+                                                  "XML (*.xml);;XML gzip-komprimiert (*.xml.gz)")
+        if filename:
+            self.run_task("Export", f"📤 Exportiere {len(question_ids)} Fragen...", "Fragen",
+                          lambda _: QMessageBox.information(self, "Erfolg", f"{len(question_ids)} Fragen exportiert!\n{filename}"),
+                          export_to_moodle_xml, self.db_path, question_ids, filename, streaming=True)
+
+    def export_changes(self):
+        """Exportiert nur seit dem letzten Lauf des gewählten Profils neue oder geänderte Fragen.
+
+        Mit Auswahl wird das Delta auf die markierten Fragen beschränkt, sonst gilt es für alle.
+        """
+        from exporter import export_changes_to_moodle_xml
+        selected_rows = self.selected_rows()
+        question_ids = [self.model.question_id(row) for row in selected_rows] if selected_rows else None
+
+        profiles = [name for name, _ in get_export_profiles(self.db_path)]
+        profile, ok = QInputDialog.getItem(self, "🔄 Änderungen exportieren",
+                                           "Exportprofil (neuer Name = erster Lauf exportiert alles):",
+                                           profiles or ["moodle"], 0, True)
+        profile = profile.strip()
+        if not ok or not profile:
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "moodle.xml speichern", f"{profile}_aenderungen.xml",
+                                                  "XML (*.xml);;XML gzip-komprimiert (*.xml.gz)")
         if filename:
-            try:
-                export_to_moodle_xml(self.db_path, question_ids, filename)
-                QMessageBox.information(self, "Erfolg", f"{len(question_ids)} Fragen exportiert!\n{filename}")
-            except Exception as e:
-                QMessageBox.critical(self, "Fehler", f"Export fehlgeschlagen:\n{str(e)}")
+            self.run_task("Export", f"🔄 Exportiere Änderungen für Profil {profile}...", "Fragen",
+                          lambda count: QMessageBox.information(
+                              self, "Erfolg", f"{count} neue oder geänderte Fragen exportiert!\n{filename}" if count
+                              else f"Keine Änderungen seit dem letzten Export mit Profil {profile}."),
+                          export_changes_to_moodle_xml, self.db_path, profile, filename, question_ids)
 
     def export_word(self):
         """Exportiert ausgewählte Fragen als Word-Dokument"""
-        selected_rows = set()
-        for i in range(self.table.rowCount()):
-            item = self.table.item(i, 0)
-            if item and self.table.item(i, 0).isSelected():
-                selected_rows.add(i)
+        from exporter import export_to_word
+        selected_rows = self.selected_rows()
 
         if not selected_rows:
             QMessageBox.warning(self, "Fehler", "Wähle mindestens eine Frage aus!")
             return
 
-        question_ids = [int(self.table.item(row, 0).text()) for row in selected_rows]
+        question_ids = [self.model.question_id(row) for row in selected_rows]
         filename, _ = QFileDialog.getSaveFileName(self, "Word-Dokument speichern", "test_fragen.docx", "Word Dokument (*.docx)")
         if filename:
-            try:
-                export_to_word(self.db_path, question_ids, filename)
-                QMessageBox.information(self, "Erfolg", f"{len(question_ids)} Fragen als Word-Dokument exportiert!\n{filename}")
-            except ImportError:
-                QMessageBox.critical(self, "Fehler", "Das Modul 'python-docx' ist nicht installiert.\n\nBitte installieren Sie es mit:\npip install python-docx")
-            except Exception as e:
-                QMessageBox.critical(self, "Fehler", f"Export fehlgeschlagen:\n{str(e)}")
+            self.run_task("Export", f"📄 Exportiere {len(question_ids)} Fragen als Word-Dokument...", "Fragen",
+                          lambda _: QMessageBox.information(self, "Erfolg", f"{len(question_ids)} Fragen als Word-Dokument exportiert!\n{filename}"),
+                          export_to_word, self.db_path, question_ids, filename, parallel=True)
+
+
+    def export_exam_variants(self):
+        """Erzeugt gemischte Prüfungsvarianten der ausgewählten Fragen plus Lösungsblatt"""
+        from dialogs import ExamVariantsDialog
+        from exporter import export_exam_variants
+        selected_rows = self.selected_rows()
+
+        if not selected_rows:
+            QMessageBox.warning(self, "Fehler", "Wähle mindestens eine Frage aus!")
+            return
+
+        question_ids = [self.model.question_id(row) for row in selected_rows]
+        dialog = ExamVariantsDialog(len(question_ids), self)
+        if not dialog.exec():
+            return
+        options = dialog.options()
+        filename, _ = QFileDialog.getSaveFileName(self, "Prüfungsvarianten speichern (Basisname)", "pruefung.docx",
+                                                  "Word Dokument (*.docx)")
+        if filename:
+            self.run_task("Prüfungsvarianten", f"🎲 Erstelle {options['variant_count']} Varianten...", "Varianten",
+                          lambda files: QMessageBox.information(
+                              self, "Erfolg", f"{len(files)} Dateien erstellt:\n" + "\n".join(map(os.path.basename, files))),
+                          export_exam_variants, self.db_path, question_ids, filename, **options)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+from array import array
+from bisect import bisect_left
+
+from database import get_questions_page, PREVIEW_LENGTH
+
+
+def _preview(text):
+    """Vorschau wie PREVIEW_SQL in SQL; der volle Fragetext wird erst bei Bedarf geladen"""
+    if not text:
+        return ""
+    return text[:PREVIEW_LENGTH] + "..." if len(text) > PREVIEW_LENGTH else text
+
+
+class OverviewStore:
+    """Speichersparende Zeilen der Fragenübersicht (ID, Titel, Punkte, Tags, Antworten, Vorschau).
+
+    Statt eines Tupels mit eigenen int-/float-Objekten pro Frage liegen IDs,
+    Punkte und Antwortanzahlen in array-Spalten. Jeder Tag-String wird nur
+    einmal gespeichert, die Zeile verweist per Index darauf; vom Fragetext
+    wird nur die Vorschau (bzw. der Suchausschnitt) gehalten, die
+    get_questions_page und search_questions bereits gekürzt liefern.
+    store[row] liefert weiterhin das Tupel wie get_questions_page.
+    Solange die Zeilen nach ID sortiert sind (Übersicht ohne Suche), findet
+    row_of eine Frage per Binärsuche.
+    """
+
+    def __init__(self, rows=()):
+        self.ids = array('q')
+        self.points = array('d')
+        self.answer_counts = array('l')
+        self.tag_indexes = array('l')
+        self.titles = []
+        self.previews = []
+        self._tags = []
+        self._tag_index = {}
+        self.ids_sorted = True
+        self.extend(rows)
+
+    def _intern_tags(self, tags):
+        tags = tags or ""
+        index = self._tag_index.get(tags)
+        if index is None:
+            index = self._tag_index[tags] = len(self._tags)
+            self._tags.append(tags)
+        return index
+
+    def append(self, row):
+        """Hängt eine Zeile (ID, Titel, Punkte, Tags, Antworten[, Vorschau]) an"""
+        self.insert(len(self.ids), row)
+
+    def insert(self, position, row):
+        """Fügt eine Zeile vor position ein"""
+        qid, title, points, tags, answer_count = row[:5]
+        if self.ids_sorted:
+            self.ids_sorted = ((position == 0 or self.ids[position - 1] < qid) and
+                               (position == len(self.ids) or qid < self.ids[position]))
+        self.ids.insert(position, qid)
+        self.titles.insert(position, title or "")
+        self.points.insert(position, 0.0 if points is None else points)
+        self.tag_indexes.insert(position, self._intern_tags(tags))
+        self.answer_counts.insert(position, answer_count)
+        self.previews.insert(position, (row[5] or "") if len(row) > 5 else "")
+
+    def replace(self, position, row):
+        """Ersetzt die Werte der Zeile position (gleiche Frage, neuer Stand)"""
+        qid, title, points, tags, answer_count = row[:5]
+        self.ids[position] = qid
+        self.titles[position] = title or ""
+        self.points[position] = 0.0 if points is None else points
+        self.tag_indexes[position] = self._intern_tags(tags)
+        self.answer_counts[position] = answer_count
+        self.previews[position] = (row[5] or "") if len(row) > 5 else ""
+
+    def remove(self, position):
+        """Entfernt die Zeile position"""
+        for column in (self.ids, self.titles, self.points, self.tag_indexes, self.answer_counts, self.previews):
+            del column[position]
+
+    def extend(self, rows):
+        """Hängt viele Zeilen spaltenweise an (schneller als append pro Zeile)"""
+        columns = list(zip(*rows))
+        if not columns:
+            return
+        if self.ids_sorted:
+            ids = self.ids[-1:].tolist() + list(columns[0])
+            self.ids_sorted = all(a < b for a, b in zip(ids, ids[1:]))
+        self.ids.extend(columns[0])
+        self.titles.extend(title or "" for title in columns[1])
+        self.points.extend(0.0 if points is None else points for points in columns[2])
+        self.tag_indexes.extend(map(self._intern_tags, columns[3]))
+        self.answer_counts.extend(columns[4])
+        if len(columns) > 5:
+            self.previews.extend(preview or "" for preview in columns[5])
+        else:
+            self.previews.extend([""] * len(columns[0]))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        return (self.ids[row], self.titles[row], self.points[row], self._tags[self.tag_indexes[row]],
+                self.answer_counts[row], self.previews[row])
+
+    def tags(self, row):
+        return self._tags[self.tag_indexes[row]]
+
+    def row_of(self, question_id):
+        """Zeilennummer der Frage oder None, wenn sie nicht geladen ist"""
+        if self.ids_sorted:
+            position = bisect_left(self.ids, question_id)
+            return position if position < len(self.ids) and self.ids[position] == question_id else None
+        try:
+            return self.ids.index(question_id)
+        except ValueError:
+            return None
+
+    def insert_position(self, question_id):
+        """Zeile, an der eine neue Frage in der nach ID sortierten Übersicht einzufügen ist"""
+        return bisect_left(self.ids, question_id)
+
+    @classmethod
+    def from_overview(cls, rows):
+        """Baut den Store aus get_questions_overview-Zeilen; ein voller Fragetext wird gekürzt"""
+        return cls((row[:5] + (_preview(row[5]),) if len(row) > 5 else row) for row in rows)
+
+    @classmethod
+    def load(cls, db_path, page_size=5000):
+        """Lädt die komplette Übersicht seitenweise (wie get_questions_overview, aber ohne Zwischenliste)"""
+        store = cls()
+        after_id = 0
+        while True:
+            page = get_questions_page(db_path, after_id=after_id, limit=page_size)
+            store.extend(page)
+            if len(page) < page_size:
+                return store
+            after_id = page[-1][0]
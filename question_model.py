@@ -0,0 +1,185 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from database import (
+    get_questions_page, get_overview_rows, get_search_rows, search_questions, count_questions, get_question_text
+)
+from overview_store import OverviewStore
+
+
+class QuestionTableModel(QAbstractTableModel):
+    """Tabellenmodell für die Fragenübersicht, das Zeilen seitenweise aus SQLite nachlädt.
+
+    Die View fragt nur Daten der sichtbaren Zeilen ab; weitere Seiten werden
+    erst beim Scrollen über canFetchMore/fetchMore geladen. Die Suche läuft
+    komplett in SQLite (Volltextindex), nicht über alle Zeilen in Python.
+    Geladene Zeilen liegen kompakt in einem OverviewStore; der volle
+    Fragetext wird nur für den Tooltip der Vorschau nachgeladen.
+    """
+
+    HEADERS = ["ID", "Titel", "Punkte", "Tags", "Antworten", "Fragetext (Vorschau)"]
+
+    def __init__(self, db_path, page_size=500, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.page_size = page_size
+        self.search_text = ""
+        self.rows = OverviewStore()
+        self.total_count = 0            # Zeilen der aktuellen Ansicht (Treffer bzw. alle Fragen)
+        self.question_count = None      # alle Fragen der Datenbank, für "Gefunden: x von y"
+        self._exhausted = True
+
+    def set_db_path(self, db_path):
+        self.db_path = db_path
+        self.question_count = None
+        self.reload()
+
+    def set_search(self, text):
+        """Setzt den Suchbegriff und lädt die erste Seite der Treffer"""
+        self.search_text = text.strip()
+        self.reload()
+
+    def reload(self):
+        """Verwirft alle geladenen Zeilen und lädt die erste Seite neu"""
+        self.beginResetModel()
+        self.rows = OverviewStore()
+        self._exhausted = False
+        self.total_count = count_questions(self.db_path, self.search_text)
+        self.question_count = count_questions(self.db_path) if self.search_text else self.total_count
+        self.rows.extend(self._load_page())
+        self.endResetModel()
+
+    def set_rows(self, search_text, rows, total_count):
+        """Übernimmt eine bereits (z.B. im Hintergrund) geladene erste Seite"""
+        self.beginResetModel()
+        self.search_text = search_text.strip()
+        self.rows = OverviewStore(rows)
+        self.total_count = total_count
+        # Die Suche ändert nichts an der Gesamtzahl; apply_changes hält sie aktuell
+        if not self.search_text:
+            self.question_count = total_count
+        elif self.question_count is None:
+            self.question_count = count_questions(self.db_path)
+        self._exhausted = len(self.rows) < self.page_size
+        self.endResetModel()
+
+    def apply_changes(self, question_ids):
+        """Aktualisiert nur die Zeilen der geänderten Fragen statt alles neu zu laden.
+
+        Geänderte Fragen werden an Ort und Stelle ersetzt, gelöschte entfernt
+        und neue in der Übersicht ohne Suche an ihrer ID-Position eingefügt,
+        sofern dieser Bereich schon geladen ist (sonst kommen sie mit
+        fetchMore). Bei aktiver Suche wird die Suche für die geänderten
+        Fragen wiederholt: Treffer bekommen einen neuen Ausschnitt, Zeilen,
+        die nicht mehr passen, verschwinden. Passt eine ungeladene Frage jetzt
+        zur Suche, ist ihre Position nach Relevanz unbekannt; dann und bei
+        sehr vielen Änderungen wird neu geladen.
+        total_count und question_count werden um die eingefügten bzw.
+        entfernten Zeilen korrigiert. Gezählt wird nur, wenn eine Frage
+        außerhalb der geladenen Zeilen hinzukam oder verschwand, denn ob sie
+        vorher schon mitgezählt war, ist dann unbekannt, sowie nach dem
+        Entfernen eines Suchtreffers (gelöscht oder nur kein Treffer mehr).
+        """
+        if len(question_ids) > self.page_size or not (self.search_text or self.rows.ids_sorted):
+            self.reload()
+            return
+        if self.search_text:
+            current = get_search_rows(self.db_path, self.search_text, question_ids)
+        else:
+            current = get_overview_rows(self.db_path, question_ids)
+        delta = 0
+        recount = False
+        for qid in question_ids:
+            row = self.rows.row_of(qid)
+            values = current.get(qid)
+            if row is not None and values is None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self.rows.remove(row)
+                self.endRemoveRows()
+                delta -= 1
+                recount = recount or bool(self.search_text)
+            elif row is not None:
+                self.rows.replace(row, values)
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+            elif values is not None:
+                if self.search_text:
+                    self.reload()
+                    return
+                position = self.rows.insert_position(qid)
+                if position < len(self.rows) or self._exhausted:
+                    self.beginInsertRows(QModelIndex(), position, position)
+                    self.rows.insert(position, values)
+                    self.endInsertRows()
+                    delta += 1
+                else:
+                    recount = True
+            elif self.search_text or not (self._exhausted or self.rows.insert_position(qid) < len(self.rows)):
+                # Nicht geladene Frage gelöscht: im geladenen ID-Bereich gab es sie nicht
+                recount = True
+        if recount:
+            self.total_count = count_questions(self.db_path, self.search_text)
+            self.question_count = count_questions(self.db_path) if self.search_text else self.total_count
+        else:
+            self.total_count += delta
+            if self.question_count is not None:
+                self.question_count += delta
+
+    def _load_page(self):
+        if self.search_text:
+            page = search_questions(self.db_path, self.search_text, limit=self.page_size, offset=len(self.rows))
+        else:
+            after_id = self.rows.ids[-1] if self.rows else 0
+            page = get_questions_page(self.db_path, after_id=after_id, limit=self.page_size)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        return page
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        page = self._load_page()
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.ToolTipRole and index.column() == 5:
+            return get_question_text(self.db_path, self.rows.ids[index.row()])
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        qid, title, points, tags, count, question_preview = self.rows[index.row()]
+        column = index.column()
+        if column == 0:
+            return str(qid)
+        if column == 1:
+            return title
+        if column == 2:
+            return f"{points:.1f}"
+        if column == 3:
+            return tags[:25] + "..." if len(tags) > 25 else tags
+        if column == 4:
+            return str(count)
+        return question_preview
+
+    def question_id(self, row):
+        return self.rows.ids[row]
+
+    def question_title(self, row):
+        return self.rows.titles[row]
@@ -0,0 +1,50 @@
+"""Gemeinsame Hilfen der Tests: temporäre, fertig migrierte Datenbank."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection import close_connections, get_connection  # noqa: E402
+from database import init_database_schema  # noqa: E402
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """Jeder Test bekommt eine leere Datenbank mit aktuellem Schema unter self.db_path"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'test.db')
+        init_database_schema(self.db_path)
+
+    def tearDown(self):
+        close_connections()
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def query(self, sql, params=()):
+        return get_connection(self.db_path).execute(sql, params).fetchall()
+
+    def snapshot(self):
+        """Alle Fragen-, Antwort- und Tag-Zeilen (zum Vergleich vor/nach einer Änderung).
+
+        Ohne updated_at: Rückgängig/Wiederholen markiert Fragen bewusst als geändert.
+        """
+        columns = [row[1] for row in self.query("PRAGMA table_info(questions)") if row[1] != 'updated_at']
+        return (self.query(f"SELECT {', '.join(columns)} FROM questions ORDER BY id"),
+                self.query("SELECT * FROM answers ORDER BY id"),
+                self.query("SELECT question_id, tag_id FROM question_tags ORDER BY question_id, tag_id"))
+
+    def answers(self, question_id):
+        return self.query("SELECT answertext, is_correct, fraction FROM answers WHERE question_id=? ORDER BY id",
+                          (question_id,))
+
+    def write_xml(self, name, questions):
+        """Schreibt <question>-Elemente (als Text) in eine Moodle-XML-Datei und gibt den Pfad zurück"""
+        filename = self.path(name)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n' + '\n'.join(questions) + '\n</quiz>\n')
+        return filename
@@ -0,0 +1,97 @@
+"""Sammeländerungen über temp.batch_ids (Bearbeiten → Auswahl bearbeiten).
+
+    python -m unittest discover -s tests
+"""
+import unittest
+
+from support import DatabaseTestCase
+
+from connection import get_connection
+from database import (
+    delete_questions, question_hash, rescale_points, retag_questions, save_question, set_question_type,
+    set_single_choice, split_tags
+)
+
+
+class BatchEditTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [save_question(self.db_path, f"Frage {n}", f"Text {n}", 1, "Java,Kapitel1", 1.5,
+                                  [("richtig", 1), (f"falsch {n}", 0)])
+                    for n in range(5)]
+
+    def tags(self, qid):
+        return self.query("SELECT tags FROM questions WHERE id=?", (qid,))[0][0]
+
+    def indexed_tags(self, qid):
+        return sorted(row[0] for row in self.query("""SELECT t.name FROM question_tags qt JOIN tags t ON t.id = qt.tag_id
+                                                      WHERE qt.question_id=?""", (qid,)))
+
+    def assert_index_matches(self):
+        for qid in self.ids:
+            self.assertEqual(self.indexed_tags(qid), sorted(split_tags(self.tags(qid))))
+
+    def test_delete_cascades_answers_and_tags(self):
+        deleted = self.ids[1:3]
+        self.assertEqual(delete_questions(self.db_path, deleted + [9999]), 2)
+        marks = ",".join("?" * len(deleted))
+        self.assertEqual(self.query(f"SELECT COUNT(*) FROM questions WHERE id IN ({marks})", deleted), [(0,)])
+        self.assertEqual(self.query(f"SELECT COUNT(*) FROM answers WHERE question_id IN ({marks})", deleted), [(0,)])
+        self.assertEqual(self.query(f"SELECT COUNT(*) FROM question_tags WHERE question_id IN ({marks})", deleted),
+                         [(0,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM answers"), [(6,)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM question_tags"), [(6,)])
+
+    def test_retag_add_and_remove(self):
+        self.assertEqual(retag_questions(self.db_path, self.ids[:2], add=["Neu", "java"], remove=["KAPITEL1"]), 2)
+        self.assertEqual(self.tags(self.ids[0]), "Java,Neu")
+        self.assertEqual(self.tags(self.ids[2]), "Java,Kapitel1")
+        self.assert_index_matches()
+
+    def test_retag_replace(self):
+        retag_questions(self.db_path, self.ids[:3], add=["A", "B"], replace=True)
+        self.assertEqual(self.tags(self.ids[0]), "A,B")
+        self.assert_index_matches()
+
+    def test_retag_counts_only_changed_questions(self):
+        versions = self.query("SELECT id, version FROM questions ORDER BY id")
+        self.assertEqual(retag_questions(self.db_path, self.ids, add=["Java"]), 0)
+        self.assertEqual(self.query("SELECT id, version FROM questions ORDER BY id"), versions)
+
+    def test_rescale(self):
+        self.assertEqual(rescale_points(self.db_path, self.ids[:2], factor=1 / 3), 2)
+        self.assertEqual(self.query("SELECT points FROM questions WHERE id IN (?, ?)", self.ids[:2]), [(0.5,), (0.5,)])
+        rescale_points(self.db_path, self.ids, points=2.0)
+        self.assertEqual(self.query("SELECT DISTINCT points FROM questions"), [(2.0,)])
+        with self.assertRaises(ValueError):
+            rescale_points(self.db_path, self.ids, factor=2, points=2)
+        with self.assertRaises(ValueError):
+            rescale_points(self.db_path, self.ids)
+
+    def test_single_choice(self):
+        self.assertEqual(set_single_choice(self.db_path, self.ids[:3], 0), 3)
+        self.assertEqual(set_single_choice(self.db_path, self.ids, 0), 2)
+        self.assertEqual(self.query("SELECT DISTINCT single FROM questions"), [(0,)])
+
+    def test_essay_drops_answers_and_refreshes_hash(self):
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE questions SET raw_xml='<question type=\"multichoice\"/>' WHERE id=?", (self.ids[0],))
+        self.assertEqual(set_question_type(self.db_path, self.ids[:2], 'essay'), 2)
+        self.assertEqual(self.answers(self.ids[0]), [])
+        self.assertEqual(len(self.answers(self.ids[2])), 2)
+        qid = self.ids[0]
+        self.assertEqual(self.query("SELECT question_type, raw_xml, content_hash FROM questions WHERE id=?", (qid,)),
+                         [('essay', None, question_hash("Frage 0", "Text 0", 'essay', []))])
+
+    def test_type_change_refreshes_hash(self):
+        self.assertEqual(set_question_type(self.db_path, self.ids[:1], 'shortanswer'), 1)
+        self.assertEqual(set_question_type(self.db_path, self.ids[:1], 'shortanswer'), 0)
+        self.assertEqual(self.query("SELECT content_hash FROM questions WHERE id=?", self.ids[:1]),
+                         [(question_hash("Frage 0", "Text 0", 'shortanswer', [("richtig", 1), ("falsch 0", 0)]),)])
+        with self.assertRaises(ValueError):
+            set_question_type(self.db_path, self.ids, 'matching')
+
+
+if __name__ == '__main__':
+    unittest.main()
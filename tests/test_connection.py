@@ -0,0 +1,52 @@
+"""Verbindungen pro Thread (connection.py).
+
+    python -m unittest discover -s tests
+"""
+import gc
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import connection  # noqa: E402
+from connection import close_connections, get_connection  # noqa: E402
+
+
+class ThreadConnectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'test.db')
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        self.tmp.cleanup()
+
+    def test_connections_of_finished_threads_are_closed(self):
+        opened = []
+
+        def work():
+            conn = get_connection(self.db_path)
+            conn.execute("SELECT 1").fetchone()
+            opened.append(conn)
+
+        for _ in range(20):
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+        gc.collect()
+        self.assertFalse(any(connection._is_open(conn) for conn in opened))
+        self.assertEqual(len(connection._thread_connections), 1)
+
+    def test_close_connections_reopens_on_next_use(self):
+        conn = get_connection(self.db_path)
+        close_connections(self.db_path)
+        self.assertFalse(connection._is_open(conn))
+        self.assertTrue(connection._is_open(get_connection(self.db_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
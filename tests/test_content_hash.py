@@ -0,0 +1,36 @@
+"""Duplikaterkennung über content_hash.
+
+    python -m unittest discover -s tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import question_hash  # noqa: E402
+
+NUMERICAL = ('<question type="numerical"><name><text>NUM</text></name>{grade}'
+             '<answer fraction="100"><text>3.14</text><tolerance>{tolerance}</tolerance></answer></question>')
+
+
+def numerical_hash(tolerance, grade=''):
+    raw_xml = NUMERICAL.format(tolerance=tolerance, grade=grade)
+    return question_hash('NUM', 'Pi?', 'numerical', [('3.14', 1, None)], raw_xml)
+
+
+class RawXmlHashTest(unittest.TestCase):
+
+    def test_xml_settings_are_content(self):
+        self.assertNotEqual(numerical_hash('0.01'), numerical_hash('0.5'))
+
+    def test_points_and_formatting_are_not_content(self):
+        self.assertEqual(numerical_hash('0.5'), numerical_hash(' 0.5\n', grade='<defaultgrade>2</defaultgrade>'))
+
+    def test_hash_without_raw_xml_unchanged(self):
+        self.assertEqual(question_hash('T', 'Text', 'multichoice', [('a', 1), ('b', 0)]),
+                         question_hash('T', 'Text', 'multichoice', [('b', 0, None), ('a', 1, None)], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Delta-Export: nur seit dem letzten Lauf eines Profils angelegte oder geänderte Fragen.
+
+    python -m unittest discover -s tests
+"""
+import os
+import time
+import unittest
+import xml.etree.ElementTree as ET
+
+from support import DatabaseTestCase
+
+from database import (
+    OperationCancelled, duplicate_question, get_export_profile_time, import_moodle_xml, merge_duplicate_questions,
+    redo_last_change, rescale_points, retag_questions, save_question, set_question_type, set_single_choice,
+    undo_last_change
+)
+from exporter import export_changes_to_moodle_xml
+
+
+class DeltaExportTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [save_question(self.db_path, f"Frage {n}", f"Text {n}", 1, "Java", 1.0,
+                                  [("richtig", 1), ("falsch", 0)])
+                    for n in range(5)]
+        self.filename = self.path('delta.xml')
+
+    def export_changes(self, question_ids=None, **kwargs):
+        """Delta-Export; gibt die Titel der exportierten Fragen zurück (leer: keine Datei)"""
+        # Änderungen davor und danach sollen sicher unterschiedliche Zeitstempel haben
+        time.sleep(0.005)
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+        count = export_changes_to_moodle_xml(self.db_path, 'moodle', self.filename, question_ids, **kwargs)
+        time.sleep(0.005)
+        if not os.path.exists(self.filename):
+            self.assertEqual(count, 0)
+            return []
+        titles = [q.findtext('name/text') for q in ET.parse(self.filename).getroot().findall('question')]
+        self.assertEqual(count, len(titles))
+        return titles
+
+    def titles(self, question_ids):
+        return [f"Frage {self.ids.index(qid)}" for qid in question_ids]
+
+    def test_first_run_exports_everything(self):
+        self.assertIsNone(get_export_profile_time(self.db_path, 'moodle'))
+        self.assertEqual(self.export_changes(), self.titles(self.ids))
+        self.assertIsNotNone(get_export_profile_time(self.db_path, 'moodle'))
+        self.assertEqual(self.export_changes(), [])
+
+    def test_only_changed_questions(self):
+        self.export_changes()
+        retag_questions(self.db_path, self.ids[3:4], add=["Neu"])
+        rescale_points(self.db_path, self.ids[1:2], factor=2)
+        self.assertEqual(self.export_changes(), self.titles([self.ids[1], self.ids[3]]))
+        self.assertEqual(self.export_changes(), [])
+
+    def test_selection_limits_delta(self):
+        self.export_changes()
+        set_single_choice(self.db_path, self.ids, 0)
+        self.assertEqual(self.export_changes([self.ids[4], self.ids[2]]), self.titles([self.ids[4], self.ids[2]]))
+
+    def test_batch_paths_mark_changes(self):
+        self.export_changes()
+        set_question_type(self.db_path, self.ids[:1], 'shortanswer')
+        self.assertEqual(self.export_changes(), self.titles(self.ids[:1]))
+        set_single_choice(self.db_path, self.ids[1:2], 0)
+        self.assertEqual(self.export_changes(), self.titles(self.ids[1:2]))
+
+    def test_new_and_merged_questions(self):
+        self.export_changes()
+        duplicate_question(self.db_path, self.ids[0])
+        save_question(self.db_path, "Frage 2", "Text 2", 1, "Kopie", 1.0, [("richtig", 1), ("falsch", 0)])
+        self.assertEqual(self.export_changes(), ["Frage 0 (Kopie)", "Frage 2"])
+        # Zusammenführen übernimmt die Tags in die älteste Frage, die Kopie wird gelöscht
+        merge_duplicate_questions(self.db_path)
+        self.assertEqual(self.export_changes(), self.titles(self.ids[2:3]))
+
+    def test_import_marks_new_and_updated_questions(self):
+        self.export_changes()
+        question = """<question type="multichoice"><name><text>Frage 0</text></name>
+          <questiontext format="html"><text>Text 0</text></questiontext><single>true</single>
+          <answer fraction="100"><text>richtig</text></answer><answer fraction="0"><text>falsch</text></answer>
+          <tags><tag><text>Importiert</text></tag></tags></question>"""
+        filename = self.write_xml('import.xml', [question])
+        import_moodle_xml(self.db_path, filename, on_duplicate='skip')
+        self.assertEqual(self.export_changes(), [])
+        import_moodle_xml(self.db_path, filename, on_duplicate='update')
+        self.assertEqual(self.export_changes(), ["Frage 0"])
+        import_moodle_xml(self.db_path, filename, on_duplicate='duplicate')
+        self.assertEqual(self.export_changes(), ["Frage 0"])
+
+    def test_undo_and_redo_mark_changes(self):
+        rescale_points(self.db_path, self.ids[1:3], points=4)
+        self.export_changes()
+        undo_last_change(self.db_path)
+        self.assertEqual(self.export_changes(), self.titles(self.ids[1:3]))
+        redo_last_change(self.db_path)
+        self.assertEqual(self.export_changes(), self.titles(self.ids[1:3]))
+
+    def test_cancelled_export_does_not_count(self):
+        self.export_changes()
+        retag_questions(self.db_path, self.ids[:2], add=["Neu"])
+        marked = get_export_profile_time(self.db_path, 'moodle')
+        with self.assertRaises(OperationCancelled):
+            self.export_changes(is_cancelled=lambda: True)
+        self.assertEqual(get_export_profile_time(self.db_path, 'moodle'), marked)
+        self.assertEqual(self.export_changes(), self.titles(self.ids[:2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Duplikate: Import mit on_duplicate und Zusammenführen vorhandener Duplikate.
+
+    python -m unittest discover -s tests
+"""
+import unittest
+
+from support import DatabaseTestCase
+
+from database import (
+    get_undo_state, import_moodle_xml, merge_duplicate_questions, save_question, select_question_ids,
+    undo_last_change
+)
+
+
+def multichoice(title, text, tags=(), points=1, answers=(("richtig", 100), ("falsch", 0))):
+    tag_xml = "".join(f"<tag><text>{tag}</text></tag>" for tag in tags)
+    answer_xml = "".join(f'<answer fraction="{fraction}"><text>{answer}</text></answer>' for answer, fraction in answers)
+    return f"""<question type="multichoice">
+  <name><text>{title}</text></name>
+  <questiontext format="html"><text>{text}</text></questiontext>
+  <defaultgrade>{points}</defaultgrade>
+  <single>true</single>
+  {answer_xml}
+  <tags>{tag_xml}</tags>
+</question>"""
+
+
+class ImportDuplicateTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.existing = save_question(self.db_path, "Frage", "Was ist Java?", 1, "Alt", 1.0,
+                                      [("richtig", 1), ("falsch", 0)])
+        # Gleicher Inhalt (Leerraum und Antwort-Reihenfolge zählen nicht), andere Tags und Punkte
+        self.filename = self.write_xml('import.xml', [
+            multichoice("Frage", "Was  ist Java?", tags=["Neu"], points=2, answers=(("falsch", 0), ("richtig", 100))),
+            multichoice("Andere Frage", "Was ist Python?"),
+            multichoice("Andere Frage", "Was ist Python?", tags=["Kopie"]),
+        ])
+
+    def import_file(self, on_duplicate, batch_size=1000):
+        return import_moodle_xml(self.db_path, self.filename, on_duplicate=on_duplicate, batch_size=batch_size)
+
+    def row(self, qid):
+        return self.query("SELECT title, questiontext, tags, points, version FROM questions WHERE id=?", (qid,))[0]
+
+    def test_skip_keeps_existing_question(self):
+        before = self.snapshot()
+        count, message = self.import_file('skip')
+        self.assertEqual(count, 1, message)
+        self.assertIn("2 Duplikat", message)
+        self.assertEqual(self.row(self.existing), before[0][0][1:3] + ("Alt", 1.0, 1))
+        # Duplikate innerhalb der Datei zählen ebenfalls
+        self.assertEqual(self.query("SELECT title, tags FROM questions WHERE id != ?", (self.existing,)),
+                         [("Andere Frage", "")])
+
+    def test_update_overwrites_existing_question(self):
+        count, message = self.import_file('update')
+        self.assertEqual(count, 1, message)
+        self.assertEqual(self.row(self.existing), ("Frage", "Was  ist Java?", "Neu", 2.0, 2))
+        self.assertEqual(self.answers(self.existing), [("falsch", 0, None), ("richtig", 1, None)])
+        self.assertEqual(self.query("""SELECT t.name FROM question_tags qt JOIN tags t ON t.id = qt.tag_id
+                                       WHERE qt.question_id=?""", (self.existing,)), [("Neu",)])
+        # Das spätere Duplikat in der Datei überschreibt die eben importierte Frage
+        self.assertEqual(self.query("SELECT tags FROM questions WHERE id != ?", (self.existing,)), [("Kopie",)])
+
+    def test_update_can_be_undone(self):
+        before = self.snapshot()
+        self.import_file('update', batch_size=1)
+        self.assertEqual(get_undo_state(self.db_path)[0], "Import aktualisiert (1 Frage(n))")
+        self.assertEqual(undo_last_change(self.db_path), "Import aktualisiert (1 Frage(n))")
+        self.assertEqual(undo_last_change(self.db_path), "Import aktualisiert (1 Frage(n))")
+        self.assertEqual(get_undo_state(self.db_path)[0], "Neue Frage")
+        # Neu importierte Fragen bleiben, die vorhandene ist wieder im alten Zustand
+        questions, answers, tags = self.snapshot()
+        self.assertEqual(questions[0], before[0][0])
+        self.assertEqual([a for a in answers if a[1] == self.existing], before[1])
+        self.assertEqual(len(questions), 2)
+
+    def test_skip_and_duplicate_are_not_journaled(self):
+        self.import_file('skip')
+        self.import_file('duplicate')
+        self.assertEqual(undo_last_change(self.db_path), "Neue Frage")
+
+    def test_duplicate_inserts_everything(self):
+        count, message = self.import_file('duplicate')
+        self.assertEqual(count, 3, message)
+        self.assertEqual(self.row(self.existing)[2:], ("Alt", 1.0, 1))
+        self.assertEqual(len(select_question_ids(self.db_path)), 4)
+
+    def test_unknown_policy(self):
+        count, message = self.import_file('replace')
+        self.assertEqual(count, 0)
+        self.assertIn("replace", message)
+
+
+class MergeDuplicatesTest(DatabaseTestCase):
+
+    def save(self, title, tags):
+        return save_question(self.db_path, title, "Text", 1, tags, 1.0, [("richtig", 1), ("falsch", 0)])
+
+    def test_keeps_oldest_with_union_of_tags(self):
+        first = self.save("Frage", "Java,Kapitel1")
+        other = self.save("Andere", "Java")
+        second = self.save("Frage", "kapitel1,Kapitel2")
+        third = self.save("Frage", "")
+        self.assertEqual(merge_duplicate_questions(self.db_path), (1, 2))
+
+        self.assertEqual(select_question_ids(self.db_path), [first, other])
+        self.assertEqual(self.query("SELECT tags FROM questions WHERE id=?", (first,)), [("Java,Kapitel1,Kapitel2",)])
+        self.assertEqual(sorted(name for name, in self.query("""SELECT t.name FROM question_tags qt
+                                                               JOIN tags t ON t.id = qt.tag_id
+                                                               WHERE qt.question_id=?""", (first,))),
+                         ["Java", "Kapitel1", "Kapitel2"])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM answers WHERE question_id IN (?, ?)", (second, third)),
+                         [(0,)])
+
+    def test_merge_can_be_undone(self):
+        self.save("Frage", "A")
+        self.save("Frage", "B")
+        before = self.snapshot()
+        merge_duplicate_questions(self.db_path)
+        self.assertEqual(undo_last_change(self.db_path), "Duplikate zusammenführen (1 Frage(n))")
+        self.assertEqual(self.snapshot(), before)
+
+    def test_nothing_to_merge(self):
+        self.save("Frage", "A")
+        self.save("Andere", "A")
+        self.assertEqual(merge_duplicate_questions(self.db_path), (0, 0))
+        self.assertEqual(undo_last_change(self.db_path), "Neue Frage")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Moodle-XML-Export: Baum, Streaming, Cache und gzip liefern dieselben Bytes.
+
+    python -m unittest discover -s tests
+"""
+import gzip
+import unittest
+
+from support import DatabaseTestCase
+
+from database import import_moodle_xml, save_question, select_question_ids
+from exporter import XML_DECLARATION, export_to_moodle_xml
+
+NUMERICAL = """<question type="numerical">
+  <name><text>Pi &amp; e</text></name>
+  <questiontext format="html"><text><![CDATA[<p>Wert von Pi?</p>]]></text></questiontext>
+  <answer fraction="100"><text>3.14</text><tolerance>0.01</tolerance></answer>
+</question>"""
+
+
+class ExportModesTest(DatabaseTestCase):
+
+    def export(self, ids, name, **kwargs):
+        filename = self.path(name)
+        export_to_moodle_xml(self.db_path, ids, filename, **kwargs)
+        if filename.endswith('.gz'):
+            with gzip.open(filename, 'rb') as f:
+                return f.read()
+        with open(filename, 'rb') as f:
+            return f.read()
+
+    def assert_modes_identical(self, ids):
+        tree = self.export(ids, 'tree.xml')
+        self.assertEqual(self.export(ids, 'stream.xml', streaming=True, use_cache=False), tree)
+        # Zweimal: erst füllt der Export den render_cache, dann kommt er daraus
+        self.assertEqual(self.export(ids, 'cached.xml', streaming=True), tree)
+        self.assertEqual(self.export(ids, 'cached.xml', streaming=True), tree)
+        self.assertEqual(self.export(ids, 'tree.xml.gz'), tree)
+        self.assertEqual(self.export(ids, 'stream.xml.gz', streaming=True), tree)
+        return tree
+
+    def test_all_question_types(self):
+        save_question(self.db_path, "Single <b>fett</b>", "Was & wie?", 1, "Java,Kapitel 1", 1.5,
+                      [("richtig", 1), ("falsch", 0)])
+        save_question(self.db_path, "Multiple", "Welche?", 0, "", 2.0, [("a", 1), ("b", 1), ("c", 0)])
+        import_moodle_xml(self.db_path, self.write_xml('import.xml', [NUMERICAL]))
+        ids = select_question_ids(self.db_path)
+        # Auch eine abweichende Reihenfolge bleibt in allen Modi erhalten
+        tree = self.assert_modes_identical(ids[::-1])
+        self.assertTrue(tree.startswith(XML_DECLARATION + b'<quiz><question type="numerical">'))
+        self.assertTrue(tree.endswith(b'</question></quiz>'))
+
+    def test_empty_quiz(self):
+        self.assertEqual(self.assert_modes_identical([]), XML_DECLARATION + b'<quiz />')
+
+    def test_compress_flag_without_gz_extension(self):
+        save_question(self.db_path, "Frage", "Text", 1, "", 1.0, [("a", 1)])
+        ids = select_question_ids(self.db_path)
+        plain = self.export(ids, 'plain.xml')
+        self.export(ids, 'packed.xml', streaming=True, compress=True)
+        with gzip.open(self.path('packed.xml'), 'rb') as f:
+            self.assertEqual(f.read(), plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
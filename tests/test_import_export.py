@@ -0,0 +1,152 @@
+"""Import der Moodle-Fragetypen (QUESTION_PARSERS) und Export zurück nach Moodle XML.
+
+    python -m unittest discover -s tests
+"""
+import unittest
+import xml.etree.ElementTree as ET
+
+from support import DatabaseTestCase
+
+from database import import_moodle_xml, select_question_ids
+from exporter import export_to_moodle_xml
+
+TRUEFALSE = """<question type="truefalse">
+  <name><text>Wahr oder falsch</text></name>
+  <questiontext format="html"><text>Java ist typsicher.</text></questiontext>
+  <defaultgrade>1</defaultgrade>
+  <answer fraction="100"><text>true</text></answer>
+  <answer fraction="0"><text>false</text></answer>
+</question>"""
+
+NUMERICAL = """<question type="numerical">
+  <name><text>Pi</text></name>
+  <questiontext format="html"><text>Wert von Pi?</text></questiontext>
+  <defaultgrade>2</defaultgrade>
+  <answer fraction="100"><text>3.14</text><tolerance>0.01</tolerance></answer>
+  <units><unit><multiplier>1</multiplier><unit_name>rad</unit_name></unit></units>
+  <tags><tag><text>Mathe</text></tag></tags>
+</question>"""
+
+MATCHING = """<question type="matching">
+  <name><text>Zuordnung</text></name>
+  <questiontext format="html"><text>Ordnen Sie zu.</text></questiontext>
+  <defaultgrade>3</defaultgrade>
+  <shuffleanswers>true</shuffleanswers>
+  <subquestion format="html"><text>Hund</text><answer><text>bellt</text></answer></subquestion>
+  <subquestion format="html"><text>Katze</text><answer><text>miaut</text></answer></subquestion>
+</question>"""
+
+CLOZE = """<question type="cloze">
+  <name><text>Lückentext</text></name>
+  <questiontext format="html"><text>Java wurde von {1:SHORTANSWER:=Sun} entwickelt.</text></questiontext>
+  <generalfeedback format="html"><text></text></generalfeedback>
+  <penalty>0.3333333</penalty>
+</question>"""
+
+PARTIAL = """<question type="multichoice">
+  <name><text>Teilpunkte</text></name>
+  <questiontext format="html"><text>Welche sind Primzahlen?</text></questiontext>
+  <defaultgrade>1</defaultgrade>
+  <single>false</single>
+  <answer fraction="50"><text>2</text></answer>
+  <answer fraction="50"><text>3</text></answer>
+  <answer fraction="-25"><text>4</text></answer>
+  <answer fraction="33.33333"><text>5</text></answer>
+</question>"""
+
+
+class ImportExportRoundTripTest(DatabaseTestCase):
+
+    def import_questions(self, *questions):
+        count, message = import_moodle_xml(self.db_path, self.write_xml('import.xml', questions))
+        self.assertEqual(count, len(questions), message)
+        return select_question_ids(self.db_path)
+
+    def export_questions(self, ids, streaming=True):
+        filename = self.path('export.xml')
+        export_to_moodle_xml(self.db_path, ids, filename, streaming=streaming)
+        return ET.parse(filename).getroot().findall('question')
+
+    def stored(self, qid):
+        return self.query("SELECT question_type, single, points, raw_xml IS NOT NULL FROM questions WHERE id=?",
+                          (qid,))[0]
+
+    def test_truefalse(self):
+        [qid] = self.import_questions(TRUEFALSE)
+        self.assertEqual(self.stored(qid), ('truefalse', 1, 1.0, 0))
+        self.assertEqual(self.answers(qid), [('true', 1, None), ('false', 0, None)])
+
+        [question] = self.export_questions([qid])
+        self.assertEqual(question.get('type'), 'truefalse')
+        self.assertEqual([(a.get('fraction'), a.findtext('text')) for a in question.findall('answer')],
+                         [('100', 'true'), ('0', 'false')])
+
+    def test_numerical_keeps_tolerance_and_units(self):
+        [qid] = self.import_questions(NUMERICAL)
+        self.assertEqual(self.stored(qid), ('numerical', 1, 2.0, 1))
+        self.assertEqual(self.answers(qid), [('3.14', 1, None)])
+
+        [question] = self.export_questions([qid])
+        self.assertEqual(question.get('type'), 'numerical')
+        self.assertEqual(question.findtext('answer/tolerance'), '0.01')
+        self.assertEqual(question.findtext('units/unit/unit_name'), 'rad')
+        self.assertEqual(question.findtext('defaultgrade'), '2')
+        self.assertEqual([t.findtext('text') for t in question.findall('tags/tag')], ['Mathe'])
+
+    def test_matching_keeps_subquestions(self):
+        [qid] = self.import_questions(MATCHING)
+        self.assertEqual(self.stored(qid), ('matching', 1, 3.0, 1))
+        self.assertEqual(self.answers(qid), [('Hund → bellt', 1, None), ('Katze → miaut', 1, None)])
+
+        [question] = self.export_questions([qid])
+        self.assertEqual(question.get('type'), 'matching')
+        self.assertEqual([(s.findtext('text'), s.findtext('answer/text')) for s in question.findall('subquestion')],
+                         [('Hund', 'bellt'), ('Katze', 'miaut')])
+        self.assertIsNone(question.find('answer'))
+
+    def test_cloze_keeps_gaps(self):
+        [qid] = self.import_questions(CLOZE)
+        self.assertEqual(self.stored(qid), ('cloze', 1, 1.0, 1))
+        self.assertEqual(self.answers(qid), [])
+
+        [question] = self.export_questions([qid])
+        self.assertEqual(question.get('type'), 'cloze')
+        self.assertEqual(question.findtext('questiontext/text'), 'Java wurde von {1:SHORTANSWER:=Sun} entwickelt.')
+        self.assertEqual(question.findtext('penalty'), '0.3333333')
+
+    def test_partial_credit_fractions(self):
+        [qid] = self.import_questions(PARTIAL)
+        self.assertEqual(self.stored(qid), ('multichoice', 0, 1.0, 0))
+        self.assertEqual(self.answers(qid), [('2', 1, 50.0), ('3', 1, 50.0), ('4', 0, -25.0), ('5', 1, 33.33333)])
+
+        [question] = self.export_questions([qid])
+        self.assertEqual([(a.get('fraction'), a.findtext('text')) for a in question.findall('answer')],
+                         [('50', '2'), ('50', '3'), ('-25', '4'), ('33.33333', '5')])
+
+    def test_db_fields_override_raw_xml(self):
+        [qid] = self.import_questions(NUMERICAL)
+        self.query("UPDATE questions SET title='Kreiszahl', points=4, tags='Mathe,Geometrie' WHERE id=?", (qid,))
+
+        [question] = self.export_questions([qid], streaming=False)
+        self.assertEqual(question.findtext('name/text'), 'Kreiszahl')
+        self.assertEqual(question.findtext('defaultgrade'), '4')
+        self.assertEqual([t.findtext('text') for t in question.findall('tags/tag')], ['Mathe', 'Geometrie'])
+        self.assertEqual(question.findtext('answer/tolerance'), '0.01')
+
+    def test_reimport_of_export_is_identical(self):
+        ids = self.import_questions(TRUEFALSE, NUMERICAL, MATCHING, CLOZE, PARTIAL)
+        before = self.snapshot()
+        export_to_moodle_xml(self.db_path, ids, self.path('export.xml'))
+        count, message = import_moodle_xml(self.db_path, self.path('export.xml'), on_duplicate='skip')
+        self.assertEqual(count, 0, message)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_categories_are_skipped(self):
+        category = '<question type="category"><category><text>$course$/Java</text></category></question>'
+        count, message = import_moodle_xml(self.db_path, self.write_xml('import.xml', [category, TRUEFALSE]))
+        self.assertEqual(count, 1, message)
+        self.assertEqual(self.query("SELECT question_type FROM questions"), [('truefalse',)])
+
+
+if __name__ == '__main__':
+    unittest.main()
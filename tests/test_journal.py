@@ -0,0 +1,121 @@
+"""Journal: Rückgängig/Wiederholen und Aufbewahrung.
+
+    python -m unittest discover -s tests
+"""
+import time
+import unittest
+
+from support import DatabaseTestCase
+
+from connection import get_connection
+from database import (
+    compact_journal, delete_questions, duplicate_question, get_undo_state, redo_last_change, rescale_points,
+    retag_questions, save_question, set_question_type, set_single_choice, undo_last_change
+)
+
+
+class UndoRedoTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [save_question(self.db_path, f"Frage {n}", f"Text {n}", 1, f"Kapitel{n % 2},Java", 1.0,
+                                  [("richtig", 1), ("falsch", 0), (f"auch falsch {n}", 0)])
+                    for n in range(4)]
+
+    def assert_undo_redo(self, change):
+        """change() ändern, dann Rückgängig = alter Stand, Wiederholen = neuer Stand"""
+        before = self.snapshot()
+        change()
+        after = self.snapshot()
+        self.assertNotEqual(before, after)
+        self.assertIsNotNone(undo_last_change(self.db_path))
+        self.assertEqual(self.snapshot(), before)
+        self.assertIsNotNone(redo_last_change(self.db_path))
+        self.assertEqual(self.snapshot(), after)
+
+    def test_retag(self):
+        self.assert_undo_redo(lambda: retag_questions(self.db_path, self.ids, add=["Neu"], remove=["java"]))
+
+    def test_rescale(self):
+        self.assert_undo_redo(lambda: rescale_points(self.db_path, self.ids[:2], factor=2.5))
+
+    def test_delete_restores_answers_and_tags(self):
+        self.assert_undo_redo(lambda: delete_questions(self.db_path, self.ids[1:3]))
+
+    def test_essay_switch_restores_answers(self):
+        self.assert_undo_redo(lambda: set_question_type(self.db_path, self.ids, 'essay'))
+
+    def test_single_choice(self):
+        self.assert_undo_redo(lambda: set_single_choice(self.db_path, self.ids, 0))
+
+    def test_new_and_duplicated_questions(self):
+        self.assert_undo_redo(lambda: save_question(self.db_path, "Neu", "Text", 1, "", 1.0, [("a", 1)]))
+        self.assert_undo_redo(lambda: duplicate_question(self.db_path, self.ids[0]))
+
+    def test_undo_order_and_redo_discarded_by_new_change(self):
+        start = self.snapshot()
+        rescale_points(self.db_path, self.ids, points=3.0)
+        retag_questions(self.db_path, self.ids, add=["Neu"])
+        self.assertEqual(undo_last_change(self.db_path), "Tags ändern (4 Frage(n))")
+        self.assertEqual(undo_last_change(self.db_path), "Punkte ändern (4 Frage(n))")
+        self.assertEqual(self.snapshot(), start)
+        delete_questions(self.db_path, self.ids[:1])
+        self.assertIsNone(redo_last_change(self.db_path))
+        self.assertEqual(get_undo_state(self.db_path)[1], None)
+
+    def test_nothing_to_undo(self):
+        while undo_last_change(self.db_path):
+            pass
+        self.assertIsNone(undo_last_change(self.db_path))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM questions"), [(0,)])
+
+
+class CompactJournalTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [save_question(self.db_path, f"Frage {n}", "Text", 1, "", 1.0, [("a", 1)]) for n in range(3)]
+        # Journal nur mit den Sammeländerungen unten, jeweils auf alle drei Fragen
+        get_connection(self.db_path).execute("DELETE FROM journal")
+        for factor in (2, 3, 4, 5):
+            rescale_points(self.db_path, self.ids, factor=factor)
+
+    def entries(self):
+        return [row[0] for row in self.query("SELECT description FROM journal ORDER BY id")]
+
+    def newest(self):
+        return self.entries()[-1]
+
+    def test_max_entries(self):
+        newest = self.newest()
+        self.assertEqual(compact_journal(self.db_path, max_entries=2), 2)
+        self.assertEqual(len(self.entries()), 2)
+        self.assertEqual(self.newest(), newest)
+
+    def test_max_questions(self):
+        # Je Eintrag 3 Fragen: 7 erlaubt zwei Einträge
+        self.assertEqual(compact_journal(self.db_path, max_questions=7), 2)
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_newest_entry_is_always_kept(self):
+        newest_id = self.query("SELECT MAX(id) FROM journal")[0][0]
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE journal SET created_at=?", (time.time() - 365 * 86400,))
+        compact_journal(self.db_path, max_entries=0, max_questions=0, max_age_days=1)
+        self.assertEqual(self.query("SELECT id FROM journal"), [(newest_id,)])
+        self.assertIsNotNone(undo_last_change(self.db_path))
+
+    def test_max_age(self):
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE journal SET created_at=? WHERE id IN (SELECT id FROM journal ORDER BY id LIMIT 2)",
+                         (time.time() - 40 * 86400,))
+        self.assertEqual(compact_journal(self.db_path, max_age_days=30), 2)
+        self.assertEqual(len(self.entries()), 2)
+
+    def test_rows_are_removed_with_their_entry(self):
+        compact_journal(self.db_path, max_entries=1)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM journal_rows"), [(3,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
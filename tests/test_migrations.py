@@ -0,0 +1,77 @@
+"""Upgrade von Datenbanken älterer Versionen über init_database_schema.
+
+    python -m unittest discover -s tests
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connection import close_connections, get_connection  # noqa: E402
+from database import (  # noqa: E402
+    MIGRATIONS, get_tag_counts, init_database_schema, load_questions, question_hash, schema_version
+)
+
+# Schema der ersten Version (ohne user_version, Volltextindex und Migrationen)
+BASELINE_SCHEMA = '''
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    questiontext TEXT NOT NULL,
+    single INTEGER DEFAULT 1,
+    tags TEXT DEFAULT '',
+    points REAL DEFAULT 1.0,
+    question_type TEXT DEFAULT 'multichoice'
+);
+CREATE TABLE answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    question_id INTEGER NOT NULL,
+    answertext TEXT NOT NULL,
+    is_correct INTEGER DEFAULT 0,
+    FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+INSERT INTO questions (title, questiontext, single, tags, points) VALUES ('Frage A', 'Text A', 1, 'Java,Kurs', 1.0);
+INSERT INTO questions (title, questiontext, single, tags, points, question_type)
+    VALUES ('Frage B', 'Text B', 0, 'Python', 2.0, 'multichoice');
+INSERT INTO answers (question_id, answertext, is_correct) VALUES (1, 'a', 1), (1, 'b', 0), (2, 'x', 1), (2, 'y', 0);
+'''
+
+
+class BaselineUpgradeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'alt.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(BASELINE_SCHEMA)
+        conn.close()
+
+    def tearDown(self):
+        close_connections(self.db_path)
+        self.tmp.cleanup()
+
+    def test_upgrade_keeps_data(self):
+        init_database_schema(self.db_path)
+        self.assertEqual(schema_version(self.db_path), len(MIGRATIONS))
+
+        c = get_connection(self.db_path).cursor()
+        records = load_questions(c, [1, 2])
+        self.assertEqual([records[qid]['title'] for qid in (1, 2)], ['Frage A', 'Frage B'])
+        self.assertEqual(records[1]['answers'], [('a', 1, None), ('b', 0, None)])
+        for qid, record in records.items():
+            c.execute("SELECT content_hash FROM questions WHERE id=?", (qid,))
+            self.assertEqual(c.fetchone()[0], question_hash(record['title'], record['questiontext'],
+                                                            record['question_type'], record['answers']))
+        self.assertEqual(get_tag_counts(self.db_path), [('Java', 1), ('Kurs', 1), ('Python', 1)])
+
+    def test_upgrade_is_idempotent(self):
+        init_database_schema(self.db_path)
+        init_database_schema(self.db_path)
+        self.assertEqual(schema_version(self.db_path), len(MIGRATIONS))
+
+
+if __name__ == '__main__':
+    unittest.main()
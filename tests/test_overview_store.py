@@ -0,0 +1,46 @@
+"""OverviewStore: Übersicht aus SQL (load) und aus vollen Fragetexten (from_overview) sind gleich.
+
+    python -m unittest discover -s tests
+"""
+import unittest
+
+from support import DatabaseTestCase
+
+from database import PREVIEW_LENGTH, get_overview_rows, get_questions_overview, save_question, search_questions
+from overview_store import OverviewStore
+
+# Grenzfälle der Vorschau: leer, genau PREVIEW_LENGTH, ein Zeichen mehr, Umlaute/Emoji jenseits der Grenze
+TEXTS = ["", "kurz", "x" * PREVIEW_LENGTH, "y" * (PREVIEW_LENGTH + 1), "ä" * (PREVIEW_LENGTH + 5),
+         "Wähle 🐍 " * 20, "  Leerzeichen am Rand  "]
+
+
+class OverviewStoreTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [save_question(self.db_path, f"Frage {n} #Vorschau", text, 1, "Vorschau" if n % 2 else "", n * 0.5,
+                                  [("a", 1)] * (n % 3))
+                    for n, text in enumerate(TEXTS)]
+
+    def rows(self, store):
+        return [store[row] for row in range(len(store))]
+
+    def test_from_overview_matches_load(self):
+        loaded = self.rows(OverviewStore.load(self.db_path, page_size=3))
+        self.assertEqual(self.rows(OverviewStore.from_overview(get_questions_overview(self.db_path, with_text=True))),
+                         loaded)
+        self.assertEqual([row[0] for row in loaded], self.ids)
+        self.assertEqual(loaded[3][5], "y" * PREVIEW_LENGTH + "...")
+        self.assertEqual(loaded[2][5], "x" * PREVIEW_LENGTH)
+
+    def test_search_fallback_uses_same_preview(self):
+        # Nur #Tag im Suchtext: Teilstring-Suche ohne Volltextindex, Vorschau statt Ausschnitt
+        expected = {row[0]: row for row in self.rows(OverviewStore.load(self.db_path)) if row[3]}
+        found = search_questions(self.db_path, "#Vorschau")
+        self.assertEqual({row[0]: row for row in self.rows(OverviewStore(found))}, expected)
+        self.assertEqual({qid: tuple(row) for qid, row in get_overview_rows(self.db_path, expected).items()},
+                         {qid: tuple(row) for qid, row in expected.items()})
+
+
+if __name__ == '__main__':
+    unittest.main()
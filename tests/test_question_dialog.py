@@ -0,0 +1,54 @@
+"""Bearbeiten-Dialog: Speichern darf keine Antworten verlieren.
+
+    python -m unittest discover -s tests
+"""
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from support import DatabaseTestCase  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+from database import save_question  # noqa: E402
+from connection import get_connection  # noqa: E402
+from dialogs import ANSWER_FIELDS, QuestionDialog  # noqa: E402
+
+app = QApplication.instance() or QApplication([])
+
+
+class QuestionDialogTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._information = QMessageBox.information
+        QMessageBox.information = staticmethod(lambda *args, **kwargs: None)
+
+    def tearDown(self):
+        QMessageBox.information = self._information
+        super().tearDown()
+
+    def edit_title(self, question_id, title):
+        dialog = QuestionDialog(self.db_path, question_id)
+        dialog.title_edit.setText(title)
+        dialog.save_question()
+        dialog.deleteLater()
+
+    def test_title_edit_keeps_all_multichoice_answers(self):
+        answers = [(f"Antwort {n}", 1 if n == 0 else 0) for n in range(ANSWER_FIELDS + 1)]
+        qid = save_question(self.db_path, "Viele", "Text", 1, "", 1.0, answers)
+        self.edit_title(qid, "Viele (bearbeitet)")
+        self.assertEqual(self.answers(qid), [(text, correct, None) for text, correct in answers])
+        self.assertEqual(self.query("SELECT title FROM questions WHERE id=?", (qid,)), [("Viele (bearbeitet)",)])
+
+    def test_title_edit_keeps_all_shortanswer_answers(self):
+        qid = save_question(self.db_path, "Kurz", "Text", 1, "", 1.0,
+                            [(f"Wort {n}", 1) for n in range(ANSWER_FIELDS + 2)])
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE questions SET question_type='shortanswer' WHERE id=?", (qid,))
+        self.edit_title(qid, "Kurz (bearbeitet)")
+        self.assertEqual(len(self.answers(qid)), ANSWER_FIELDS + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
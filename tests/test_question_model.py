@@ -0,0 +1,90 @@
+"""Fragenübersicht: apply_changes aktualisiert nur die geänderten Zeilen, auch bei aktiver Suche.
+
+    python -m unittest discover -s tests
+"""
+import unittest
+
+from support import DatabaseTestCase
+
+from connection import get_connection
+from database import delete_questions, rescale_points, retag_questions, save_question
+from question_model import QuestionTableModel
+
+
+class QuestionModelTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [save_question(self.db_path, f"Frage {n}", text, 1, tags, 1.0, [("richtig", 1), ("falsch", 0)])
+                    for n, (text, tags) in enumerate([("Was ist eine Java Klasse?", "Java"),
+                                                      ("Was ist ein Java Interface?", "Java"),
+                                                      ("Was ist eine Python Liste?", "Python"),
+                                                      ("Was ist ein Python Modul?", "Python")])]
+        self.model = QuestionTableModel(self.db_path)
+
+    def set_text(self, qid, text):
+        with get_connection(self.db_path) as conn:
+            conn.execute("UPDATE questions SET questiontext=? WHERE id=?", (text, qid))
+        self.model.apply_changes([qid])
+
+    def shown(self):
+        return list(self.model.rows.ids)
+
+    def preview(self, qid):
+        return self.model.rows.previews[self.model.rows.row_of(qid)]
+
+    def assert_counts(self, total_count, question_count):
+        self.assertEqual((self.model.total_count, self.model.question_count), (total_count, question_count))
+
+    def test_changed_hit_gets_new_snippet(self):
+        self.model.set_search("Java")
+        self.assertEqual(self.preview(self.ids[0]), "Was ist eine »Java« Klasse?")
+        self.set_text(self.ids[0], "Welche Java Klasse erbt von Object?")
+        self.assertEqual(self.preview(self.ids[0]), "Welche »Java« Klasse erbt von Object?")
+        self.assertEqual(sorted(self.shown()), self.ids[:2])
+        self.assert_counts(2, 4)
+
+    def test_row_that_no_longer_matches_disappears(self):
+        self.model.set_search("Java")
+        self.set_text(self.ids[1], "Was ist ein Kotlin Interface?")
+        # Tags enthalten noch "Java", also weiterhin ein Treffer
+        self.assertIn(self.ids[1], self.shown())
+        retag_questions(self.db_path, [self.ids[1]], replace=["Kotlin"])
+        self.model.apply_changes([self.ids[1]])
+        self.assertEqual(self.shown(), [self.ids[0]])
+        self.assert_counts(1, 4)
+
+    def test_deleted_hit_disappears(self):
+        self.model.set_search("Java")
+        delete_questions(self.db_path, [self.ids[0]])
+        self.model.apply_changes([self.ids[0]])
+        self.assertEqual(self.shown(), [self.ids[1]])
+        self.assert_counts(1, 3)
+
+    def test_new_hit_outside_loaded_rows_is_shown(self):
+        self.model.set_search("Java")
+        self.set_text(self.ids[2], "Was ist eine Java Liste?")
+        self.assertEqual(sorted(self.shown()), self.ids[:3])
+        self.assert_counts(3, 4)
+
+    def test_tag_search_without_full_text(self):
+        self.model.set_search("#Python")
+        self.assertEqual(self.shown(), self.ids[2:])
+        retag_questions(self.db_path, [self.ids[3]], remove=["Python"])
+        self.model.apply_changes([self.ids[3]])
+        self.assertEqual(self.shown(), [self.ids[2]])
+        self.assert_counts(1, 4)
+
+    def test_overview_without_search(self):
+        self.model.reload()
+        rescale_points(self.db_path, self.ids[1:2], points=3)
+        self.model.apply_changes([self.ids[1]])
+        self.assertEqual(self.model.rows[1][2], 3.0)
+        new_id = save_question(self.db_path, "Neu", "Text", 1, "", 1.0, [("a", 1)])
+        self.model.apply_changes([new_id])
+        self.assertEqual(self.shown(), self.ids + [new_id])
+        self.assert_counts(5, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""render_cache: nach jeder Änderung muss der Export mit Cache dem ohne Cache entsprechen.
+
+    python -m unittest discover -s tests
+"""
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from support import DatabaseTestCase  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QMessageBox  # noqa: E402
+
+from connection import get_connection  # noqa: E402
+from database import (  # noqa: E402
+    import_moodle_xml, redo_last_change, rescale_points, retag_questions, save_question, select_question_ids,
+    set_question_type, set_single_choice, undo_last_change
+)
+from dialogs import QuestionDialog  # noqa: E402
+from exporter import export_to_moodle_xml  # noqa: E402
+
+app = QApplication.instance() or QApplication([])
+
+NUMERICAL = """<question type="numerical">
+  <name><text>Pi</text></name>
+  <questiontext format="html"><text>Wert von Pi?</text></questiontext>
+  <answer fraction="100"><text>3.14</text><tolerance>0.01</tolerance></answer>
+</question>"""
+
+
+class RenderCacheTest(DatabaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self._information = QMessageBox.information
+        QMessageBox.information = staticmethod(lambda *args, **kwargs: None)
+        for n in range(3):
+            save_question(self.db_path, f"Frage {n}", f"Text {n}", 1, "Java", 1.0, [("richtig", 1), ("falsch", 0)])
+        import_moodle_xml(self.db_path, self.write_xml('numerical.xml', [NUMERICAL]))
+        self.ids = select_question_ids(self.db_path)
+
+    def tearDown(self):
+        QMessageBox.information = self._information
+        super().tearDown()
+
+    def export(self, use_cache=True):
+        filename = self.path('export.xml')
+        export_to_moodle_xml(self.db_path, self.ids, filename, streaming=True, use_cache=use_cache)
+        with open(filename, 'rb') as f:
+            return f.read()
+
+    def assert_cache_refreshed(self, change):
+        """Export (füllt den Cache), change(), erneuter Export muss dem ohne Cache entsprechen"""
+        before = self.export()
+        self.assertEqual(self.query("SELECT COUNT(*) FROM render_cache"), [(len(self.ids),)])
+        change()
+        after = self.export()
+        self.assertNotEqual(after, before)
+        self.assertEqual(after, self.export(use_cache=False))
+
+    def edit(self, question_id, title=None, answer_text=None):
+        dialog = QuestionDialog(self.db_path, question_id)
+        if title is not None:
+            dialog.title_edit.setText(title)
+        if answer_text is not None:
+            dialog.answers[0].setPlainText(answer_text)
+        dialog.save_question()
+        dialog.deleteLater()
+
+    def test_dialog_save(self):
+        self.assert_cache_refreshed(lambda: self.edit(self.ids[0], title="Neuer Titel"))
+
+    def test_dialog_answer_change(self):
+        self.assert_cache_refreshed(lambda: self.edit(self.ids[1], answer_text="ganz richtig"))
+
+    def test_dialog_save_of_imported_type(self):
+        self.assert_cache_refreshed(lambda: self.edit(self.ids[-1], title="Kreiszahl"))
+
+    def test_answer_update_only(self):
+        def change():
+            with get_connection(self.db_path) as conn:
+                conn.execute("UPDATE answers SET is_correct=1 WHERE question_id=? AND answertext='falsch'",
+                             (self.ids[2],))
+        self.assert_cache_refreshed(change)
+
+    def test_retag(self):
+        self.assert_cache_refreshed(lambda: retag_questions(self.db_path, self.ids, add=["Neu"]))
+
+    def test_rescale(self):
+        self.assert_cache_refreshed(lambda: rescale_points(self.db_path, self.ids, factor=2))
+
+    def test_single_choice_and_type(self):
+        self.assert_cache_refreshed(lambda: set_single_choice(self.db_path, self.ids[:3], 0))
+        self.assert_cache_refreshed(lambda: set_question_type(self.db_path, self.ids[:1], 'essay'))
+
+    def test_import_update(self):
+        # Gleicher Inhalt, neue Tags: überschreibt die importierte Frage
+        updated = NUMERICAL.replace("</answer>", "</answer><tags><tag><text>Mathe</text></tag></tags>")
+        filename = self.write_xml('update.xml', [updated])
+        self.assert_cache_refreshed(lambda: import_moodle_xml(self.db_path, filename, on_duplicate='update'))
+
+    def test_undo_and_redo(self):
+        rescale_points(self.db_path, self.ids, points=5)
+        self.assert_cache_refreshed(lambda: undo_last_change(self.db_path))
+        self.assert_cache_refreshed(lambda: redo_last_change(self.db_path))
+
+    def test_undo_of_dialog_answer_change(self):
+        self.edit(self.ids[0], answer_text="ganz richtig")
+        self.assert_cache_refreshed(lambda: undo_last_change(self.db_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import sqlite3
+import time
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from database import search_questions, count_questions, get_questions_page, OperationCancelled
+
+
+class SearchSignals(QObject):
+    # (generation, Suchbegriff, erste Trefferseite, Trefferanzahl, Dauer in ms)
+    finished = pyqtSignal(int, str, list, int, float)
+    failed = pyqtSignal(int, str)
+
+
+class SearchWorker(QRunnable):
+    """Führt eine Suche im Thread-Pool aus, damit die Oberfläche beim Tippen flüssig bleibt.
+
+    Jede Suche trägt eine laufende Nummer (generation). Sobald is_stale()
+    meldet, dass eine neuere Suche gestartet wurde, wird die SQLite-Abfrage
+    abgebrochen und kein Ergebnis gemeldet.
+    """
+
+    def __init__(self, db_path, text, page_size, generation, is_stale):
+        super().__init__()
+        self.db_path = db_path
+        self.text = text
+        self.page_size = page_size
+        self.generation = generation
+        self.is_stale = is_stale
+        self.signals = SearchSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            total = count_questions(self.db_path, self.text, is_cancelled=self.is_stale)
+            if self.text:
+                rows = search_questions(self.db_path, self.text, limit=self.page_size, is_cancelled=self.is_stale)
+            else:
+                rows = get_questions_page(self.db_path, limit=self.page_size)
+        except sqlite3.OperationalError as e:
+            if not self.is_stale():
+                self.signals.failed.emit(self.generation, str(e))
+            return
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        if self.is_stale():
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.signals.finished.emit(self.generation, self.text, rows, total, elapsed_ms)
+
+
+class TaskSignals(QObject):
+    # (erledigt, gesamt) - object statt int, da Bytezahlen 2^31 überschreiten können
+    progress = pyqtSignal(object, object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)  # Exception
+    cancelled = pyqtSignal()
+
+
+class TaskWorker(QRunnable):
+    """Führt einen Import/Export im Thread-Pool aus, damit das Fenster bedienbar bleibt.
+
+    function wird mit progress= und is_cancelled= aufgerufen (siehe
+    import_moodle_xml_streaming, export_to_moodle_xml, ...). Der Rückgabewert
+    kommt über finished, ein Abbruch über cancelled.
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self._cancelled = False
+        self.signals = TaskSignals()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def report_progress(self, done, total, *details):
+        self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            result = self.function(*self.args, progress=self.report_progress,
+                                   is_cancelled=self.is_cancelled, **self.kwargs)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)